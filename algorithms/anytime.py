@@ -0,0 +1,296 @@
+import heapq
+import time
+from fractions import Fraction
+from common.grid import read_grid
+from common.performance import track_performance
+from common.adjacency import get_adjacency, move_table
+from common.get_neighbors import calculate_path_cost
+from common.search_context import prepare_context
+from common.open_list import make_open_list, RadixHeapOpenList
+from algorithms.astar import heuristic, reconstruct_path
+
+# Searches that give up some path quality for speed, with a bound on how far
+# from optimal the result can be (for an admissible, consistent heuristic
+# such as the default Manhattan distance). Weights are kept as fractions p/q
+# and keys as q*g + p*h, so priorities stay integers and ties are broken
+# exactly. With a weight above 1 the keys are no longer monotone, so the radix
+# heap can not hold them; the other open lists can.
+
+
+def _fraction(weight):
+    weight = Fraction(weight).limit_denominator(1000)
+    if weight < 1:
+        raise ValueError(f"weight must be at least 1, got {weight}")
+    return weight
+
+
+@track_performance
+def weighted_astar(start, goal, grid, weight=1.5, context=None, heuristic=heuristic, open_list="binary", moves=4, observer=None):
+    """
+    A* graph search ordered by g + weight * h. It expands far fewer nodes than
+    A* when the heuristic underestimates a lot, and the path costs at most
+    weight times the optimum. Priorities seen by the observer are q*g + p*h.
+    """
+    weight = _fraction(weight)
+    if weight > 1 and (open_list == "radix" or isinstance(open_list, RadixHeapOpenList)):
+        raise ValueError("the radix heap needs monotone priorities, which weighted A* keys are not; "
+                         "use the binary, indexed or bucket open list")
+    p, q = weight.numerator, weight.denominator
+    nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    open_set = make_open_list(open_list, observer)
+    context.set(start, 0, -1)
+    open_set.push(start, p * heuristic(grid, start, goal))
+    if observer is not None:
+        observer.on_push(start, p * heuristic(grid, start, goal), 1)
+
+    while open_set:
+        priority, parent = open_set.pop()
+        cost = context.g[parent]
+        if context.is_closed(parent):
+            if observer is not None:
+                observer.on_stale_pop(parent)
+            continue
+
+        context.close(parent)
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(parent, priority)
+            observer.on_expand(parent, cost)
+
+        if parent == goal:
+            if observer is not None:
+                observer.on_goal(parent, cost)
+            return reconstruct_path(grid, context, parent), nodes_expanded, cost
+
+        for edge in range(indptr[parent], indptr[parent + 1]):
+            neighbor = indices[edge]
+            tentative_cost = cost + weights[edge]
+            if not context.is_closed(neighbor) and tentative_cost < context.cost(neighbor):
+                context.set(neighbor, tentative_cost, parent)
+                priority = q * tentative_cost + p * heuristic(grid, neighbor, goal)
+                open_set.push(neighbor, priority)
+                if observer is not None:
+                    observer.on_relax(neighbor, parent, tentative_cost)
+                    observer.on_push(neighbor, priority, len(open_set))
+
+    return [], nodes_expanded, 0
+
+
+@track_performance
+def focal_search(start, goal, grid, weight=1.5, context=None, heuristic=heuristic, moves=4, observer=None):
+    """
+    Bounded-suboptimal focal search (A*-epsilon). Open nodes with
+    f <= weight * f_min form the focal list, and of those the node closest to
+    the goal by heuristic is expanded first. f_min stays a lower bound of the
+    optimal cost (closed nodes are reopened when a cheaper path shows up), so
+    the path costs at most weight times the optimum.
+    """
+    weight = _fraction(weight)
+    p, q = weight.numerator, weight.denominator
+    nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    # All three heaps are lazy: an entry is live while its node is open with
+    # the entry's g. open_f orders every open node by f, waiting holds those
+    # not yet in focal, and focal orders the rest by distance to go.
+    open_f, waiting, focal = [], [], []
+
+    def live(g, index):
+        return context.g[index] == g and not context.is_closed(index)
+
+    def push(index, g, f_min):
+        f = g + heuristic(grid, index, goal)
+        heapq.heappush(open_f, (f, g, index))
+        if q * f <= p * f_min:
+            heapq.heappush(focal, (f - g, f, g, index))
+        else:
+            heapq.heappush(waiting, (f, g, index))
+        if observer is not None:
+            observer.on_push(index, f, len(open_f))
+
+    context.set(start, 0, -1)
+    f_min = heuristic(grid, start, goal)
+    push(start, 0, f_min)
+
+    while True:
+        while open_f and not live(open_f[0][1], open_f[0][2]):
+            heapq.heappop(open_f)
+        if not open_f:
+            break
+        # f_min only grows, so widening focal never has to take nodes back out
+        if open_f[0][0] > f_min:
+            f_min = open_f[0][0]
+            while waiting and q * waiting[0][0] <= p * f_min:
+                f, g, index = heapq.heappop(waiting)
+                if live(g, index):
+                    heapq.heappush(focal, (f - g, f, g, index))
+
+        _, f, cost, parent = heapq.heappop(focal)
+        if not live(cost, parent):
+            if observer is not None:
+                observer.on_stale_pop(parent)
+            continue
+
+        context.close(parent)
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(parent, f)
+            observer.on_expand(parent, cost)
+
+        if parent == goal:
+            if observer is not None:
+                observer.on_goal(parent, cost)
+            return reconstruct_path(grid, context, parent), nodes_expanded, cost
+
+        for edge in range(indptr[parent], indptr[parent + 1]):
+            neighbor = indices[edge]
+            tentative_cost = cost + weights[edge]
+            if tentative_cost < context.cost(neighbor):
+                context.set(neighbor, tentative_cost, parent)
+                context.reopen(neighbor)
+                push(neighbor, tentative_cost, f_min)
+                if observer is not None:
+                    observer.on_relax(neighbor, parent, tentative_cost)
+
+    return [], nodes_expanded, 0
+
+
+def ara_star_solutions(start, goal, grid, initial_weight=3, weight_step=0.5, deadline=None, context=None,
+                       heuristic=heuristic, moves=4, observer=None):
+    """
+    Anytime repairing A* (ARA*) as a generator. Each pass is a weighted A*
+    that reuses the g-costs of the previous pass and only re-expands nodes
+    whose cost improved, with the weight lowered by weight_step every time.
+    Yields (path, nodes_expanded, total_cost, bound) after every pass, where
+    bound >= total_cost / optimal cost. Stops after the optimal pass (bound 1),
+    when no path exists, or at deadline (a time.perf_counter() value), which
+    is checked during passes too. Returns the total nodes expanded.
+    """
+    weight, step = _fraction(initial_weight), Fraction(weight_step).limit_denominator(1000)
+    if step <= 0:
+        raise ValueError("weight_step must be positive")
+    nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    context.set(start, 0, -1)
+    open_nodes = {start}
+    inconsistent = set()  # Improved after their expansion in this pass; reopened by the next one
+
+    while True:
+        p, q = weight.numerator, weight.denominator
+        open_set = [(q * context.g[i] + p * heuristic(grid, i, goal), context.g[i], i) for i in open_nodes]
+        heapq.heapify(open_set)
+        closed = set()
+
+        while open_set:
+            key, cost, parent = open_set[0]
+            if parent not in open_nodes or cost != context.g[parent]:
+                heapq.heappop(open_set)
+                if observer is not None:
+                    observer.on_stale_pop(parent)
+                continue
+            # The pass is done once no open node can improve the goal under this weight
+            if context.is_seen(goal) and q * context.g[goal] <= key:
+                break
+            if deadline is not None and nodes_expanded % 64 == 0 and time.perf_counter() >= deadline:
+                return nodes_expanded
+
+            heapq.heappop(open_set)
+            open_nodes.discard(parent)
+            closed.add(parent)
+            nodes_expanded += 1
+            if observer is not None:
+                observer.on_pop(parent, key)
+                observer.on_expand(parent, cost)
+
+            for edge in range(indptr[parent], indptr[parent + 1]):
+                neighbor = indices[edge]
+                tentative_cost = cost + weights[edge]
+                if tentative_cost < context.cost(neighbor):
+                    context.set(neighbor, tentative_cost, parent)
+                    if observer is not None:
+                        observer.on_relax(neighbor, parent, tentative_cost)
+                    if neighbor in closed:
+                        inconsistent.add(neighbor)
+                    else:
+                        open_nodes.add(neighbor)
+                        key = q * tentative_cost + p * heuristic(grid, neighbor, goal)
+                        heapq.heappush(open_set, (key, tentative_cost, neighbor))
+                        if observer is not None:
+                            observer.on_push(neighbor, key, len(open_set))
+
+        if not context.is_seen(goal):
+            return nodes_expanded
+
+        # g(goal) can lag behind improvements made along its parent chain, so
+        # the path itself may be cheaper than g(goal)
+        path = reconstruct_path(grid, context, goal)
+        total_cost = calculate_path_cost(grid, path, move_table(moves))
+        if observer is not None:
+            observer.on_goal(goal, total_cost)
+        # Every unexpanded improvement is in open_nodes or inconsistent, so their
+        # lowest g + h bounds the optimal cost from below
+        lower = min((context.g[i] + heuristic(grid, i, goal) for i in open_nodes | inconsistent), default=total_cost)
+        bound = min(float(weight), total_cost / lower) if lower else 1.0
+        yield path, nodes_expanded, total_cost, max(bound, 1.0)
+
+        if bound <= 1:
+            return nodes_expanded
+        weight = max(Fraction(1), weight - step)
+        open_nodes |= inconsistent
+        inconsistent = set()
+
+
+@track_performance
+def ara_star(start, goal, grid, time_limit=None, deadline=None, initial_weight=3, weight_step=0.5, context=None,
+             heuristic=heuristic, moves=4, observer=None):
+    """
+    Runs ara_star_solutions until time_limit seconds have passed (or until the
+    time.perf_counter() deadline) and returns the best path found as
+    (path, nodes_expanded, total_cost, bound). bound is the proven
+    suboptimality: total_cost <= bound * optimal cost, 1 for an optimal path.
+    Without a limit it runs to the optimal path. If the time runs out before
+    the first path, the path is empty and bound is inf.
+    """
+    if time_limit is not None:
+        limit = time.perf_counter() + time_limit
+        deadline = limit if deadline is None else min(deadline, limit)
+
+    path, total_cost, bound = [], 0, float('inf')
+    solutions = ara_star_solutions(start, goal, grid, initial_weight, weight_step, deadline, context,
+                                   heuristic, moves, observer)
+    while True:
+        try:
+            path, _, total_cost, bound = next(solutions)
+        except StopIteration as stop:
+            return path, stop.value, total_cost, bound
+
+
+def main():
+    maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    start, goal, grid, grid_shape = read_grid(maze_file_path, cost_file_path)
+
+    algorithm = input("Select search (weighted/focal/ara): ").strip().lower()
+    if algorithm == "weighted":
+        weighted_astar(start, goal, grid, weight=float(input("Weight [1.5]: ") or 1.5))
+    elif algorithm == "focal":
+        focal_search(start, goal, grid, weight=float(input("Weight [1.5]: ") or 1.5))
+    elif algorithm == "ara":
+        milliseconds = float(input("Time limit in ms [5]: ") or 5)
+        (_, _, _, bound), _ = ara_star(start, goal, grid, time_limit=milliseconds / 1000)
+        print(f"Suboptimality Bound: {bound:.3f}")
+    else:
+        print("Invalid choice! Exiting.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,120 @@
-import heapq
 from common.visualization import visualize_grid
 from common.grid import read_grid
 from common.performance import track_performance
-from common.get_neighbors import get_neighbors
+from common.adjacency import get_adjacency
+from common.search_context import prepare_context
+from common.open_list import make_open_list
 import statistics
-import pandas as pd
 
-def heuristic(node, goal):
-    return abs(node.x - goal.x) + abs(node.y - goal.y) # Manhattan distance
+# Any function heuristic(grid, index, goal) -> lower bound of the cost from
+# index to goal can be passed to the searches, e.g. a LandmarkHeuristic.
+def heuristic(grid, index, goal):
+    x, y = divmod(index, grid.columns)
+    goal_x, goal_y = divmod(goal, grid.columns)
+    return abs(x - goal_x) + abs(y - goal_y) # Manhattan distance
 
-def reconstruct_path(node):
-    path = []
-    current_node = node
-    while current_node is not None:
-        path.append(current_node)
-        current_node = current_node.parent
-    path.reverse()
-    return path
+def reconstruct_path(grid, context, index):
+    return [grid.coords(i) for i in context.path_to(index)]
 
 
 @track_performance
-def astar_tree_pathfind(start_node, goal_node, grid):
+def astar_tree_pathfind(start, goal, grid, context=None, heuristic=heuristic, open_list="binary", moves=4, observer=None):
     nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, weights = get_adjacency(grid, moves).views  # Walls already removed
+    start, goal = grid.index(*start), grid.index(*goal)
 
-    open_set = []
-    best_cost = {}
+    open_set = make_open_list(open_list, observer)
 
-    start_node.cost = 0
-    heapq.heappush(open_set, (0, start_node))
-    best_cost[start_node.state] = 0
+    context.set(start, 0, -1)
+    open_set.push(start, 0)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
 
     while open_set:
         nodes_expanded += 1
-        _, parent_node = heapq.heappop(open_set)
-
-        if parent_node.state == goal_node.state:
-            path = reconstruct_path(parent_node)
-            return path, nodes_expanded
-
-        for neighbor, move_cost in get_neighbors(grid, parent_node):
-            new_cost = parent_node.cost + neighbor.cost + move_cost
-            if neighbor.state not in best_cost or new_cost < best_cost[neighbor.state]:
-                neighbor.cost = new_cost
-                neighbor.parent = parent_node
-                best_cost[neighbor.state] = new_cost
-                priority = new_cost + heuristic(neighbor, goal_node)
-                heapq.heappush(open_set, (priority, neighbor))
-
-    return [], nodes_expanded
+        priority, parent = open_set.pop()
+        cost = context.g[parent]
+        if observer is not None:
+            observer.on_pop(parent, priority)
+            observer.on_expand(parent, cost)
+
+        if parent == goal:
+            if observer is not None:
+                observer.on_goal(parent, cost)
+            path = reconstruct_path(grid, context, parent)
+            return path, nodes_expanded, cost
+
+        for edge in range(indptr[parent], indptr[parent + 1]):
+            neighbor = indices[edge]
+            new_cost = cost + weights[edge]
+            if new_cost < context.cost(neighbor):
+                context.set(neighbor, new_cost, parent)
+                priority = new_cost + heuristic(grid, neighbor, goal)
+                open_set.push(neighbor, priority)
+                if observer is not None:
+                    observer.on_relax(neighbor, parent, new_cost)
+                    observer.on_push(neighbor, priority, len(open_set))
+
+    return [], nodes_expanded, 0
 
 
 @track_performance
-def astar_graph_pathfind(start_node, goal_node, grid):
+def astar_graph_pathfind(start, goal, grid, context=None, heuristic=heuristic, open_list="binary", moves=4, observer=None):
     nodes_expanded = 0
+    context = prepare_context(grid, context)  # Per-query g-costs, parents and closed flags
+    indptr, indices, weights = get_adjacency(grid, moves).views  # Walls already removed
+    start, goal = grid.index(*start), grid.index(*goal)
 
-    open_set = []  # Priority queue for the open set
-    closed_set = set()  # Set to track expanded nodes
-    best_cost = {}  # Dictionary to track the best cost for each state
+    open_set = make_open_list(open_list, observer)  # Priority queue for the open set
 
     # Initialize the starting node
-    start_node.cost = 0
-    heapq.heappush(open_set, (0, start_node))
-    best_cost[start_node.state] = 0
+    context.set(start, 0, -1)
+    open_set.push(start, 0)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
 
     while open_set:
-        nodes_expanded += 1
-        _, parent_node = heapq.heappop(open_set)
+        priority, parent = open_set.pop()
+        cost = context.g[parent]
 
         # Skip if the node has already been expanded
-        if parent_node.state in closed_set:
+        if context.is_closed(parent):
+            if observer is not None:
+                observer.on_stale_pop(parent)
             continue
 
         # Mark the node as expanded
-        closed_set.add(parent_node.state)
+        context.close(parent)
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(parent, priority)
+            observer.on_expand(parent, cost)
 
         # Check if the goal is reached
-        if parent_node.state == goal_node.state:
-            return reconstruct_path(parent_node), nodes_expanded
+        if parent == goal:
+            if observer is not None:
+                observer.on_goal(parent, cost)
+            return reconstruct_path(grid, context, parent), nodes_expanded, cost
 
         # Explore neighbors
-        for neighbor, move_cost in get_neighbors(grid, parent_node):
-            if not neighbor.is_walkable:
-                continue
+        for edge in range(indptr[parent], indptr[parent + 1]):
+            neighbor = indices[edge]
 
             # Tentative cost calculation
-            tentative_cost = parent_node.cost + neighbor.cost + move_cost
+            tentative_cost = cost + weights[edge]
 
             # Check if neighbor has a better cost or hasn't been visited
-            if neighbor.state not in closed_set and (
-                neighbor.state not in best_cost or tentative_cost < best_cost[neighbor.state]
-            ):
-                neighbor.cost = tentative_cost
-                neighbor.parent = parent_node
-                best_cost[neighbor.state] = tentative_cost
-                priority = tentative_cost + heuristic(neighbor, goal_node)
-                heapq.heappush(open_set, (priority, neighbor))
+            if not context.is_closed(neighbor) and tentative_cost < context.cost(neighbor):
+                context.set(neighbor, tentative_cost, parent)
+                priority = tentative_cost + heuristic(grid, neighbor, goal)
+                open_set.push(neighbor, priority)
+                if observer is not None:
+                    observer.on_relax(neighbor, parent, tentative_cost)
+                    observer.on_push(neighbor, priority, len(open_set))
 
     # If no path is found
-    return [], nodes_expanded
+    return [], nodes_expanded, 0
 
 
 
@@ -124,6 +141,7 @@ def simulate_astar(name, astar_func, start_node, goal_node, grid, n_sim_iteratio
     print(f"Average Current Memory: {averages['current_memory']:.2f} KB")
     print(f"Average Temporary Memory: {averages['temporary_memory']:.2f} KB")
     
+    import pandas as pd
     return averages, pd.DataFrame(results)
 
 def simulate_astar_tree(start_node, goal_node, grid, n_sim_iterations=100):
@@ -143,34 +161,34 @@ def main():
     #generate_obstacles(grid, obstacle_count = 5)
     maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
     cost_file_path = "common/grids/node_costs_50x50.xlsx"
-    start_node, goal_node, grid, grid_shape = read_grid(maze_file_path, cost_file_path)
+    start, goal, grid, grid_shape = read_grid(maze_file_path, cost_file_path)
 
 
     # Ask the user which UCS version to run
     algorithm = input("Select A* version (tree/graph): ").strip().lower()
 
     if algorithm == "tree":
-        (path, nodes_expanded), metric = astar_tree_pathfind(start_node, goal_node, grid)
+        (path, nodes_expanded, total_cost), metric = astar_tree_pathfind(start, goal, grid)
         algorithm_name = "A* Tree Search"
         #print(path)
         
         #print("\n\n######### TREE SIMULATION RESULTS #########")
-        #simulate_astar_tree(start_node, goal_node, grid, n_sim_iterations=100)
+        #simulate_astar_tree(start, goal, grid, n_sim_iterations=100)
         
     elif algorithm == "graph":
-        (path, nodes_expanded), metric = astar_graph_pathfind(start_node, goal_node, grid)
+        (path, nodes_expanded, total_cost), metric = astar_graph_pathfind(start, goal, grid)
         algorithm_name = "A* Graph Search"
         #print(f"Path Cost: {total_cost}")
         #print(path)
         
         # print("\n\n######### TREE SIMULATION RESULTS #########")
-        # _, df = simulate_astar_tree(start_node, goal_node, grid, n_sim_iterations=100)
+        # _, df = simulate_astar_tree(start, goal, grid, n_sim_iterations=100)
         # print(df.describe())
     else:
         print("Invalid choice! Exiting.")
         return
     
-    visualize_grid(start_node, goal_node, grid, path, algorithm = algorithm_name)
+    visualize_grid(start, goal, grid, path, algorithm = algorithm_name)
     
     
 
@@ -0,0 +1,161 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from common.compact_grid import CompactGrid
+from common.grid import read_grid
+from common.performance import memory_tracking
+from algorithms.astar import astar_graph_pathfind, astar_tree_pathfind
+from algorithms.bfs import bfs_graph, bfs_tree
+from algorithms.dfs import dfs_graph, dfs_tree
+from algorithms.ucs import ucs_graph_pathfind, ucs_tree_pathfind
+
+# Raw search functions, without the printing track_performance wrapper
+ALGORITHMS = {
+    "astar": astar_graph_pathfind.__wrapped__,
+    "astar_tree": astar_tree_pathfind.__wrapped__,
+    "ucs": ucs_graph_pathfind,
+    "ucs_tree": ucs_tree_pathfind,
+    "bfs": bfs_graph.__wrapped__,
+    "bfs_tree": bfs_tree.__wrapped__,
+    "dfs": dfs_graph,
+    "dfs_tree": dfs_tree,
+}
+
+
+class BatchResult:
+    """
+    Paths, costs and throughput of one batch_pathfind call.
+    costs is inf and the path empty for queries without a path.
+    """
+    def __init__(self, paths, costs, nodes_expanded, elapsed, workers):
+        self.paths = paths
+        self.costs = costs
+        self.nodes_expanded = nodes_expanded
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def queries_per_second(self):
+        return len(self.paths) / self.elapsed if self.elapsed > 0 else float('inf')
+
+    def __repr__(self):
+        return (f"BatchResult({len(self.paths)} queries, {self.workers} workers, "
+                f"{self.elapsed:.3f}s, {self.queries_per_second:.1f} queries/s)")
+
+
+def batch_pathfind(grid, starts, goals, algorithm="astar", workers=None, chunk_size=None):
+    """
+    Runs one search per (start, goal) pair on a CompactGrid.
+    starts and goals are (n, 2) arrays of (x, y) cells. With more than one
+    worker the queries are spread over a process pool; the grid is placed in
+    shared memory once instead of being pickled for every task.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {sorted(ALGORITHMS)}")
+    starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+    goals = np.asarray(goals, dtype=np.int64).reshape(-1, 2)
+    if len(starts) != len(goals):
+        raise ValueError("starts and goals must have the same length")
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(starts)))
+    start_time = time.perf_counter()
+
+    if workers == 1:
+        results = _run_queries(grid, algorithm, starts, goals)
+    else:
+        results = _run_parallel(grid, algorithm, starts, goals, workers, chunk_size)
+
+    elapsed = time.perf_counter() - start_time
+    paths = [[grid.coords(index) for index in path] for path, _, _ in results]
+    costs = np.array([cost for _, cost, _ in results], dtype=np.float64)
+    nodes_expanded = np.array([expanded for _, _, expanded in results], dtype=np.int64)
+    return BatchResult(paths, costs, nodes_expanded, elapsed, workers)
+
+
+def _run_queries(grid, algorithm, starts, goals):
+    search = ALGORITHMS[algorithm]
+    results = []
+    # ucs and dfs trace their own memory unless told not to, which costs far more than the search
+    with memory_tracking(False):
+        for (sx, sy), (gx, gy) in zip(starts.tolist(), goals.tolist()):
+            result = search((sx, sy), (gx, gy), grid)
+            path = result[0]
+            cost = result[-1] if path else float('inf')
+            # Flat indices pickle much smaller than lists of tuples
+            flat_path = np.array([grid.index(x, y) for x, y in path], dtype=np.int64)
+            results.append((flat_path, cost, result[1]))
+    return results
+
+
+def _run_parallel(grid, algorithm, starts, goals, workers, chunk_size):
+    chunk_size = chunk_size or max(1, -(-len(starts) // (workers * 4)))
+    walkable_bytes = grid.size
+    shm = shared_memory.SharedMemory(create=True, size=walkable_bytes + 4 * grid.size)
+    try:
+        walkable = np.ndarray(grid.shape, dtype=np.bool_, buffer=shm.buf)
+        cost = np.ndarray(grid.shape, dtype=np.int32, buffer=shm.buf, offset=walkable_bytes)
+        walkable[:] = grid.walkable
+        cost[:] = grid.cost
+
+        init_args = (shm.name, grid.shape, grid.start, grid.goal)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as pool:
+            futures = [
+                pool.submit(_worker_queries, algorithm, starts[i:i + chunk_size], goals[i:i + chunk_size])
+                for i in range(0, len(starts), chunk_size)
+            ]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        del walkable, cost
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
+
+
+_worker_grid = None
+_worker_shm = None
+
+def _init_worker(shm_name, shape, start, goal):
+    global _worker_grid, _worker_shm
+    # Attach to the parent's block; keep a reference so it is not closed
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    size = shape[0] * shape[1]
+    walkable = np.ndarray(shape, dtype=np.bool_, buffer=_worker_shm.buf)
+    cost = np.ndarray(shape, dtype=np.int32, buffer=_worker_shm.buf, offset=size)
+    _worker_grid = CompactGrid(walkable, cost, start, goal)
+
+def _worker_queries(algorithm, starts, goals):
+    return _run_queries(_worker_grid, algorithm, starts, goals)
+
+
+def random_queries(grid, count, seed=None):
+    """
+    Picks count random (start, goal) pairs of walkable cells.
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.argwhere(grid.walkable)
+    starts = cells[rng.integers(len(cells), size=count)]
+    goals = cells[rng.integers(len(cells), size=count)]
+    return starts, goals
+
+
+def main():
+    maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    _, _, grid, _ = read_grid(maze_file_path, cost_file_path)
+
+    starts, goals = random_queries(grid, 2000, seed=0)
+    for workers in sorted({1, os.cpu_count() or 1}):
+        result = batch_pathfind(grid, starts, goals, algorithm="astar", workers=workers)
+        print(f"Workers: {workers}")
+        print(f"Queries: {len(result.paths)}")
+        print(f"Execution Time: {result.elapsed:.4f} seconds")
+        print(f"Throughput: {result.queries_per_second:.1f} queries/second")
+        print(f"Average Path Cost: {np.mean(result.costs[np.isfinite(result.costs)]):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from functools import partial
+import numpy as np
+from common.grid import read_grid, create_grid, generate_fixed_obstacles
+from common.performance import memory_tracking
+from algorithms.batch import ALGORITHMS as BATCH_ALGORITHMS
+from algorithms.bfs import bfs_vectorized
+from algorithms.bidirectional import bidirectional_astar, bidirectional_ucs, bidirectional_bfs
+from algorithms.astar import astar_graph_pathfind
+from algorithms.dstar_lite import DStarLite
+from algorithms.hpa import build_abstraction, hpa_pathfind
+from algorithms.landmarks import build_landmarks
+from algorithms.flow_field import FlowFieldCache, flow_field_pathfind
+from algorithms.memory_bounded import ida_star, iddfs, sma_star
+from algorithms.anytime import weighted_astar, focal_search, ara_star
+
+GRID_DIRECTORY = "common/grids"
+COST_FILE_PATH = "common/grids/node_costs_50x50.xlsx"
+
+
+def dstar_lite(start, goal, grid):
+    # A fresh planner each run, so the timing covers the full initial plan
+    return DStarLite(grid, start, goal).plan()
+
+
+def ara(start, goal, grid):
+    # Without a time limit ARA* runs down to weight 1; the bound is dropped
+    path, nodes_expanded, total_cost, _ = ara_star.__wrapped__(start, goal, grid)
+    return path, nodes_expanded, total_cost
+
+
+def prepare_hpa(grid):
+    return partial(hpa_pathfind.__wrapped__, abstraction=build_abstraction(grid))
+
+
+def prepare_landmarks(grid):
+    return partial(astar_graph_pathfind.__wrapped__, heuristic=build_landmarks(grid, seed=0))
+
+
+def prepare_flow_field(grid):
+    cache = FlowFieldCache(grid)
+    cache.get(grid.goal)
+    return partial(flow_field_pathfind.__wrapped__, cache=cache)
+
+
+# Every search variant without a per-grid index, unwrapped so nothing is
+# printed or traced inside the timed call
+ALGORITHMS = {
+    **BATCH_ALGORITHMS,
+    "bfs_vectorized": bfs_vectorized.__wrapped__,
+    "bidirectional_astar": bidirectional_astar.__wrapped__,
+    "bidirectional_ucs": bidirectional_ucs.__wrapped__,
+    "bidirectional_bfs": bidirectional_bfs.__wrapped__,
+    "dstar_lite": dstar_lite,
+    "ida_star": ida_star.__wrapped__,
+    "iddfs": iddfs.__wrapped__,
+    "sma_star": sma_star.__wrapped__,
+    "weighted_astar": weighted_astar.__wrapped__,
+    "focal": focal_search.__wrapped__,
+    "ara": ara,
+}
+
+# Searches that answer queries from an index: name -> prepare(grid) -> search.
+# The index (abstraction, landmarks, goal flow field) is built before the
+# timed and memory passes, so they measure only the query.
+INDEXED_ALGORITHMS = {
+    "hpa": prepare_hpa,
+    "astar_landmarks": prepare_landmarks,
+    "flow_field": prepare_flow_field,
+}
+
+# Too slow for the default run, so they only run when named with --algorithms:
+# IDA* and IDDFS are exponential on open maps (minutes per run at 50x50) and
+# focal search re-expands millions of nodes on the 500x500 map
+OPT_IN_ALGORITHMS = {"ida_star", "iddfs", "focal"}
+
+# (name, size, obstacle share, seed) of the generated maps added to the Excel grids
+GENERATED_GRIDS = [
+    ("random_200x200", 200, 0.25, 0),
+    ("random_500x500", 500, 0.25, 0),
+]
+
+
+def generated_grid(size, obstacle_share, seed):
+    """
+    Square grid with unit costs and a seeded share of random obstacles.
+    Start is the top-left corner and goal the bottom-right one, both kept free.
+    """
+    grid = create_grid(size, size, 1)
+    rng = np.random.default_rng(seed)
+    cells = rng.choice(grid.size, int(grid.size * obstacle_share), replace=False)
+    generate_fixed_obstacles(grid, [grid.coords(int(i)) for i in cells])
+    grid.start, grid.goal = (0, 0), (size - 1, size - 1)
+    grid.set_walkable([grid.start, grid.goal], True)
+    return grid
+
+
+def benchmark_grids(include_generated=True):
+    """
+    Returns {name: grid} for every maze in common/grids plus the generated maps.
+    """
+    grids = {}
+    for file_name in sorted(os.listdir(GRID_DIRECTORY)):
+        if file_name.endswith(".xlsx") and not file_name.startswith("node_costs"):
+            _, _, grid, _ = read_grid(os.path.join(GRID_DIRECTORY, file_name), COST_FILE_PATH)
+            grids[file_name[:-len(".xlsx")]] = grid
+    if include_generated:
+        for name, size, obstacle_share, seed in GENERATED_GRIDS:
+            grids[name] = generated_grid(size, obstacle_share, seed)
+    return grids
+
+
+def summarize(samples, confidence=0.95, resamples=2000, seed=0):
+    """
+    Median, p95, mean and a bootstrap confidence interval of the median.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    medians = np.median(rng.choice(samples, (resamples, len(samples))), axis=1)
+    tail = (1 - confidence) / 2
+    return {
+        "median": float(np.median(samples)),
+        "p95": float(np.percentile(samples, 95)),
+        "mean": float(samples.mean()),
+        "ci_low": float(np.quantile(medians, tail)),
+        "ci_high": float(np.quantile(medians, 1 - tail)),
+    }
+
+
+def time_search(search, start, goal, grid, warmup, repeats):
+    """
+    Timing-only pass: runs without memory tracing and with the garbage collector off.
+    Returns the per-run times in seconds and the last result.
+    """
+    times = []
+    with memory_tracking(False):
+        for _ in range(warmup):
+            result = search(start, goal, grid)
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                result = search(start, goal, grid)
+                times.append(time.perf_counter() - start_time)
+        finally:
+            gc.enable()
+    return times, result
+
+
+def measure_memory(search, start, goal, grid, repeats):
+    """
+    Memory-only pass: peak traced allocation of each run, in KB.
+    """
+    peaks = []
+    with memory_tracking(False):
+        for _ in range(repeats):
+            gc.collect()
+            tracemalloc.start()
+            search(start, goal, grid)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks.append(peak / 1024)
+    return peaks
+
+
+def run_benchmark(grids, algorithms=None, warmup=2, repeats=20, memory_repeats=3):
+    """
+    Benchmarks every algorithm on every grid from its start to its goal.
+    Returns one result dict per (grid, algorithm) pair.
+    """
+    if algorithms is None:
+        algorithms = [name for name in [*ALGORITHMS, *INDEXED_ALGORITHMS] if name not in OPT_IN_ALGORITHMS]
+    results = []
+    for grid_name, grid in grids.items():
+        for name in algorithms:
+            search = ALGORITHMS[name] if name in ALGORITHMS else INDEXED_ALGORITHMS[name](grid)
+            times, result = time_search(search, grid.start, grid.goal, grid, warmup, repeats)
+            peaks = measure_memory(search, grid.start, grid.goal, grid, memory_repeats)
+            results.append({
+                "grid": grid_name,
+                "algorithm": name,
+                "repeats": repeats,
+                "path_length": len(result[0]),
+                "path_cost": int(result[-1]),
+                "nodes_expanded": int(result[1]),
+                **summarize(times),
+                "peak_memory": float(np.median(peaks)),
+            })
+    return results
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_json(results, path):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+def save_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results, baseline, tolerance=0.10):
+    """
+    Flags (grid, algorithm) pairs that got slower than the baseline: the median
+    is more than tolerance above the baseline median and the confidence
+    intervals do not overlap. Also flags changed path costs.
+    """
+    previous = {(r["grid"], r["algorithm"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["grid"], result["algorithm"]))
+        if old is None:
+            continue
+        slowdown = result["median"] / old["median"] - 1 if old["median"] > 0 else 0.0
+        if slowdown > tolerance and result["ci_low"] > old["ci_high"]:
+            regressions.append({**result, "baseline_median": old["median"], "slowdown": slowdown})
+        elif result["path_cost"] != old["path_cost"]:
+            regressions.append({**result, "baseline_path_cost": old["path_cost"], "slowdown": slowdown})
+    return regressions
+
+
+def print_results(results):
+    print(f"{'Grid':<46}{'Algorithm':<22}{'Median ms':>11}{'p95 ms':>10}{'95% CI ms':>20}{'Peak KB':>11}")
+    for r in results:
+        ci = f"{r['ci_low'] * 1000:.3f}-{r['ci_high'] * 1000:.3f}"
+        print(f"{r['grid']:<46}{r['algorithm']:<22}{r['median'] * 1000:>11.3f}"
+              f"{r['p95'] * 1000:>10.3f}{ci:>20}{r['peak_memory']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every search on every grid.")
+    parser.add_argument("--algorithms", nargs="+", choices=sorted([*ALGORITHMS, *INDEXED_ALGORITHMS]), help="default: all but " + ", ".join(sorted(OPT_IN_ALGORITHMS)))
+    parser.add_argument("--grids", nargs="+", help="grid names to run (default: all)")
+    parser.add_argument("--no-generated", action="store_true", help="skip the generated large maps")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--memory-repeats", type=int, default=3)
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--csv", help="write results to this CSV file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown (default: 0.10)")
+    args = parser.parse_args()
+    if args.repeats < 1 or args.memory_repeats < 1:
+        parser.error("--repeats and --memory-repeats must be at least 1")
+    if args.warmup < 0:
+        parser.error("--warmup must not be negative")
+
+    grids = benchmark_grids(include_generated=not args.no_generated)
+    if args.grids:
+        grids = {name: grids[name] for name in args.grids}
+    results = run_benchmark(grids, args.algorithms, args.warmup, args.repeats, args.memory_repeats)
+    print_results(results)
+
+    if args.json:
+        save_json(results, args.json)
+    if args.csv:
+        save_csv(results, args.csv)
+    if args.baseline:
+        regressions = compare(results, load_json(args.baseline), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['grid']} {r['algorithm']}: {r['slowdown']:+.1%}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,107 +1,177 @@
 from queue import Queue
+import numpy as np
 from common.grid import read_grid
 from common.visualization import visualize_grid
-from common.get_neighbors import get_neighbors
+from common.get_neighbors import calculate_path_cost
+from common.adjacency import get_adjacency, move_table
 from common.performance import track_performance
+from common.search_context import prepare_context
 
 @track_performance
-def bfs_graph(start, goal, grid):
+def bfs_graph(start, goal, grid, context=None, moves=4, observer=None):
     nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, _ = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
 
     queue = Queue()
     queue.put(start)
-    visited = set()
-    visited.add(start.state)
+    context.set(start, 0, -1)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
 
     while not queue.empty():
         current_node = queue.get()
         nodes_expanded += 1
-
-        if current_node.state == goal.state:
-            path = reconstruct_path(current_node)
-            total_cost = calculate_total_path_cost(path)
+        if observer is not None:
+            observer.on_pop(current_node, 0)
+            observer.on_expand(current_node, 0)
+
+        if current_node == goal:
+            path = reconstruct_path(grid, context, current_node)
+            total_cost = calculate_path_cost(grid, path, move_table(moves))
+            if observer is not None:
+                observer.on_goal(current_node, total_cost)
             return path, nodes_expanded, total_cost
 
-        for neighbor, move_cost in get_neighbors(grid, current_node):
-            if neighbor.state not in visited and neighbor.is_walkable:
-                neighbor.parent = current_node
-                neighbor.move_cost = move_cost
-                visited.add(neighbor.state)
+        for neighbor in indices[indptr[current_node]:indptr[current_node + 1]]:
+            if not context.is_seen(neighbor):
+                context.set(neighbor, 0, current_node)
                 queue.put(neighbor)
+                if observer is not None:
+                    observer.on_relax(neighbor, current_node, 0)
+                    observer.on_push(neighbor, 0, queue.qsize())
 
     return [], nodes_expanded, 0
 
 @track_performance
-def bfs_tree(start, goal, grid):
+def bfs_tree(start, goal, grid, context=None, moves=4, observer=None):
     nodes_expanded = 0
-
-    for row in grid:
-        for node in row:
-            node.parent = None
+    # A fresh context generation means no cell has a parent yet
+    context = prepare_context(grid, context)
+    indptr, indices, _ = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
 
     queue = Queue()
-    start.parent = None
+    context.set(start, 0, -1)
     queue.put(start)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
 
     while not queue.empty():
         current_node = queue.get()
         nodes_expanded += 1
-
-        if current_node.state == goal.state:
-            path = reconstruct_path(current_node)
-            total_cost = calculate_total_path_cost(path)
+        if observer is not None:
+            observer.on_pop(current_node, 0)
+            observer.on_expand(current_node, 0)
+
+        if current_node == goal:
+            path = reconstruct_path(grid, context, current_node)
+            total_cost = calculate_path_cost(grid, path, move_table(moves))
+            if observer is not None:
+                observer.on_goal(current_node, total_cost)
             return path, nodes_expanded, total_cost
 
-        for neighbor, move_cost in get_neighbors(grid, current_node):
-            if neighbor.is_walkable and neighbor.parent is None:
-                if current_node.parent is not None and neighbor == current_node.parent:
-                    continue
-                neighbor.parent = current_node
-                neighbor.move_cost = move_cost
+        for neighbor in indices[indptr[current_node]:indptr[current_node + 1]]:
+            if not context.is_seen(neighbor):
+                context.set(neighbor, 0, current_node)
                 queue.put(neighbor)
+                if observer is not None:
+                    observer.on_relax(neighbor, current_node, 0)
+                    observer.on_push(neighbor, 0, queue.qsize())
 
     return [], nodes_expanded, 0
 
-def reconstruct_path(goal_node):
-    path = []
-    current = goal_node
-    while current:
-        path.append(current)
-        current = current.parent
+def bfs_distance_map(start, grid, goal=None):
+    """
+    Level-synchronous BFS: every level expands the whole frontier with NumPy
+    array operations instead of one node at a time. Returns an int32 array of
+    move counts from start (-1 where unreachable). With a goal it stops after
+    the level that reaches the goal.
+    """
+    rows, columns = grid.shape
+    # Pad with a ring of walls so neighbor offsets never leave the array
+    width = columns + 2
+    unvisited = np.zeros((rows + 2, width), dtype=np.bool_)
+    unvisited[1:-1, 1:-1] = grid.walkable
+    unvisited = unvisited.reshape(-1)
+    distances = np.full(unvisited.size, -1, dtype=np.int32)
+    offsets = np.array([-width, width, -1, 1])
+
+    start = (start[0] + 1) * width + start[1] + 1
+    goal = (goal[0] + 1) * width + goal[1] + 1 if goal is not None else -1
+    if unvisited[start]:
+        unvisited[start] = False
+        distances[start] = 0
+        frontier = np.array([start])
+    else:
+        frontier = np.array([], dtype=np.int64)
+
+    level = 0
+    while frontier.size and distances[goal] < 0:
+        level += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        frontier = np.unique(candidates[unvisited[candidates]])
+        unvisited[frontier] = False
+        distances[frontier] = level
+
+    return distances.reshape(rows + 2, width)[1:-1, 1:-1]
+
+def path_from_distance_map(distances, goal):
+    """
+    Walks a BFS distance map back from goal to the start (distance 0).
+    Returns the path as (x, y) cells, or [] if the goal was not reached.
+    """
+    rows, columns = distances.shape
+    x, y = goal
+    if distances[x, y] < 0:
+        return []
+    path = [(x, y)]
+    while distances[x, y] > 0:
+        level = distances[x, y] - 1
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            new_x, new_y = x + dx, y + dy
+            if 0 <= new_x < rows and 0 <= new_y < columns and distances[new_x, new_y] == level:
+                x, y = new_x, new_y
+                break
+        path.append((x, y))
     return path[::-1]
 
-def calculate_total_path_cost(path):
-    total_cost = 0
-    for i in range(1, len(path)):
-        node = path[i]
-        parent = path[i - 1]
-        # Cost of entering the node
-        total_cost += node.cost
-        # Movement cost from the parent to this node
-        total_cost += getattr(node, "move_cost", 0)  
-    return total_cost
+@track_performance
+def bfs_vectorized(start, goal, grid):
+    distances = bfs_distance_map(start, grid, goal)
+    path = path_from_distance_map(distances, goal)
+    nodes_expanded = int(np.count_nonzero(distances >= 0))
+    return path, nodes_expanded, calculate_path_cost(grid, path)
+
+def reconstruct_path(grid, context, goal_node):
+    return [grid.coords(index) for index in context.path_to(goal_node)]
 
 def main():
     cost_file_path = "common/grids/node_costs_50x50.xlsx"
     maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
-    start_node, goal_node, grid, _ = read_grid(maze_file_path, cost_file_path)
+    start, goal, grid, _ = read_grid(maze_file_path, cost_file_path)
 
-    algorithm = input("Select BFS version (tree/graph): ").strip().lower()
+    algorithm = input("Select BFS version (tree/graph/vectorized): ").strip().lower()
 
     if algorithm == "tree":
-        results = bfs_tree(start_node, goal_node, grid)
+        results = bfs_tree(start, goal, grid)
         algorithm_name = "BFS Tree Search"
         
     elif algorithm == "graph":
-        results = bfs_graph(start_node, goal_node, grid)
+        results = bfs_graph(start, goal, grid)
         algorithm_name = "BFS Graph Search"
 
+    elif algorithm == "vectorized":
+        results = bfs_vectorized(start, goal, grid)
+        algorithm_name = "Vectorized BFS"
+
     else:
         print("Invalid choice! Exiting.")
         return
 
     path = results[0][0]
-    visualize_grid(start_node, goal_node, grid, path , algorithm=algorithm_name)
+    visualize_grid(start, goal, grid, path , algorithm=algorithm_name)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
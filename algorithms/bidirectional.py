@@ -0,0 +1,217 @@
+import heapq
+from common.grid import read_grid
+from common.performance import track_performance
+from common.get_neighbors import calculate_path_cost
+from common.adjacency import get_adjacency, move_table
+from common.search_context import prepare_context
+from algorithms.astar import heuristic, astar_graph_pathfind
+from algorithms.ucs import ucs_graph_pathfind
+from algorithms.bfs import bfs_graph
+
+# The backward search walks edges in reverse: from a cell v it looks at every
+# cell u that can move into v, and the edge u -> v still costs the cost of
+# entering v plus the direction cost of the move u -> v. Those edges come from
+# the reversed adjacency, so both sides skip walls without checking cells.
+
+def join_paths(grid, forward, backward, meet):
+    """
+    Joins the forward tree path start -> meet with the backward tree path meet -> goal.
+    """
+    path = forward.path_to(meet)
+    index = backward.parent[meet]
+    while index != -1:
+        path.append(index)
+        index = backward.parent[index]
+    return [grid.coords(i) for i in path]
+
+
+def _bidirectional_best_first(start, goal, grid, use_heuristic, forward=None, backward=None, moves=4, observer=None):
+    nodes_expanded = 0
+    forward = prepare_context(grid, forward, slot=0)
+    backward = prepare_context(grid, backward, slot=1)
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    if start == goal:
+        return [grid.coords(start)], 1, 0
+
+    # Each side: (its context, the other side's context, open list, (indptr, indices,
+    # weights) edges, heuristic target). Forward heads for the goal, backward for the start.
+    forward_open, backward_open = [], []
+    sides = [
+        (forward, backward, forward_open, get_adjacency(grid, moves).views, goal),
+        (backward, forward, backward_open, get_adjacency(grid, moves, reverse=True).views, start),
+    ]
+
+    forward.set(start, 0, -1)
+    backward.set(goal, 0, -1)
+    heapq.heappush(forward_open, (0, 0, start))
+    heapq.heappush(backward_open, (0, 0, goal))
+    if observer is not None:
+        observer.on_push(start, 0, 1)
+        observer.on_push(goal, 0, 1)
+
+    best_cost = float('inf')  # Cost of the best path found so far (mu)
+    meet = -1
+
+    while forward_open and backward_open:
+        # Drop stale heads so the stopping rule sees the true minimum keys
+        for context, _, open_set, _, _ in sides:
+            while open_set and (context.is_closed(open_set[0][2]) or open_set[0][1] > context.g[open_set[0][2]]):
+                _, _, stale = heapq.heappop(open_set)
+                if observer is not None:
+                    observer.on_stale_pop(stale)
+        if not forward_open or not backward_open:
+            break
+
+        # Stopping rules: with consistent heuristics no path through an open node
+        # can beat best_cost once either side's smallest f reaches it. Without a
+        # heuristic the tighter Dijkstra rule applies: the two smallest g-costs
+        # together reach best_cost.
+        if use_heuristic:
+            if max(forward_open[0][0], backward_open[0][0]) >= best_cost:
+                break
+        elif forward_open[0][1] + backward_open[0][1] >= best_cost:
+            break
+
+        # Expand the side with the smaller open list
+        context, other, open_set, edges, target = sides[0] if len(forward_open) <= len(backward_open) else sides[1]
+        priority, cost, current = heapq.heappop(open_set)
+        context.close(current)
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(current, priority)
+            observer.on_expand(current, cost)
+
+        indptr, indices, weights = edges
+        for edge in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[edge]
+            if context.is_closed(neighbor):
+                continue
+            # Forward the weight prices entering neighbor, backward the move neighbor -> current
+            new_cost = cost + weights[edge]
+            if new_cost < context.cost(neighbor):
+                context.set(neighbor, new_cost, current)
+                priority = new_cost + (heuristic(grid, neighbor, target) if use_heuristic else 0)
+                heapq.heappush(open_set, (priority, new_cost, neighbor))
+                if observer is not None:
+                    observer.on_relax(neighbor, current, new_cost)
+                    observer.on_push(neighbor, priority, len(open_set))
+                # Meeting point: neighbor already has a cost from the other side
+                if other.is_seen(neighbor) and new_cost + other.g[neighbor] < best_cost:
+                    best_cost = new_cost + other.g[neighbor]
+                    meet = neighbor
+
+    if meet == -1:
+        return [], nodes_expanded, 0
+    if observer is not None:
+        observer.on_goal(meet, int(best_cost))
+    return join_paths(grid, forward, backward, meet), nodes_expanded, int(best_cost)
+
+
+@track_performance
+def bidirectional_astar(start, goal, grid, forward=None, backward=None, moves=4, observer=None):
+    return _bidirectional_best_first(start, goal, grid, True, forward, backward, moves, observer)
+
+
+@track_performance
+def bidirectional_ucs(start, goal, grid, forward=None, backward=None, moves=4, observer=None):
+    return _bidirectional_best_first(start, goal, grid, False, forward, backward, moves, observer)
+
+
+@track_performance
+def bidirectional_bfs(start, goal, grid, forward=None, backward=None, moves=4, observer=None):
+    """
+    Level-by-level BFS from both ends. Finds a path with the fewest moves, like
+    bfs_graph; the reported cost is that path's real cost. The observer sees
+    the number of moves from each side's root as the cost.
+    """
+    nodes_expanded = 0
+    forward = prepare_context(grid, forward, slot=0)
+    backward = prepare_context(grid, backward, slot=1)
+    forward_edges = get_adjacency(grid, moves).views
+    backward_edges = get_adjacency(grid, moves, reverse=True).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    if start == goal:
+        return [grid.coords(start)], 1, 0
+
+    # g holds the number of moves from each side's root
+    forward.set(start, 0, -1)
+    backward.set(goal, 0, -1)
+    forward_level, backward_level = [start], [goal]
+
+    while forward_level and backward_level:
+        # Expand one whole level of the smaller frontier
+        if len(forward_level) <= len(backward_level):
+            context, other, level, edges = forward, backward, forward_level, forward_edges
+        else:
+            context, other, level, edges = backward, forward, backward_level, backward_edges
+
+        best_hops = float('inf')
+        meet = -1
+        next_level = []
+        indptr, indices, _ = edges
+        for current in level:
+            nodes_expanded += 1
+            hops = context.g[current] + 1
+            if observer is not None:
+                observer.on_pop(current, hops - 1)
+                observer.on_expand(current, hops - 1)
+            for edge in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[edge]
+                if not context.is_seen(neighbor):
+                    context.set(neighbor, hops, current)
+                    next_level.append(neighbor)
+                    if observer is not None:
+                        observer.on_relax(neighbor, current, hops)
+                        observer.on_push(neighbor, hops, len(next_level))
+                # Finish the level before returning so the shortest meeting wins
+                if other.is_seen(neighbor) and context.g[neighbor] + other.g[neighbor] < best_hops:
+                    best_hops = context.g[neighbor] + other.g[neighbor]
+                    meet = neighbor
+
+        if meet != -1:
+            path = join_paths(grid, forward, backward, meet)
+            total_cost = calculate_path_cost(grid, path, move_table(moves))
+            if observer is not None:
+                observer.on_goal(meet, total_cost)
+            return path, nodes_expanded, total_cost
+
+        if context is forward:
+            forward_level = next_level
+        else:
+            backward_level = next_level
+
+    return [], nodes_expanded, 0
+
+
+def main():
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    maze_file_paths = [
+        "common/grids/empty_grid_50x50_start_center_goal_up.xlsx",
+        "common/grids/empty_grid_50x50_start_center_goal_down.xlsx",
+        "common/grids/mirror_maze_50x50.xlsx",
+    ]
+    pairs = [
+        ("A*", astar_graph_pathfind, bidirectional_astar),
+        ("UCS", ucs_graph_pathfind, bidirectional_ucs),
+        ("BFS", bfs_graph, bidirectional_bfs),
+    ]
+
+    for maze_file_path in maze_file_paths:
+        start, goal, grid, _ = read_grid(maze_file_path, cost_file_path)
+        print(f"\n######### {maze_file_path} #########")
+        for name, one_directional, two_directional in pairs:
+            print(f"\n--- {name} ---")
+            result = one_directional(start, goal, grid)
+            if one_directional is ucs_graph_pathfind:
+                # UCS measures itself instead of using track_performance
+                path, nodes_expanded, execution_time, _, total_cost = result
+                print(f"Ucs Graph Path Length: {len(path)}")
+                print(f"Nodes Expanded: {nodes_expanded}")
+                print(f"Execution Time: {execution_time:.4f} seconds")
+                print(f"Total Path Cost: {total_cost}")
+            two_directional(start, goal, grid)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+import heapq
+import time
+import numpy as np
+from common.grid import read_grid
+from common.adjacency import get_adjacency
+from common.get_neighbors import calculate_path_cost
+from common.simulator import generate_map, component_labels
+from algorithms.flow_field import FlowFieldCache
+
+# Cooperative pathfinding for many agents on one grid (Silver, "Cooperative
+# Pathfinding"). Agents are planned one after another in space-time: a state
+# is a cell at a time step, and every planned path is written into a shared
+# reservation table that later agents route around, so no two agents are in
+# the same cell at the same time or swap cells in one step. The heuristic is
+# the true cost-to-go of a flow field (one reverse Dijkstra per goal), cached
+# in a FlowFieldCache and shared by every agent with that goal.
+
+WAIT_COST = 1  # Cost of staying in place for one time step
+
+
+class ReservationTable:
+    """
+    Space-time reservations of a grid, keyed by time * grid.size + cell so one
+    dict holds them all. An agent that has arrived for good is parked: it holds
+    its cell from its arrival time on, without one entry per time step.
+    After horizon nothing but parked agents is reserved.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.occupied = {}  # time * size + cell -> agent
+        self.parked = {}    # cell -> (time, agent)
+        self.last = {}      # cell -> last time it is occupied
+        self.horizon = -1
+
+    def __len__(self):
+        return len(self.occupied) + len(self.parked)
+
+    def holder(self, cell, t):
+        """
+        Agent in cell at time t, or None.
+        """
+        agent = self.occupied.get(t * self.size + cell)
+        if agent is None:
+            parked = self.parked.get(cell)
+            if parked is not None and parked[0] <= t:
+                return parked[1]
+        return agent
+
+    def reserve(self, agent, path, start_time=0):
+        """
+        Reserves path (flat cell indices, one per time step) from start_time on.
+        """
+        for t, cell in enumerate(path, start_time):
+            self.occupied[t * self.size + cell] = agent
+            if self.last.get(cell, -1) < t:
+                self.last[cell] = t
+        self.horizon = max(self.horizon, start_time + len(path) - 1)
+
+    def release(self, agent, cell, t):
+        """
+        Drops agent's reservation of cell at time t, if it has one.
+        """
+        key = t * self.size + cell
+        if self.occupied.get(key) == agent:
+            del self.occupied[key]
+
+    def park(self, agent, cell, t):
+        self.parked[cell] = (t, agent)
+
+    def cancel(self, agent, path, start_time=0):
+        """
+        Drops agent's reservations of path and its parking at the path's end.
+        horizon and last are left as they are; they only need to be upper bounds.
+        """
+        for t, cell in enumerate(path, start_time):
+            self.release(agent, cell, t)
+        parked = self.parked.get(path[-1])
+        if parked is not None and parked[1] == agent:
+            del self.parked[path[-1]]
+
+    def used(self, cell):
+        """
+        Whether any agent holds cell at any time.
+        """
+        return cell in self.parked or any(self.holder(cell, t) is not None for t in range(self.last.get(cell, -1) + 1))
+
+    def can_move(self, agent, cell, next_cell, t):
+        """
+        Whether agent may go from cell at time t to next_cell at t + 1 (a wait
+        when they are equal): next_cell must be free then, and no other agent
+        may be coming the opposite way.
+        """
+        other = self.holder(next_cell, t + 1)
+        if other is not None and other != agent:
+            return False
+        if next_cell != cell and t <= self.horizon:
+            other = self.occupied.get(t * self.size + next_cell)
+            if other is not None and other != agent and self.holder(cell, t + 1) == other:
+                return False
+        return True
+
+    def can_stay(self, agent, cell, t):
+        """
+        Whether agent can stay in cell from time t on without meeting anyone.
+        """
+        parked = self.parked.get(cell)
+        if parked is not None and parked[1] != agent:
+            return False
+        return all(self.holder(cell, s) in (None, agent) for s in range(t, self.last.get(cell, -1) + 1))
+
+    def clear(self):
+        self.occupied.clear()
+        self.parked.clear()
+        self.last.clear()
+        self.horizon = -1
+
+
+def space_time_astar(grid, agent, start, goal, table, heuristic, start_time=0, window=None, max_depth=None,
+                     adjacency=None):
+    """
+    A* over (cell, time) states from flat cell start at start_time, avoiding
+    the reservations in table. heuristic is the flat cost-to-go toward goal
+    (negative where unreachable).
+    Without a window, the search ends at goal once the agent can stay there
+    for good. Past the table's horizon only parked agents remain, so all
+    later time steps are searched as one static layer and the search always
+    ends. With a window, it looks window steps ahead and ends at the state
+    with the lowest cost plus cost-to-go at the window's end (waiting at the
+    goal is free), as in windowed HCA*.
+    max_depth gives up on routes of more steps.
+    Returns (cells, nodes_expanded, cost): one cell per time step, [] if no path.
+    """
+    if heuristic[start] < 0:
+        return [], 0, 0
+    indptr, indices, weights = adjacency or get_adjacency(grid).views
+    size = grid.size
+    depth_limit = window if window is not None else max_depth
+    static_depth = max(table.horizon + 1 - start_time, 0) if window is None else window + 1
+
+    g = {start: 0}
+    parent = {start: -1}
+    closed = set()
+    # Ties go to the state closer to the goal
+    open_set = [(heuristic[start], heuristic[start], start)]
+    nodes_expanded = 0
+
+    while open_set:
+        _, _, state = heapq.heappop(open_set)
+        if state in closed:
+            continue
+        closed.add(state)
+        depth, cell = divmod(state, size)
+        t = start_time + depth
+        cost = g[state]
+
+        if window is not None:
+            if depth == window:
+                return _unwind(parent, state, size), nodes_expanded, cost
+        elif cell == goal and table.can_stay(agent, cell, t):
+            return _unwind(parent, state, size), nodes_expanded, cost
+        if depth_limit is not None and depth >= depth_limit:
+            continue
+        nodes_expanded += 1
+
+        next_base = min(depth + 1, static_depth) * size
+        # Waiting at the goal is free inside a window; in the static layer it changes nothing
+        wait_cost = 0 if window is not None and cell == goal else WAIT_COST
+        moves = [] if depth == static_depth else [(cell, wait_cost)]
+        moves.extend((indices[edge], weights[edge]) for edge in range(indptr[cell], indptr[cell + 1]))
+        for next_cell, step_cost in moves:
+            remaining = heuristic[next_cell]
+            if remaining < 0 or not table.can_move(agent, cell, next_cell, t):
+                continue
+            next_state = next_base + next_cell
+            new_cost = cost + step_cost
+            if new_cost < g.get(next_state, float('inf')):
+                g[next_state] = new_cost
+                parent[next_state] = state
+                heapq.heappush(open_set, (new_cost + remaining, remaining, next_state))
+
+    return [], nodes_expanded, 0
+
+
+def _unwind(parent, state, size):
+    cells = []
+    while state != -1:
+        cells.append(state % size)
+        state = parent[state]
+    return cells[::-1]
+
+
+def path_cost(grid, path):
+    """
+    Cost of a timed path of (x, y) cells: its moves plus WAIT_COST per wait.
+    """
+    waits = sum(1 for a, b in zip(path, path[1:]) if a == b)
+    moves = [cell for i, cell in enumerate(path) if i == 0 or cell != path[i - 1]]
+    return calculate_path_cost(grid, moves) + waits * WAIT_COST
+
+
+def find_conflicts(paths, starts=None):
+    """
+    (time, agent, other_agent) for every vertex or swap conflict between timed
+    paths. Agents stay on their last cell after their path ends. Empty paths
+    are skipped, or with starts ((x, y) per agent) count as staying on the
+    start cell, which is where HCA* leaves an agent without a route.
+    """
+    if starts is not None:
+        paths = [path if path else [tuple(start)] for path, start in zip(paths, np.asarray(starts).tolist())]
+    horizon = max((len(path) for path in paths), default=0)
+    conflicts = []
+    at = lambda path, t: path[min(t, len(path) - 1)]
+    planned = [(agent, path) for agent, path in enumerate(paths) if path]
+    for t in range(horizon):
+        cells = {}
+        for agent, path in planned:
+            cell = at(path, t)
+            if cell in cells:
+                conflicts.append((t, cells[cell], agent))
+            cells[cell] = agent
+        if t == 0:
+            continue
+        previous = {at(path, t - 1): agent for agent, path in planned}
+        for agent, path in planned:
+            other = previous.get(at(path, t))
+            if other is not None and other != agent and at(paths[other], t) == at(path, t - 1) \
+                    and at(path, t) != at(path, t - 1) and agent < other:
+                conflicts.append((t, agent, other))
+    return conflicts
+
+
+class MultiAgentResult:
+    """
+    Timed paths of a cooperative plan: paths[i][t] is agent i's (x, y) cell at
+    time step t, [] for agents without a route (or, with a window, that did
+    not arrive in time). batches holds (agents planned, seconds) per batch;
+    with a window every cycle plans all agents again.
+    """
+    def __init__(self, paths, costs, nodes_expanded, batches):
+        self.paths = paths
+        self.costs = costs
+        self.nodes_expanded = nodes_expanded
+        self.batches = batches
+
+    @property
+    def elapsed(self):
+        return sum(seconds for _, seconds in self.batches)
+
+    @property
+    def failed(self):
+        return sum(1 for path in self.paths if not path)
+
+    @property
+    def agents_per_second(self):
+        return len(self.paths) / self.elapsed if self.elapsed > 0 else float('inf')
+
+    @property
+    def makespan(self):
+        return max((len(path) - 1 for path in self.paths if path), default=0)
+
+    def __repr__(self):
+        return (f"MultiAgentResult({len(self.paths)} agents, {self.failed} failed, "
+                f"{self.elapsed:.3f}s, {self.agents_per_second:.1f} agents/s)")
+
+
+class CooperativePlanner:
+    """
+    Plans collision-free paths for many agents on one grid (4-connected moves).
+
+    With window=None every agent is planned once over its whole route
+    (cooperative A* with true-distance heuristics, HCA*) and then parked at
+    its goal; later plan() calls add agents around those already planned.
+    An agent that gets no route stays on its start cell for good: agents
+    planned after it route around it, and agents already routed through that
+    cell are routed again. Starts in later plan() calls must be cells no
+    earlier agent ever uses.
+
+    With a window, agents move together in cycles (windowed HCA*): every cycle
+    each agent plans window steps ahead, the agents advance window // 2 steps,
+    and the planning order rotates so no agent always yields. Agents that
+    have arrived keep replanning and can step aside for others. Each plan()
+    call is a separate run from time 0, ending when every agent has arrived
+    or max_delay steps after the longest shortest path would have.
+
+    flow_fields can share a FlowFieldCache with other planners or the
+    flow_field searches of the same grid.
+    """
+    def __init__(self, grid, window=None, max_delay=64, flow_fields=None):
+        if window is not None and window < 2:
+            raise ValueError("window must be at least 2")
+        self.grid = grid
+        self.window = window
+        self.max_delay = max_delay
+        self.flow_fields = flow_fields if flow_fields is not None else FlowFieldCache(grid)
+        self.table = ReservationTable(grid.size)
+        self.agents = 0
+        # Walkable cells no parked agent holds for good
+        self._free = np.array(grid.walkable, dtype=np.bool_)
+
+    def heuristic(self, goal):
+        """
+        Flat cost-to-go toward goal (x, y), shared by every agent heading there.
+        """
+        # memoryviews give plain Python ints inside the search loop
+        return memoryview(np.ascontiguousarray(self.flow_fields.get(goal).cost_to_go).reshape(-1))
+
+    def plan(self, starts, goals, batch_size=64):
+        """
+        Plans agents from starts to goals ((n, 2) arrays or lists of (x, y)).
+        Starts must be distinct walkable cells, and so must goals.
+        Returns a MultiAgentResult; agents are planned batch_size at a time.
+        """
+        starts = [tuple(cell) for cell in np.asarray(starts, dtype=np.int64).reshape(-1, 2).tolist()]
+        goals = [tuple(cell) for cell in np.asarray(goals, dtype=np.int64).reshape(-1, 2).tolist()]
+        if len(starts) != len(goals):
+            raise ValueError("starts and goals must have the same length")
+        if len(set(starts)) != len(starts) or len(set(goals)) != len(goals):
+            raise ValueError("agents need distinct starts and distinct goals")
+        for cell in starts + goals:
+            if not self.grid.in_bounds(*cell) or not self.grid.is_walkable(*cell):
+                raise ValueError(f"{cell} is not a walkable cell")
+        if self.window is None:
+            # Routes already returned can not change, so a new agent may not start in their way
+            for cell in starts:
+                if self.table.used(self.grid.index(*cell)):
+                    raise ValueError(f"{cell} is on the route of an agent planned earlier")
+        if self.window is None:
+            return self._plan_cooperative(starts, goals, batch_size)
+        return self._plan_windowed(starts, goals, batch_size)
+
+    def _plan_cooperative(self, starts, goals, batch_size):
+        grid, table = self.grid, self.table
+        adjacency = get_adjacency(grid).views
+        free = self._free.reshape(-1)
+        count = len(starts)
+        agents = range(self.agents, self.agents + count)
+        start_cells = [grid.index(*start) for start in starts]
+        goal_cells = [grid.index(*goal) for goal in goals]
+        routes = [[] for _ in range(count)]  # flat cell per time step, [] while an agent has none
+        costs = [float('inf')] * count
+        nodes = [0] * count
+        batches = []
+        # Agents still waiting to be planned hold their start cells for the first step
+        for agent, cell in zip(agents, start_cells):
+            table.reserve(agent, [cell] * 2)
+
+        def route(i, labels):
+            cells, expanded, cost = self._route(agents[i], start_cells[i], goal_cells[i], goals[i], labels, adjacency)
+            nodes[i] += expanded
+            if cells:
+                routes[i], costs[i] = cells, cost
+                free[cells[-1]] = False
+            return bool(cells)
+
+        for first in range(0, count, batch_size):
+            batch_start = time.perf_counter()
+            batch = range(first, min(first + batch_size, count))
+            # Parked agents are walls for good. Labels from the start of the batch
+            # can only miss walls, so a different label still proves a goal cut off.
+            labels = component_labels(self._free).reshape(-1)
+
+            for i in batch:
+                if route(i, labels):
+                    continue
+                # A stuck agent stays on its start for good. Agents already routed
+                # through that cell give their routes up and are routed around it,
+                # which may strand them too; every agent is stranded at most once.
+                stranded = [i]
+                while stranded:
+                    j = stranded.pop()
+                    start = start_cells[j]
+                    crossing = [k for k in range(count) if start in routes[k]]
+                    for k in crossing:
+                        table.cancel(agents[k], routes[k])
+                        # Only time 0 is still its own: others may have planned into its start since
+                        table.reserve(agents[k], [start_cells[k]])
+                        free[routes[k][-1]] = True
+                        routes[k], costs[k] = [], float('inf')
+                    table.park(agents[j], start, 0)
+                    free[start] = False
+                    # Freed goals break the batch's labels; walls only grow again from here
+                    labels = component_labels(self._free).reshape(-1)
+                    stranded.extend(k for k in crossing if not route(k, labels))
+            batches.append((len(batch), time.perf_counter() - batch_start))
+
+        self.agents += count
+        paths = [[grid.coords(cell) for cell in cells] for cells in routes]
+        return MultiAgentResult(paths, np.array(costs, dtype=np.float64), np.array(nodes, dtype=np.int64), batches)
+
+    def _route(self, agent, start, goal, goal_cell, labels, adjacency):
+        """
+        Plans one agent of _plan_cooperative and, if it gets a route, reserves
+        it and parks the agent at its goal. Returns (cells, nodes_expanded, cost).
+        """
+        table = self.table
+        # A goal cut off by parked agents must be reached before the table's horizon
+        cut_off = labels[start] < 0 or labels[start] != labels[goal]
+        cells, expanded, cost = space_time_astar(
+            self.grid, agent, start, goal, table, self.heuristic(goal_cell),
+            max_depth=table.horizon + 1 if cut_off else None, adjacency=adjacency)
+        if cells:
+            if len(cells) > 1 and cells[1] != start:
+                table.release(agent, start, 1)
+            table.reserve(agent, cells)
+            table.park(agent, goal, len(cells) - 1)
+        return cells, expanded, cost
+
+    def _plan_windowed(self, starts, goals, batch_size):
+        grid, table, window = self.grid, self.table, self.window
+        adjacency = get_adjacency(grid).views
+        step = window // 2
+        count = len(starts)
+        # Enough time for the longest shortest path plus max_delay steps
+        longest = max((len(self.flow_fields.get(goal).path(start)) for start, goal in zip(starts, goals)), default=0)
+        end_time = longest + self.max_delay
+        agents = list(range(self.agents, self.agents + count))
+        positions = [grid.index(*start) for start in starts]
+        goal_indexes = [grid.index(*goal) for goal in goals]
+        timed = [[cell] for cell in positions]
+        nodes = np.zeros(count, dtype=np.int64)
+        reachable = [self.heuristic(goal)[cell] >= 0 for goal, cell in zip(goals, positions)]
+        batches = []
+        now = cycle = 0
+
+        while now < end_time and positions != goal_indexes:
+            # Every cycle replans the agents from scratch
+            table.clear()
+            # Agents not yet planned this cycle hold their cells for one step,
+            # so they can always wait at least that long
+            for agent, cell in zip(agents, positions):
+                table.reserve(agent, [cell, cell], now)
+            order = [(cycle + i) % count for i in range(count)]
+            plans = [None] * count
+            for first in range(0, count, batch_size):
+                batch_start = time.perf_counter()
+                for i in order[first:first + batch_size]:
+                    cells = []
+                    # Boxed in later in the window: plan one step, and the
+                    # cycle then only carries out that step for every agent
+                    for lookahead in ((window, 1) if reachable[i] else ()):
+                        cells, expanded, _ = space_time_astar(
+                            grid, agents[i], positions[i], goal_indexes[i], table, self.heuristic(goals[i]),
+                            start_time=now, window=lookahead, adjacency=adjacency)
+                        nodes[i] += expanded
+                        if cells:
+                            break
+                    if not cells:
+                        # No route to the goal at all
+                        cells = [positions[i]] * 2
+                    if cells[1] != positions[i]:
+                        table.release(agents[i], positions[i], now + 1)
+                    table.reserve(agents[i], cells, now)
+                    plans[i] = cells
+                batches.append((len(order[first:first + batch_size]), time.perf_counter() - batch_start))
+            advance = min(step, min(len(cells) for cells in plans) - 1)
+            for i, cells in enumerate(plans):
+                timed[i].extend(cells[1:advance + 1])
+                positions[i] = cells[advance]
+            now += advance
+            cycle += 1
+
+        self.agents += count
+        paths, costs = [], []
+        for i, cells in enumerate(timed):
+            if positions[i] != goal_indexes[i]:
+                paths.append([])
+                costs.append(float('inf'))
+                continue
+            # Drop the final stretch of waiting at the goal
+            end = len(cells)
+            while end > 1 and cells[end - 2] == goal_indexes[i]:
+                end -= 1
+            path = [grid.coords(cell) for cell in cells[:end]]
+            paths.append(path)
+            costs.append(path_cost(grid, path))
+        return MultiAgentResult(paths, np.array(costs, dtype=np.float64), nodes, batches)
+
+
+def agent_queries(grid, count, seed=None):
+    """
+    count (start, goal) pairs for agents: distinct starts, distinct goals, none
+    shared between the two, all in the largest connected component.
+    Returns (starts, goals) as (count, 2) arrays of (x, y).
+    """
+    labels = component_labels(grid.walkable).reshape(-1)
+    sizes = np.bincount(labels[labels >= 0])
+    cells = np.flatnonzero(labels == np.argmax(sizes))
+    if 2 * count > len(cells):
+        raise ValueError(f"grid has room for at most {len(cells) // 2} agents")
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(cells, 2 * count, replace=False)
+    return np.column_stack(np.divmod(chosen[:count], grid.columns)), np.column_stack(np.divmod(chosen[count:], grid.columns))
+
+
+def main():
+    maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    _, _, grid, _ = read_grid(maze_file_path, cost_file_path)
+
+    for name, grid in (("mirror_maze_50x50", grid), ("random 100x100", generate_map("random", 100, seed=0))):
+        for window in (None, 16):
+            label = "HCA*" if window is None else f"WHCA* (window {window})"
+            for count in (25, 50, 100, 200):
+                starts, goals = agent_queries(grid, count, seed=count)
+                planner = CooperativePlanner(grid, window=window)
+                result = planner.plan(starts, goals)
+                print(f"{name}, {label}, {count} agents: {result.agents_per_second:.1f} agents/second, "
+                      f"{result.failed} failed, makespan {result.makespan}, "
+                      f"conflicts {len(find_conflicts(result.paths, starts if window is None else None))}, "
+                      f"flow fields built {planner.flow_fields.misses}")
+            if window is None:
+                # Later batches route around more reserved paths
+                rates = ", ".join(f"{agents / seconds:.1f}" for agents, seconds in result.batches)
+                print(f"  agents/second per batch of 64: {rates}")
+
+if __name__ == "__main__":
+    main()
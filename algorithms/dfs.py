@@ -1,114 +1,109 @@
 import os
-import time
-import tracemalloc
 from common.grid import read_grid
 from common.visualization import visualize_grid
-from common.get_neighbors import get_neighbors
+from common.get_neighbors import calculate_path_cost
+from common.adjacency import get_adjacency, move_table
+from common.search_context import prepare_context
+from common.performance import start_measurement, stop_measurement
 
 
-def dfs_graph(start, goal, grid):
+def dfs_graph(start, goal, grid, context=None, moves=4, observer=None):
     """
     Depth-First (Graph) Search implementation.
     """
-    tracemalloc.start()
-    start_time = time.perf_counter()
+    start_time = start_measurement()
 
     nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, _ = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
     # Initialize stack and visited set
     stack = [start]
-    visited = {start.state}
+    context.set(start, 0, -1)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
 
     while stack:
         current_node = stack.pop()
         nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(current_node, 0)
+            observer.on_expand(current_node, 0)
 
         # Check if goal is found
-        if current_node.state == goal.state:
-            path = reconstruct_path(current_node)
-            end_time = time.perf_counter()
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            total_cost = calculate_total_path_cost(path)
-            return path, nodes_expanded, end_time - start_time, peak - current, total_cost
+        if current_node == goal:
+            path = reconstruct_path(grid, context, current_node)
+            execution_time, memory = stop_measurement(start_time)
+            total_cost = calculate_path_cost(grid, path, move_table(moves))
+            if observer is not None:
+                observer.on_goal(current_node, total_cost)
+            return path, nodes_expanded, execution_time, memory, total_cost
 
         # Explore neighbors
-        for neighbor, move_cost in get_neighbors(grid, current_node):
-            if neighbor.state not in visited and neighbor.is_walkable:
-                neighbor.parent = current_node
-                neighbor.move_cost = move_cost
-                visited.add(neighbor.state)
+        for neighbor in indices[indptr[current_node]:indptr[current_node + 1]]:
+            if not context.is_seen(neighbor):
+                context.set(neighbor, 0, current_node)
                 stack.append(neighbor)
+                if observer is not None:
+                    observer.on_relax(neighbor, current_node, 0)
+                    observer.on_push(neighbor, 0, len(stack))
 
     # If no path is found
-    end_time = time.perf_counter()
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    return [], nodes_expanded, end_time - start_time, peak - current, 0
+    execution_time, memory = stop_measurement(start_time)
+    return [], nodes_expanded, execution_time, memory, 0
 
 
-def dfs_tree(start, goal, grid):
+def dfs_tree(start, goal, grid, context=None, moves=4, observer=None):
     """
     Depth-First (Tree) Search implementation.
     """
-    tracemalloc.start()
-    start_time = time.perf_counter()
+    start_time = start_measurement()
 
     nodes_expanded = 0
-    # Reset parents
-    for row in grid:
-        for node in row:
-            node.parent = None
+    # A fresh context generation resets every parent at once
+    context = prepare_context(grid, context)
+    indptr, indices, _ = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
 
     # Initialize stack
     stack = [start]
+    context.set(start, 0, -1)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
 
     while stack:
         current_node = stack.pop()
         nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(current_node, 0)
+            observer.on_expand(current_node, 0)
 
         # Check if goal is found
-        if current_node.state == goal.state:
-            path = reconstruct_path(current_node)
-            end_time = time.perf_counter()
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            total_cost = calculate_total_path_cost(path)
-            return path, nodes_expanded, end_time - start_time, peak - current, total_cost
+        if current_node == goal:
+            path = reconstruct_path(grid, context, current_node)
+            execution_time, memory = stop_measurement(start_time)
+            total_cost = calculate_path_cost(grid, path, move_table(moves))
+            if observer is not None:
+                observer.on_goal(current_node, total_cost)
+            return path, nodes_expanded, execution_time, memory, total_cost
 
         # Explore neighbors
-        for neighbor, move_cost in get_neighbors(grid, current_node):
-            if neighbor.is_walkable and neighbor.parent is None:
-                if current_node.parent is not None and neighbor == current_node.parent:
-                    continue
-                neighbor.parent = current_node
-                neighbor.move_cost = move_cost
+        for neighbor in indices[indptr[current_node]:indptr[current_node + 1]]:
+            if not context.is_seen(neighbor):
+                context.set(neighbor, 0, current_node)
                 stack.append(neighbor)
+                if observer is not None:
+                    observer.on_relax(neighbor, current_node, 0)
+                    observer.on_push(neighbor, 0, len(stack))
 
     # If no path is found
-    end_time = time.perf_counter()
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    return [], nodes_expanded, end_time - start_time, peak - current, 0 
-
-
-def reconstruct_path(goal_node):
-    path = []
-    current = goal_node
-    while current:
-        path.append(current)
-        current = current.parent
-    return path[::-1]
-
-def calculate_total_path_cost(path):
-    total_cost = 0
-    for i in range(1, len(path)):
-        node = path[i]
-        parent = path[i - 1]
-        # Cost of entering the node
-        total_cost += node.cost
-        # Movement cost from the parent to this node
-        total_cost += getattr(node, "move_cost", 0)  
-    return total_cost
+    execution_time, memory = stop_measurement(start_time)
+    return [], nodes_expanded, execution_time, memory, 0 
+
+
+def reconstruct_path(grid, context, goal_node):
+    return [grid.coords(index) for index in context.path_to(goal_node)]
 
 def main():
     # Grid selection
@@ -135,7 +130,7 @@ def main():
             print("Invalid choice!")
 
     cost_file_path = "common/grids/node_costs_50x50.xlsx"
-    start_node, goal_node, grid, grid_shape = read_grid(chosen_path, cost_file_path)
+    start, goal, grid, grid_shape = read_grid(chosen_path, cost_file_path)
 
     # Ask the user which algorithm to run
     algorithm = input("Select DFS algorithm (tree/graph): ").strip().lower()
@@ -161,13 +156,13 @@ def main():
     num_runs = 1000
 
     # for _ in range(num_runs):
-    path, nodes_expanded, exec_time, memory_usage, path_cost = dfs(start_node, goal_node, grid)
+    path, nodes_expanded, exec_time, memory_usage, path_cost = dfs(start, goal, grid)
     total_time += exec_time
     total_memory += memory_usage
     total_nodes_expanded += nodes_expanded
     total_path_length += len(path)
-    print(f"Start Node is: {start_node}")
-    print(f"Goal Node is: {goal_node}")
+    print(f"Start Node is: {start}")
+    print(f"Goal Node is: {goal}")
 
     # Calculate averages
     # avg_time = total_time / num_runs
@@ -191,7 +186,7 @@ def main():
     
 
     # Visualize the result
-    visualize_grid(start_node, goal_node, grid, path, algorithm=search_type)
+    visualize_grid(start, goal, grid, path, algorithm=search_type)
 
 
 if __name__ == "__main__":
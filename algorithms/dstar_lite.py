@@ -0,0 +1,213 @@
+import heapq
+import random
+from array import array
+from common.grid import read_grid, generate_fixed_obstacles
+from common.adjacency import get_adjacency, move_table
+from algorithms.astar import heuristic, astar_graph_pathfind
+
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    Incremental planner (D* Lite). It searches backward from the goal and keeps
+    its g/rhs values between calls. After cells change, update_cells repairs
+    only the part of the search the change affects, and move_start lets the
+    agent advance without throwing the search away.
+
+    Edge u -> v costs the cost of entering v plus the direction cost of the move,
+    and is blocked when either cell is not walkable. Edges come from the grid's
+    cached adjacency for the move model, reloaded whenever the grid changes.
+
+    An observer sees the backward search: relaxations lower a cell's rhs, and
+    the goal event fires with the agent's cell once it is consistent.
+    """
+    def __init__(self, grid, start, goal, moves=4, observer=None):
+        self.grid = grid
+        self.moves = move_table(moves)
+        self.observer = observer
+        self.start = grid.index(*start)
+        self.goal = grid.index(*goal)
+        self.km = 0  # Key modifier, grows as the start moves
+        self.g = array('d', [INF]) * grid.size
+        self.rhs = array('d', [INF]) * grid.size
+        self.open_set = []
+        self.queued = {}  # cell -> key it is currently queued with
+        self.nodes_expanded = 0
+        self._load_edges()
+
+        self.rhs[self.goal] = 0
+        self._push(self.goal)
+
+    def _load_edges(self):
+        # (indptr, indices, weights) of the current grid version, both directions
+        self.version = self.grid.version
+        self.successors = get_adjacency(self.grid, self.moves).views
+        self.predecessors = get_adjacency(self.grid, self.moves, reverse=True).views
+
+    def _predecessors(self, cell):
+        indptr, indices, _ = self.predecessors
+        return indices[indptr[cell]:indptr[cell + 1]]
+
+    def _key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return best + heuristic(self.grid, cell, self.start) + self.km, best
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.open_set, (key, cell))
+        if self.observer is not None:
+            self.observer.on_push(cell, key[0], len(self.queued))
+
+    def _top_key(self):
+        # Skip entries that were re-queued or removed since they were pushed
+        while self.open_set:
+            key, cell = self.open_set[0]
+            if self.queued.get(cell) == key:
+                return key
+            heapq.heappop(self.open_set)
+            if self.observer is not None:
+                self.observer.on_stale_pop(cell)
+        return INF, INF
+
+    def _update_vertex(self, cell):
+        if cell != self.goal:
+            best, parent = INF, -1
+            # Walls have no edges, so their rhs stays INF
+            indptr, indices, weights = self.successors
+            for edge in range(indptr[cell], indptr[cell + 1]):
+                successor = indices[edge]
+                if weights[edge] + self.g[successor] < best:
+                    best, parent = weights[edge] + self.g[successor], successor
+            if self.observer is not None and best < self.rhs[cell]:
+                self.observer.on_relax(cell, parent, best)
+            self.rhs[cell] = best
+        self.queued.pop(cell, None)
+        if self.g[cell] != self.rhs[cell]:
+            self._push(cell)
+
+    def compute_shortest_path(self):
+        """
+        Expands inconsistent cells until the start is consistent. Returns the
+        number of cells expanded by this call.
+        """
+        expanded = 0
+        if self.version != self.grid.version:
+            self._load_edges()
+        while self._top_key() < self._key(self.start) or self.rhs[self.start] != self.g[self.start]:
+            if not self.open_set:
+                break
+            old_key, cell = heapq.heappop(self.open_set)
+            del self.queued[cell]
+            expanded += 1
+            if self.observer is not None:
+                self.observer.on_pop(cell, old_key[0])
+                self.observer.on_expand(cell, self.rhs[cell])
+
+            new_key = self._key(cell)
+            if old_key < new_key:
+                self._push(cell)
+            elif self.g[cell] > self.rhs[cell]:
+                self.g[cell] = self.rhs[cell]
+                for predecessor in self._predecessors(cell):
+                    self._update_vertex(predecessor)
+            else:
+                self.g[cell] = INF
+                self._update_vertex(cell)
+                for predecessor in self._predecessors(cell):
+                    self._update_vertex(predecessor)
+
+        self.nodes_expanded += expanded
+        if self.observer is not None and self.rhs[self.start] != INF:
+            self.observer.on_goal(self.start, int(self.rhs[self.start]))
+        return expanded
+
+    def update_cells(self, cells):
+        """
+        Repairs the solution after the walkability or cost of cells (x, y) changed
+        in the grid. Only edges into and out of those cells, and diagonal moves
+        cutting past them, are affected.
+        """
+        affected = set()
+        for x, y in cells:
+            affected.add(self.grid.index(x, y))
+            # Every cell that could move into (x, y) or cut past it, wall or not:
+            # the adjacency no longer has edges into a cell that just became a wall
+            for dx, dy in self.moves:
+                sources = [(x - dx, y - dy)]
+                if dx and dy:
+                    sources += [(x - dx, y), (x, y - dy)]
+                affected.update(self.grid.index(*source) for source in sources if self.grid.in_bounds(*source))
+
+        self._load_edges()
+        for cell in affected:
+            self._update_vertex(cell)
+        return self.compute_shortest_path()
+
+    def move_start(self, start):
+        """
+        Moves the agent to start (x, y), e.g. one step along the current path.
+        """
+        start = self.grid.index(*start)
+        # Keys are measured from the start; raising km keeps queued keys lower bounds
+        self.km += heuristic(self.grid, self.start, start)
+        self.start = start
+
+    def path(self):
+        """
+        Returns (path, cost) from the current start, following the cheapest successor.
+        """
+        self.compute_shortest_path()
+        if self.rhs[self.start] == INF:
+            return [], 0
+
+        indptr, indices, weights = self.successors
+        path = [self.start]
+        current = self.start
+        while current != self.goal:
+            best, best_cost = -1, INF
+            for edge in range(indptr[current], indptr[current + 1]):
+                cost = weights[edge] + self.g[indices[edge]]
+                if cost < best_cost:
+                    best, best_cost = indices[edge], cost
+            if best == -1:
+                return [], 0
+            path.append(best)
+            current = best
+        return [self.grid.coords(cell) for cell in path], int(self.rhs[self.start])
+
+    def plan(self):
+        """
+        Runs (or repairs) the search and returns (path, nodes_expanded, cost)
+        like the other searches; nodes_expanded counts only this call's work.
+        """
+        expanded = self.compute_shortest_path()
+        path, cost = self.path()
+        return path, expanded, cost
+
+
+def main():
+    maze_file_path = "common/grids/empty_grid_50x50_start_center_goal_up.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    start, goal, grid, _ = read_grid(maze_file_path, cost_file_path)
+    random.seed(0)
+
+    planner = DStarLite(grid, start, goal)
+    path, nodes_expanded, cost = planner.plan()
+    print(f"Initial plan: cost {cost}, {nodes_expanded} nodes expanded")
+
+    # Walk along the path while a few random cells turn into obstacles at every step
+    while len(path) > 1:
+        planner.move_start(path[1])
+        cells = [grid.coords(index) for index in random.sample(range(grid.size), 3)]
+        changed = [cell for cell in cells if cell not in (path[1], goal)]
+        generate_fixed_obstacles(grid, changed)
+
+        nodes_expanded = planner.update_cells(changed)
+        path, cost = planner.path()
+        _, astar_expanded, astar_cost = astar_graph_pathfind.__wrapped__(path[0], goal, grid) if path else ([], 0, 0)
+        print(f"Replanned: cost {cost} ({nodes_expanded} nodes), A* from scratch: cost {astar_cost} ({astar_expanded} nodes)")
+
+if __name__ == "__main__":
+    main()
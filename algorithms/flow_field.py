@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import numpy as np
+from common.grid import read_grid
+from common.performance import track_performance
+from common.get_neighbors import DIRECTIONS
+from algorithms.ucs import ucs_cost_map
+from algorithms.batch import random_queries
+
+GOAL = len(DIRECTIONS)  # Direction code stored at the goal cell
+NO_PATH = -1            # Direction code (and cost) of cells that can not reach the goal
+
+
+class FlowField:
+    """
+    Cost-to-go and next-step direction for every cell, toward one goal.
+    cost_to_go is int32 (-1 when unreachable); direction holds an index into
+    DIRECTIONS, GOAL at the goal and NO_PATH where there is no path.
+    """
+    def __init__(self, goal, cost_to_go, direction, version):
+        self.goal = goal
+        self.cost_to_go = cost_to_go
+        self.direction = direction
+        self.version = version
+
+    @property
+    def nbytes(self):
+        return self.cost_to_go.nbytes + self.direction.nbytes
+
+    def cost(self, start):
+        return int(self.cost_to_go[start])
+
+    def path(self, start):
+        """
+        Follows the directions from start (x, y). Returns [] if the goal can not be reached.
+        """
+        x, y = start
+        if self.direction[x, y] == NO_PATH:
+            return []
+        path = [(x, y)]
+        while self.direction[x, y] != GOAL:
+            dx, dy = DIRECTIONS[self.direction[x, y]]
+            x, y = x + dx, y + dy
+            path.append((x, y))
+        return path
+
+
+def build_flow_field(goal, grid):
+    """
+    One reverse Dijkstra (ucs_cost_map with backward=True) from goal, using the
+    direction-aware move costs, turned into a compact FlowField.
+    """
+    costs, parents = ucs_cost_map(goal, grid, backward=True)
+    reached = np.isfinite(costs)
+    cost_to_go = np.where(reached, costs, NO_PATH).astype(np.int32).reshape(grid.shape)
+
+    # The backward parent of a cell is the next cell on its way to the goal
+    cells = np.arange(grid.size)
+    step_x = parents // grid.columns - cells // grid.columns
+    step_y = parents % grid.columns - cells % grid.columns
+    direction = np.full(grid.size, NO_PATH, dtype=np.int8)
+    for code, (dx, dy) in enumerate(DIRECTIONS):
+        direction[reached & (parents >= 0) & (step_x == dx) & (step_y == dy)] = code
+    direction[grid.index(*goal)] = GOAL
+
+    return FlowField(goal, cost_to_go, direction.reshape(grid.shape), grid.version)
+
+
+class FlowFieldCache:
+    """
+    Flow fields per goal for one grid, evicted least recently used first once
+    their total size exceeds max_bytes. Fields built for an older grid version
+    are dropped.
+    """
+    def __init__(self, grid, max_bytes=64 * 1024 * 1024):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.fields = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, goal):
+        goal = tuple(goal)
+        field = self.fields.get(goal)
+        if field is not None and field.version == self.grid.version:
+            self.fields.move_to_end(goal)
+            self.hits += 1
+            return field
+        if field is not None:
+            self._remove(goal)
+
+        self.misses += 1
+        field = build_flow_field(goal, self.grid)
+        self.fields[goal] = field
+        self.nbytes += field.nbytes
+        # Always keep the newest field, even if it alone exceeds the budget
+        while self.nbytes > self.max_bytes and len(self.fields) > 1:
+            self._remove(next(iter(self.fields)))
+            self.evictions += 1
+        return field
+
+    def _remove(self, goal):
+        self.nbytes -= self.fields.pop(goal).nbytes
+
+    def clear(self):
+        self.fields.clear()
+        self.nbytes = 0
+
+
+@track_performance
+def flow_field_pathfind(start, goal, grid, cache):
+    """
+    Answers a query from the cached flow field of goal. nodes_expanded counts
+    the cells followed, since the search itself is shared between queries.
+    """
+    field = cache.get(goal)
+    path = field.path(start)
+    cost = field.cost(start) if path else 0
+    return path, len(path), cost
+
+
+def main():
+    maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    _, goal, grid, _ = read_grid(maze_file_path, cost_file_path)
+
+    cache = FlowFieldCache(grid, max_bytes=1024 * 1024)
+    starts, _ = random_queries(grid, 1000, seed=0)
+    # Every agent heads to the same goal, so only the first one pays for the search
+    reachable = sum(1 for start in map(tuple, starts.tolist()) if cache.get(goal).path(start))
+
+    print(f"Flow field size: {cache.nbytes / 1024:.2f} KB")
+    print(f"Agents routed: {len(starts)} ({reachable} reachable)")
+    print(f"Cache hits: {cache.hits}, misses: {cache.misses}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+import heapq
+import os
+import numpy as np
+from common.grid import read_grid
+from common.performance import track_performance
+from common.get_neighbors import get_neighbors, get_predecessors
+from common.search_context import get_context
+from algorithms.astar import heuristic, astar_graph_pathfind
+
+# Hierarchical path-finding A* (HPA*). The grid is split into square clusters.
+# Wherever two neighboring clusters share walkable border cells an entrance is
+# placed; its two cells become abstract nodes. Inter edges cross the border,
+# intra edges hold the cheapest cost between two abstract nodes of the same
+# cluster using only that cluster's cells. A query inserts start and goal into
+# the abstract graph, searches it, and then refines each abstract edge back to
+# grid cells.
+
+ABSTRACTION_VERSION = 1
+MAX_SINGLE_ENTRANCE = 6  # Longer border openings get an entrance at each end
+
+
+class Abstraction:
+    """
+    Precomputed abstract graph for one grid. edges maps an abstract node (flat
+    cell index) to a list of (abstract node, cost) pairs.
+    """
+    def __init__(self, shape, cluster_size, edges, fingerprint):
+        self.shape = shape
+        self.cluster_size = cluster_size
+        self.edges = edges
+        self.fingerprint = fingerprint
+        self.clusters = {}  # cluster -> its abstract nodes
+        for node in edges:
+            self.clusters.setdefault(self.cluster_of(node), []).append(node)
+
+    @property
+    def node_count(self):
+        return len(self.edges)
+
+    @property
+    def edge_count(self):
+        return sum(len(targets) for targets in self.edges.values())
+
+    def cluster_of(self, index):
+        x, y = divmod(index, self.shape[1])
+        return x // self.cluster_size, y // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """
+        (x0, y0, x1, y1) with exclusive upper bounds.
+        """
+        k = self.cluster_size
+        cx, cy = cluster
+        return cx * k, cy * k, min((cx + 1) * k, self.shape[0]), min((cy + 1) * k, self.shape[1])
+
+    def nodes_in_cluster(self, cluster):
+        return self.clusters.get(cluster, [])
+
+
+def cluster_search(grid, source, targets, bounds, backward=False, goal=None, slot=2, observer=None):
+    """
+    Dijkstra (or A* when goal is given) from source that never leaves bounds.
+    Stops once every target is closed. With backward=True it follows edges in
+    reverse, giving costs from each cell to source. Returns the SearchContext
+    holding the costs and parents, and the number of nodes expanded.
+    """
+    context = get_context(grid, slot)
+    walkable, cell_cost = grid.flat_walkable, grid.flat_cost
+    x0, y0, x1, y1 = bounds
+    columns = grid.columns
+    edges = get_predecessors if backward else get_neighbors
+    remaining = set(targets)
+    nodes_expanded = 0
+
+    open_set = [(0, 0, source)]
+    context.set(source, 0, -1)
+    if observer is not None:
+        observer.on_push(source, 0, 1)
+
+    while open_set and remaining:
+        priority, cost, current = heapq.heappop(open_set)
+        if context.is_closed(current):
+            if observer is not None:
+                observer.on_stale_pop(current)
+            continue
+        context.close(current)
+        remaining.discard(current)
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(current, priority)
+            observer.on_expand(current, cost)
+
+        for neighbor, move_cost in edges(grid, current):
+            x, y = divmod(neighbor, columns)
+            if not (x0 <= x < x1 and y0 <= y < y1) or not walkable[neighbor]:
+                continue
+            entered = current if backward else neighbor
+            new_cost = cost + cell_cost[entered] + move_cost
+            if not context.is_closed(neighbor) and new_cost < context.cost(neighbor):
+                context.set(neighbor, new_cost, current)
+                priority = new_cost + (heuristic(grid, neighbor, goal) if goal is not None else 0)
+                heapq.heappush(open_set, (priority, new_cost, neighbor))
+                if observer is not None:
+                    observer.on_relax(neighbor, current, new_cost)
+                    observer.on_push(neighbor, priority, len(open_set))
+
+    return context, nodes_expanded
+
+
+def _find_entrances(grid, cluster_size):
+    """
+    Returns (cell, cell) pairs across cluster borders, one per transition.
+    """
+    walkable = grid.walkable
+    rows, columns = grid.shape
+    k = cluster_size
+    transitions = []
+
+    def add_runs(cells_a, cells_b):
+        # cells_a[i] and cells_b[i] face each other across the border
+        run = []
+        for a, b in zip(cells_a + [None], cells_b + [None]):
+            if a is not None and walkable[a] and walkable[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) < MAX_SINGLE_ENTRANCE:
+                    transitions.append(run[len(run) // 2])
+                else:
+                    transitions.append(run[0])
+                    transitions.append(run[-1])
+            run = []
+
+    # Borders between vertically stacked clusters (rows x and x + 1)
+    for x in range(k - 1, rows - 1, k):
+        for y0 in range(0, columns, k):
+            ys = range(y0, min(y0 + k, columns))
+            add_runs([(x, y) for y in ys], [(x + 1, y) for y in ys])
+
+    # Borders between side by side clusters (columns y and y + 1)
+    for y in range(k - 1, columns - 1, k):
+        for x0 in range(0, rows, k):
+            xs = range(x0, min(x0 + k, rows))
+            add_runs([(x, y) for x in xs], [(x, y + 1) for x in xs])
+
+    return transitions
+
+
+def build_abstraction(grid, cluster_size=10):
+    """
+    Builds the abstract graph: entrances, inter edges across cluster borders and
+    intra edges from a cluster-restricted Dijkstra out of every entrance node.
+    """
+    rows, columns = grid.shape
+    cell_cost = grid.flat_cost
+    edges = {}
+
+    for (ax, ay), (bx, by) in _find_entrances(grid, cluster_size):
+        a, b = grid.index(ax, ay), grid.index(bx, by)
+        edges.setdefault(a, [])
+        edges.setdefault(b, [])
+        # Moving across the border costs the entered cell plus the direction cost
+        move_ab = next(move for cell, move in get_neighbors(grid, a) if cell == b)
+        move_ba = next(move for cell, move in get_neighbors(grid, b) if cell == a)
+        edges[a].append((b, cell_cost[b] + move_ab))
+        edges[b].append((a, cell_cost[a] + move_ba))
+
+    abstraction = Abstraction((rows, columns), cluster_size, edges, grid.fingerprint())
+
+    for cluster, nodes in abstraction.clusters.items():
+        bounds = abstraction.cluster_bounds(cluster)
+        for source in nodes:
+            targets = [node for node in nodes if node != source]
+            context, _ = cluster_search(grid, source, targets, bounds)
+            for target in targets:
+                if context.is_closed(target):
+                    edges[source].append((target, context.g[target]))
+
+    return abstraction
+
+
+def save_abstraction(abstraction, path):
+    sources, targets, costs = [], [], []
+    for source, neighbors in abstraction.edges.items():
+        for target, cost in neighbors:
+            sources.append(source)
+            targets.append(target)
+            costs.append(cost)
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            version=ABSTRACTION_VERSION,
+            shape=np.asarray(abstraction.shape, dtype=np.int64),
+            cluster_size=abstraction.cluster_size,
+            nodes=np.fromiter(abstraction.edges, dtype=np.int64),
+            sources=np.asarray(sources, dtype=np.int64),
+            targets=np.asarray(targets, dtype=np.int64),
+            costs=np.asarray(costs, dtype=np.int64),
+            fingerprint=abstraction.fingerprint,
+        )
+
+
+def load_abstraction(path):
+    with np.load(path) as data:
+        if int(data["version"]) != ABSTRACTION_VERSION:
+            raise ValueError(f"{path} is not a version {ABSTRACTION_VERSION} abstraction")
+        edges = {int(node): [] for node in data["nodes"]}
+        for source, target, cost in zip(data["sources"].tolist(), data["targets"].tolist(), data["costs"].tolist()):
+            edges[source].append((target, cost))
+        return Abstraction(tuple(data["shape"].tolist()), int(data["cluster_size"]), edges, str(data["fingerprint"]))
+
+
+def load_or_build_abstraction(grid, path, cluster_size=10):
+    """
+    Loads the abstraction saved at path if it matches grid, else builds and saves it.
+    """
+    if os.path.exists(path):
+        try:
+            abstraction = load_abstraction(path)
+            if abstraction.cluster_size == cluster_size and abstraction.fingerprint == grid.fingerprint():
+                return abstraction
+        except (ValueError, KeyError, OSError):
+            pass
+    abstraction = build_abstraction(grid, cluster_size)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    save_abstraction(abstraction, path)
+    return abstraction
+
+
+def _refine(grid, abstraction, abstract_path, observer=None):
+    """
+    Turns an abstract path into grid cells. Inter edges are single moves; intra
+    edges are re-searched inside their cluster only.
+    """
+    cells = [abstract_path[0]]
+    nodes_expanded = 0
+    for a, b in zip(abstract_path, abstract_path[1:]):
+        cluster = abstraction.cluster_of(a)
+        if cluster != abstraction.cluster_of(b):
+            cells.append(b)
+            continue
+        context, expanded = cluster_search(grid, a, [b], abstraction.cluster_bounds(cluster), goal=b, observer=observer)
+        nodes_expanded += expanded
+        cells.extend(context.path_to(b)[1:])
+    return [grid.coords(index) for index in cells], nodes_expanded
+
+
+@track_performance
+def hpa_pathfind(start, goal, grid, abstraction, observer=None):
+    """
+    HPA* query. Costs are exact for the abstract route it finds, but the route
+    may be slightly longer than the true optimum, since paths can only cross
+    cluster borders at entrances. An observer sees the cluster searches and the
+    abstract search, whose nodes are entrance cells.
+    """
+    start, goal = grid.index(*start), grid.index(*goal)
+    start_cluster, goal_cluster = abstraction.cluster_of(start), abstraction.cluster_of(goal)
+    nodes_expanded = 0
+
+    # Connect start to the entrances of its cluster and those of the goal's cluster to goal
+    start_edges = []
+    entrances = abstraction.nodes_in_cluster(start_cluster)
+    context, expanded = cluster_search(grid, start, entrances + [goal], abstraction.cluster_bounds(start_cluster),
+                                       observer=observer)
+    nodes_expanded += expanded
+    for node in entrances:
+        if context.is_closed(node):
+            start_edges.append((node, context.g[node]))
+    # Direct route when both ends share a cluster
+    best_cost = context.g[goal] if start_cluster == goal_cluster and context.is_closed(goal) else float('inf')
+    best_path = None
+    if best_cost < float('inf'):
+        best_path = [grid.coords(index) for index in context.path_to(goal)]
+
+    to_goal = {}
+    entrances = abstraction.nodes_in_cluster(goal_cluster)
+    context, expanded = cluster_search(grid, goal, entrances, abstraction.cluster_bounds(goal_cluster), backward=True,
+                                       observer=observer)
+    nodes_expanded += expanded
+    for node in entrances:
+        if context.is_closed(node):
+            to_goal[node] = context.g[node]
+
+    # A* over the abstract graph
+    g_cost = {start: 0}
+    parents = {start: None}
+    closed = set()
+    open_set = [(heuristic(grid, start, goal), 0, start)]
+    if observer is not None:
+        observer.on_push(start, open_set[0][0], 1)
+    while open_set:
+        priority, cost, current = heapq.heappop(open_set)
+        if current in closed:
+            if observer is not None:
+                observer.on_stale_pop(current)
+            continue
+        if priority >= best_cost:
+            break
+        closed.add(current)
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(current, priority)
+            observer.on_expand(current, cost)
+        if current == goal:
+            break
+
+        neighbors = abstraction.edges.get(current, [])
+        if current == start:
+            neighbors = neighbors + start_edges
+        if current in to_goal:
+            neighbors = neighbors + [(goal, to_goal[current])]
+        for neighbor, edge_cost in neighbors:
+            new_cost = cost + edge_cost
+            if neighbor not in closed and new_cost < g_cost.get(neighbor, float('inf')):
+                g_cost[neighbor] = new_cost
+                parents[neighbor] = current
+                heapq.heappush(open_set, (new_cost + heuristic(grid, neighbor, goal), new_cost, neighbor))
+                if observer is not None:
+                    observer.on_relax(neighbor, current, new_cost)
+                    observer.on_push(neighbor, open_set[-1][0], len(open_set))
+
+    if goal in closed and g_cost[goal] < best_cost:
+        abstract_path = []
+        node = goal
+        while node is not None:
+            abstract_path.append(node)
+            node = parents[node]
+        abstract_path.reverse()
+        best_path, expanded = _refine(grid, abstraction, abstract_path, observer)
+        best_cost = g_cost[goal]
+        nodes_expanded += expanded
+
+    if best_path is None:
+        return [], nodes_expanded, 0
+    if observer is not None:
+        observer.on_goal(goal, best_cost)
+    return best_path, nodes_expanded, best_cost
+
+
+def main():
+    maze_file_path = "common/grids/maze_50x50_4directions.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    start, goal, grid, _ = read_grid(maze_file_path, cost_file_path)
+
+    abstraction_path = "common/grids/.cache/maze_50x50_4directions.hpa.npz"
+    abstraction = load_or_build_abstraction(grid, abstraction_path, cluster_size=10)
+    print(f"Abstract graph: {abstraction.node_count} nodes, {abstraction.edge_count} edges")
+
+    astar_graph_pathfind(start, goal, grid)
+    hpa_pathfind(start, goal, grid, abstraction)
+
+if __name__ == "__main__":
+    main()
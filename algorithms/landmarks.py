@@ -0,0 +1,192 @@
+import os
+import numpy as np
+from common.grid import read_grid
+from algorithms.astar import astar_graph_pathfind, heuristic as manhattan
+from algorithms.ucs import ucs_cost_map
+from algorithms.batch import random_queries
+
+# ALT heuristic (A*, Landmarks, Triangle inequality). For a landmark L the
+# triangle inequality gives two lower bounds on the cost from v to goal t:
+#   d(L, t) - d(L, v)   and   d(v, L) - d(t, L)
+# The tables hold exact costs from the grid's real cost model (cell cost plus
+# direction cost), so the bounds also account for the asymmetric moves.
+
+LANDMARKS_VERSION = 2
+MAX_GOAL_CACHE = 64
+
+
+class LandmarkHeuristic:
+    """
+    Admissible and consistent heuristic built from landmark cost tables.
+    from_landmark[i, v] is the cost from landmark i to cell v and
+    to_landmark[i, v] the cost from v to landmark i; unreachable is the dtype max.
+    Can be passed as heuristic= to astar_graph_pathfind / astar_tree_pathfind.
+    count and seed are the build_landmarks arguments; selection can stop early,
+    so there may be fewer than count landmarks.
+    """
+    def __init__(self, landmarks, from_landmark, to_landmark, fingerprint, count=None, seed=None):
+        self.landmarks = list(landmarks)
+        self.count = count if count is not None else len(self.landmarks)
+        self.seed = seed
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+        self.fingerprint = fingerprint
+        self.unreachable = np.iinfo(from_landmark.dtype).max
+        # memoryview rows give fast scalar access inside the search loop
+        self._rows = [(memoryview(f), memoryview(t)) for f, t in zip(from_landmark, to_landmark)]
+        self._goal_terms = {}
+
+    @property
+    def nbytes(self):
+        return self.from_landmark.nbytes + self.to_landmark.nbytes
+
+    def _terms(self, goal):
+        terms = self._goal_terms.get(goal)
+        if terms is None:
+            terms = []
+            for from_row, to_row in self._rows:
+                terms.append((from_row, to_row, from_row[goal], to_row[goal]))
+            if len(self._goal_terms) >= MAX_GOAL_CACHE:
+                self._goal_terms.clear()
+            self._goal_terms[goal] = terms
+        return terms
+
+    def __call__(self, grid, index, goal):
+        unreachable = self.unreachable
+        best = manhattan(grid, index, goal)
+        for from_row, to_row, from_goal, to_goal in self._terms(goal):
+            from_index = from_row[index]
+            if from_index != unreachable and from_goal != unreachable and from_goal - from_index > best:
+                best = from_goal - from_index
+            to_index = to_row[index]
+            if to_index != unreachable and to_goal != unreachable and to_index - to_goal > best:
+                best = to_index - to_goal
+        return best
+
+
+def _compact(costs):
+    # Smallest unsigned dtype that holds every finite cost plus the unreachable marker
+    finite = costs[np.isfinite(costs)]
+    largest = finite.max() if len(finite) else 0
+    dtype = np.uint16 if largest < np.iinfo(np.uint16).max else np.uint32
+    return np.where(np.isfinite(costs), costs, np.iinfo(dtype).max).astype(dtype)
+
+
+def build_landmarks(grid, count=8, seed=None):
+    """
+    Picks landmarks by farthest-point selection and computes their exact
+    forward and backward cost tables. The first landmark is the cell farthest
+    from a random walkable cell; each next one is the cell whose round-trip
+    cost to its closest chosen landmark is largest.
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.flatnonzero(grid.walkable.reshape(-1))
+    if len(cells) == 0:
+        raise ValueError("grid has no walkable cells")
+
+    seed_cell = grid.coords(int(rng.choice(cells)))
+    costs, _ = ucs_cost_map(seed_cell, grid)
+    candidate = int(np.argmax(np.where(np.isfinite(costs), costs, -1)))
+
+    landmarks, from_tables, to_tables = [], [], []
+    closest = np.full(grid.size, np.inf)
+    for _ in range(count):
+        from_costs, _ = ucs_cost_map(grid.coords(candidate), grid)
+        to_costs, _ = ucs_cost_map(grid.coords(candidate), grid, backward=True)
+        landmarks.append(candidate)
+        from_tables.append(from_costs)
+        to_tables.append(to_costs)
+
+        # Round-trip cost to the nearest landmark; cells no landmark reaches stay inf
+        closest = np.minimum(closest, from_costs + to_costs)
+        spread = np.where(np.isfinite(closest), closest, -1)
+        spread[landmarks] = -1
+        if spread.max() <= 0:
+            break
+        candidate = int(np.argmax(spread))
+
+    # Compact both directions together so they share one dtype and unreachable marker
+    from_landmark, to_landmark = _compact(np.array([from_tables, to_tables]))
+    return LandmarkHeuristic(landmarks, from_landmark, to_landmark, grid.fingerprint(), count, seed)
+
+
+def save_landmarks(heuristic, path):
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            version=LANDMARKS_VERSION,
+            landmarks=np.asarray(heuristic.landmarks, dtype=np.int64),
+            from_landmark=heuristic.from_landmark,
+            to_landmark=heuristic.to_landmark,
+            fingerprint=heuristic.fingerprint,
+            count=heuristic.count,
+            seed=-1 if heuristic.seed is None else heuristic.seed,  # seeds are never negative
+        )
+
+
+def load_landmarks(path):
+    with np.load(path) as data:
+        if int(data["version"]) != LANDMARKS_VERSION:
+            raise ValueError(f"{path} is not a version {LANDMARKS_VERSION} landmark file")
+        seed = int(data["seed"])
+        return LandmarkHeuristic(data["landmarks"].tolist(), data["from_landmark"], data["to_landmark"],
+                                 str(data["fingerprint"]), int(data["count"]), None if seed < 0 else seed)
+
+
+def load_or_build_landmarks(grid, path, count=8, seed=None):
+    """
+    Loads the landmark tables saved at path if they were built for grid with
+    the same count and seed, else builds and saves them.
+    """
+    if os.path.exists(path):
+        try:
+            landmarks = load_landmarks(path)
+            if landmarks.fingerprint == grid.fingerprint() and landmarks.count == count and landmarks.seed == seed:
+                return landmarks
+        except (ValueError, KeyError, OSError):
+            pass
+    landmarks = build_landmarks(grid, count, seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    save_landmarks(landmarks, path)
+    return landmarks
+
+
+def benchmark_landmarks(grid, landmarks, starts, goals):
+    """
+    Runs A* with the Manhattan and the landmark heuristic on the same queries.
+    Returns total nodes expanded for each and checks that path costs agree.
+    """
+    search = astar_graph_pathfind.__wrapped__
+    manhattan_expanded = 0
+    landmark_expanded = 0
+    for start, goal in zip(map(tuple, starts.tolist()), map(tuple, goals.tolist())):
+        _, expanded, cost = search(start, goal, grid)
+        manhattan_expanded += expanded
+        _, expanded, landmark_cost = search(start, goal, grid, heuristic=landmarks)
+        landmark_expanded += expanded
+        if cost != landmark_cost:
+            raise AssertionError(f"landmark heuristic changed the path cost for {start} -> {goal}")
+    return {
+        "queries": len(starts),
+        "manhattan_nodes_expanded": manhattan_expanded,
+        "landmark_nodes_expanded": landmark_expanded,
+        "reduction": 1 - landmark_expanded / manhattan_expanded if manhattan_expanded else 0.0,
+    }
+
+
+def main():
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    for name in ["mirror_maze_50x50", "mirror_maze_50x50_2", "maze_50x50_4directions"]:
+        _, _, grid, _ = read_grid(f"common/grids/{name}.xlsx", cost_file_path)
+        landmarks = load_or_build_landmarks(grid, f"common/grids/.cache/{name}.landmarks.npz", count=8, seed=0)
+        starts, goals = random_queries(grid, 200, seed=1)
+        result = benchmark_landmarks(grid, landmarks, starts, goals)
+
+        print(f"######### {name.upper()} #########")
+        print(f"Landmarks: {len(landmarks.landmarks)} ({landmarks.nbytes / 1024:.1f} KB)")
+        print(f"Manhattan Nodes Expanded: {result['manhattan_nodes_expanded']}")
+        print(f"Landmark Nodes Expanded: {result['landmark_nodes_expanded']}")
+        print(f"Reduction: {result['reduction']:.1%}")
+
+if __name__ == "__main__":
+    main()
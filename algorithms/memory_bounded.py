@@ -0,0 +1,333 @@
+import heapq
+import itertools
+from common.grid import read_grid
+from common.performance import track_performance
+from common.adjacency import get_adjacency
+from algorithms.astar import heuristic
+
+# Searches whose memory does not grow with the map. IDA* and iterative
+# deepening DFS keep only the current path (O(depth)), SMA* keeps at most
+# max_nodes search nodes. None of them uses a SearchContext, whose arrays
+# are sized to the whole grid. They pay for it in time: nodes reached along
+# several paths are expanded again. IDA* and iterative deepening revisit
+# every path within their bound, which grows exponentially with the map, so
+# they suit small maps and corridors; SMA* degrades gradually as max_nodes
+# drops below what A* would store. Like astar_*, each returns
+# ((path, nodes_expanded, total_cost), performance_metrics) with peak_memory
+# from track_performance.
+
+# sma_star gives up on an f level after this many times max_nodes expansions
+THRASH_FACTOR = 100
+
+
+@track_performance
+def ida_star(start, goal, grid, heuristic=heuristic, moves=4, observer=None):
+    """
+    Iterative deepening A*: depth-first passes bounded by f = g + h, each pass
+    raising the bound to the smallest f that exceeded the last one. Optimal
+    for an admissible heuristic. Memory is the current path and one edge
+    cursor per path cell.
+    """
+    nodes_expanded = 0
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    bound = heuristic(grid, start, goal)
+    while True:
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_expand(start, 0)
+        if start == goal:
+            if observer is not None:
+                observer.on_goal(start, 0)
+            return [grid.coords(start)], nodes_expanded, 0
+
+        # Explicit recursion: cell, cost and next edge to try for every path cell
+        path, costs, edges = [start], [0], [indptr[start]]
+        on_path = {start}
+        next_bound = float('inf')
+
+        while path:
+            node = path[-1]
+            edge = edges[-1]
+            if edge == indptr[node + 1]:
+                # Every edge tried: backtrack
+                path.pop()
+                costs.pop()
+                edges.pop()
+                on_path.discard(node)
+                continue
+            edges[-1] = edge + 1
+
+            neighbor = indices[edge]
+            if neighbor in on_path:
+                continue
+            cost = costs[-1] + weights[edge]
+            f = cost + heuristic(grid, neighbor, goal)
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+
+            nodes_expanded += 1
+            if observer is not None:
+                observer.on_relax(neighbor, node, cost)
+                observer.on_expand(neighbor, cost)
+            if neighbor == goal:
+                if observer is not None:
+                    observer.on_goal(neighbor, cost)
+                return [grid.coords(i) for i in path] + [grid.coords(neighbor)], nodes_expanded, cost
+
+            path.append(neighbor)
+            costs.append(cost)
+            edges.append(indptr[neighbor])
+            on_path.add(neighbor)
+
+        if next_bound == float('inf'):
+            return [], nodes_expanded, 0
+        bound = next_bound
+
+
+@track_performance
+def iddfs(start, goal, grid, max_depth=None, moves=4, observer=None):
+    """
+    Iterative deepening DFS: depth-limited DFS with limits 0, 1, 2, ... moves.
+    Finds a path with the fewest moves (not the cheapest) using O(depth) memory.
+    max_depth stops the deepening early; None searches until no pass is cut off.
+    """
+    nodes_expanded = 0
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    for limit in itertools.count():
+        if max_depth is not None and limit > max_depth:
+            break
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_expand(start, 0)
+        if start == goal:
+            if observer is not None:
+                observer.on_goal(start, 0)
+            return [grid.coords(start)], nodes_expanded, 0
+
+        path, costs, edges = [start], [0], [indptr[start]]
+        on_path = {start}
+        cut_off = False  # Whether the limit pruned anything, i.e. a deeper pass can find more
+
+        while path:
+            node = path[-1]
+            edge = edges[-1]
+            if edge == indptr[node + 1] or len(path) > limit:
+                if len(path) > limit and edge != indptr[node + 1]:
+                    cut_off = True
+                path.pop()
+                costs.pop()
+                edges.pop()
+                on_path.discard(node)
+                continue
+            edges[-1] = edge + 1
+
+            neighbor = indices[edge]
+            if neighbor in on_path:
+                continue
+            cost = costs[-1] + weights[edge]
+
+            nodes_expanded += 1
+            if observer is not None:
+                observer.on_relax(neighbor, node, 0)
+                observer.on_expand(neighbor, 0)
+            if neighbor == goal:
+                if observer is not None:
+                    observer.on_goal(neighbor, cost)
+                return [grid.coords(i) for i in path] + [grid.coords(neighbor)], nodes_expanded, cost
+
+            path.append(neighbor)
+            costs.append(cost)
+            edges.append(indptr[neighbor])
+            on_path.add(neighbor)
+
+        if not cut_off:
+            break
+
+    return [], nodes_expanded, 0
+
+
+class _Node:
+    """
+    SMA* search node. children counts the node's successors still in memory,
+    forgotten is the lowest f among successors pruned since its last expansion.
+    """
+    __slots__ = ("index", "g", "f", "depth", "parent", "children", "forgotten", "stamp")
+
+    def __init__(self, index, g, f, depth, parent):
+        self.index = index
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.children = 0
+        self.forgotten = float('inf')
+        self.stamp = 0  # Bumped whenever the node is queued or taken out, so older heap entries go stale
+
+
+@track_performance
+def sma_star(start, goal, grid, max_nodes=10000, heuristic=heuristic, moves=4, observer=None):
+    """
+    Simplified memory-bounded A*. At most max_nodes search nodes (about 150
+    bytes each) are kept. When the limit is hit, the leaf with the highest f
+    (shallowest first) is pruned and its f is backed up into its parent. The
+    parent is queued again with that f and regenerates the pruned successors
+    once it is the best choice. Optimal when the cheapest path fits in
+    max_nodes together with the nodes needed along it; returns an empty path
+    when it does not, or when one f level expands more than THRASH_FACTOR *
+    max_nodes nodes, which happens when the cap is far below what A* needs.
+    """
+    if max_nodes < 2:
+        raise ValueError("max_nodes must be at least 2")
+    nodes_expanded = 0
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
+
+    # Queued nodes are leaves or nodes with pruned successors, in both heaps.
+    # Entries whose stamp no longer matches their node's are stale.
+    best, worst = [], []
+    counter = itertools.count()
+    in_memory = {}  # cell -> cheapest node for it in memory, to drop dominated duplicates
+    stored = 0
+    level, level_expansions = -1, 0  # Highest f expanded so far and expansions at it
+
+    def queue(node, f):
+        node.stamp += 1
+        tie = next(counter)
+        heapq.heappush(best, (f, -node.depth, tie, node.stamp, node))
+        heapq.heappush(worst, (-f, node.depth, tie, node.stamp, node))
+        if observer is not None:
+            observer.on_push(node.index, f, stored)
+
+    def forget(node):
+        # Removes a leaf from memory and backs its f up into the parent
+        nonlocal stored
+        stored -= 1
+        node.stamp += 1
+        if in_memory.get(node.index) is node:
+            del in_memory[node.index]
+        parent = node.parent
+        parent.children -= 1
+        parent.forgotten = min(parent.forgotten, node.f)
+        if parent.children == 0:
+            parent.f = parent.forgotten
+            queue(parent, parent.f)
+        elif parent.forgotten < float('inf'):
+            queue(parent, parent.forgotten)
+
+    root = _Node(start, 0, heuristic(grid, start, goal), 0, None)
+    in_memory[start] = root
+    stored = 1
+    queue(root, root.f)
+
+    while best:
+        f, _, _, stamp, node = heapq.heappop(best)
+        if stamp != node.stamp:
+            if observer is not None:
+                observer.on_stale_pop(node.index)
+            continue
+        if f == float('inf'):
+            break  # Everything left is a dead end
+        # Nodes pruned at the current f level are regenerated at the same
+        # level. A level that keeps expanding far more nodes than fit in
+        # memory is thrashing and would not finish in reasonable time.
+        if f > level:
+            level, level_expansions = f, 0
+        level_expansions += 1
+        if level_expansions > THRASH_FACTOR * max_nodes:
+            break
+        node.stamp += 1
+        nodes_expanded += 1
+        if observer is not None:
+            observer.on_pop(node.index, f)
+            observer.on_expand(node.index, node.g)
+
+        if node.index == goal:
+            if observer is not None:
+                observer.on_goal(node.index, node.g)
+            cost, path = node.g, []
+            while node is not None:
+                path.append(grid.coords(node.index))
+                node = node.parent
+            path.reverse()
+            return path, nodes_expanded, cost
+
+        # Successors still in memory are skipped below, so a partly pruned
+        # node only regenerates the ones it lost
+        node.forgotten = float('inf')
+        for edge in range(indptr[node.index], indptr[node.index + 1]):
+            neighbor = indices[edge]
+            g = node.g + weights[edge]
+            known = in_memory.get(neighbor)
+            if known is not None and known.g <= g:
+                continue  # A node in memory reaches this cell at least as cheaply
+            if neighbor != goal and node.depth + 2 >= max_nodes:
+                child_f = float('inf')  # Its path already fills the memory, so it can never reach the goal
+            else:
+                # Pathmax: a child is never cheaper than the f its parent was expanded with
+                child_f = max(f, g + heuristic(grid, neighbor, goal))
+            child = _Node(neighbor, g, child_f, node.depth + 1, node)
+            in_memory[neighbor] = child
+            node.children += 1
+            stored += 1
+            queue(child, child_f)
+            if observer is not None:
+                observer.on_relax(neighbor, node.index, g)
+
+        if node.children == 0:
+            # Dead end: nothing left below this node
+            node.f = float('inf')
+            if node.parent is None:
+                break
+            forget(node)
+            continue
+
+        while stored > max_nodes:
+            victim = _pop_worst(worst)
+            if victim is None or victim.parent is None:
+                return [], nodes_expanded, 0  # Only the root is left: the path does not fit
+            forget(victim)
+
+        # Stale entries would let the heaps outgrow the node limit, so drop them now and then
+        if len(best) > 4 * max_nodes:
+            best[:] = [entry for entry in best if entry[3] == entry[4].stamp]
+            worst[:] = [entry for entry in worst if entry[3] == entry[4].stamp]
+            heapq.heapify(best)
+            heapq.heapify(worst)
+
+    return [], nodes_expanded, 0
+
+
+def _pop_worst(worst):
+    # Only leaves can be pruned. Queued nodes that still have successors are
+    # dropped here; they are queued again when their last successor goes.
+    while worst:
+        _, _, _, stamp, node = heapq.heappop(worst)
+        if stamp == node.stamp and node.children == 0:
+            return node
+    return None
+
+
+def main():
+    maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
+    cost_file_path = "common/grids/node_costs_50x50.xlsx"
+    start, goal, grid, grid_shape = read_grid(maze_file_path, cost_file_path)
+
+    algorithm = input("Select memory-bounded search (ida/iddfs/sma): ").strip().lower()
+    if algorithm == "ida":
+        ida_star(start, goal, grid)
+    elif algorithm == "iddfs":
+        iddfs(start, goal, grid)
+    elif algorithm == "sma":
+        max_nodes = input("Node limit [10000]: ").strip()
+        sma_star(start, goal, grid, max_nodes=int(max_nodes or 10000))
+    else:
+        print("Invalid choice! Exiting.")
+
+
+if __name__ == "__main__":
+    main()
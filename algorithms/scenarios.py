@@ -0,0 +1,189 @@
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+from functools import partial
+import numpy as np
+from common.get_neighbors import DIRECTIONS
+from common.map_formats import read_movingai_map, read_movingai_scenario
+from common.performance import memory_tracking
+from algorithms.astar import astar_graph_pathfind
+from algorithms.anytime import weighted_astar
+from algorithms.bfs import bfs_graph
+from algorithms.dfs import dfs_graph
+from algorithms.ucs import ucs_graph_pathfind
+
+# Replays MovingAI .scen query sets and checks each path against the optimal
+# length listed in the file. The benchmarks use octile movement: 8 directions,
+# straight steps cost 1, diagonal steps sqrt(2), and no cutting past a wall
+# corner, which is the repo's diagonal rule too. Costs are integers here, so
+# steps are scaled by OCTILE_SCALE and diagonals rounded; the check itself
+# measures the returned path in true octile length.
+OCTILE_SCALE = 100000
+DIAGONAL_COST = round(OCTILE_SCALE * math.sqrt(2))
+OCTILE_MOVES = {
+    **{step: OCTILE_SCALE for step in DIRECTIONS},
+    **{(dx, dy): DIAGONAL_COST for dx in (-1, 1) for dy in (-1, 1)},
+}
+TOLERANCE = 1e-4
+
+
+def octile_heuristic(grid, index, goal):
+    x, y = divmod(index, grid.columns)
+    goal_x, goal_y = divmod(goal, grid.columns)
+    dx, dy = abs(x - goal_x), abs(y - goal_y)
+    return DIAGONAL_COST * min(dx, dy) + OCTILE_SCALE * abs(dx - dy)
+
+
+# Raw search functions on the octile move model: (start, goal, grid) -> (path, nodes_expanded, ..., total_cost)
+SEARCHES = {
+    "astar": partial(astar_graph_pathfind.__wrapped__, heuristic=octile_heuristic, moves=OCTILE_MOVES),
+    "weighted_astar": partial(weighted_astar.__wrapped__, heuristic=octile_heuristic, moves=OCTILE_MOVES),
+    "ucs": partial(ucs_graph_pathfind, moves=OCTILE_MOVES),
+    "bfs": partial(bfs_graph.__wrapped__, moves=OCTILE_MOVES),
+    "dfs": partial(dfs_graph, moves=OCTILE_MOVES),
+}
+# Searches whose paths must match the listed optimum; the others only have to be valid
+OPTIMAL_SEARCHES = {"astar", "ucs"}
+
+
+def octile_length(grid, path):
+    """
+    Octile length of a path of (x, y) cells, or None if it is not a valid
+    8-connected path through walkable cells that never cuts a wall corner.
+    """
+    if not path:
+        return None
+    cells = np.asarray(path, dtype=np.int64)
+    if not grid.walkable[cells[:, 0], cells[:, 1]].all():
+        return None
+    steps = np.diff(cells, axis=0)
+    if len(steps) and (np.abs(steps).max() > 1 or not np.abs(steps).sum(axis=1).all()):
+        return None
+    diagonal = np.abs(steps).sum(axis=1) == 2
+    # Both cells a diagonal step cuts past must be walkable
+    corners = cells[:-1][diagonal]
+    moves = steps[diagonal]
+    if not (grid.walkable[corners[:, 0] + moves[:, 0], corners[:, 1]].all()
+            and grid.walkable[corners[:, 0], corners[:, 1] + moves[:, 1]].all()):
+        return None
+    return (len(steps) - diagonal.sum()) + diagonal.sum() * math.sqrt(2)
+
+
+class ScenarioResult:
+    """
+    Per-query results of one run_scenario call. lengths is the octile length
+    of each returned path (nan for queries without a valid path) and
+    failures lists the query numbers whose path was invalid, missing, or
+    (for optimal searches) not optimal.
+    """
+    def __init__(self, algorithm, scenario, lengths, nodes_expanded, times, failures):
+        self.algorithm = algorithm
+        self.scenario = scenario
+        self.lengths = lengths
+        self.nodes_expanded = nodes_expanded
+        self.times = times
+        self.failures = failures
+
+    @property
+    def solved(self):
+        return int(np.count_nonzero(~np.isnan(self.lengths)))
+
+    @property
+    def optimal(self):
+        return int(np.count_nonzero(np.abs(self.lengths - self.scenario.optimal[:len(self.lengths)]) <= TOLERANCE))
+
+    @property
+    def max_suboptimality(self):
+        # Worst ratio of path length to the listed optimum among solved queries
+        optimal = self.scenario.optimal[:len(self.lengths)]
+        solved = ~np.isnan(self.lengths) & (optimal > 0)
+        return float((self.lengths[solved] / optimal[solved]).max()) if solved.any() else 1.0
+
+
+def run_scenario(grid, scenario, algorithm="astar", limit=None):
+    """
+    Runs every query of a Scenario (or the first limit) through a search in
+    SEARCHES and checks the paths against the listed optimal lengths.
+    """
+    if grid.shape != (scenario.rows, scenario.columns):
+        raise ValueError(f"Scenario is for a {scenario.rows}x{scenario.columns} map, grid is {grid.rows}x{grid.columns}")
+    search = SEARCHES[algorithm]
+    count = len(scenario) if limit is None else min(limit, len(scenario))
+    lengths = np.full(count, np.nan)
+    nodes_expanded = np.zeros(count, dtype=np.int64)
+    times = np.zeros(count)
+    failures = []
+
+    # ucs and dfs trace their own memory unless told not to, which would skew the timings
+    with memory_tracking(False):
+        for query in range(count):
+            start = tuple(int(v) for v in scenario.starts[query])
+            goal = tuple(int(v) for v in scenario.goals[query])
+            start_time = time.perf_counter()
+            result = search(start, goal, grid)
+            times[query] = time.perf_counter() - start_time
+            nodes_expanded[query] = result[1]
+
+            length = octile_length(grid, result[0])
+            optimal = scenario.optimal[query]
+            if length is not None:
+                lengths[query] = length
+            if (length is None or length < optimal - TOLERANCE
+                    or (algorithm in OPTIMAL_SEARCHES and length > optimal + TOLERANCE)):
+                failures.append(query)
+    return ScenarioResult(algorithm, scenario, lengths, nodes_expanded, times, failures)
+
+
+def find_map(scenario_path, map_name):
+    """
+    Locates the map a .scen file names. Scenario files list paths such as
+    maps/dao/arena.map, so the map is looked up next to the .scen file, by
+    the listed path and then by its file name alone.
+    """
+    directory = os.path.dirname(os.path.abspath(scenario_path))
+    for candidate in (os.path.join(directory, map_name), os.path.join(directory, os.path.basename(map_name))):
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"Map {map_name!r} of {scenario_path} not found; pass it with --map")
+
+
+def print_result(result, map_path):
+    scenario = result.scenario
+    count = len(result.lengths)
+    print(f"######### {result.algorithm.upper()} ON {os.path.basename(map_path)} ({count} queries) #########")
+    print(f"Solved: {result.solved} of {count}")
+    print(f"Optimal: {result.optimal} of {count}, worst length/optimal {result.max_suboptimality:.4f}")
+    print(f"Nodes expanded: {int(result.nodes_expanded.sum())} (median {statistics.median(result.nodes_expanded.tolist()):.0f})")
+    print(f"Search time: {result.times.sum():.2f} s (median {statistics.median(result.times.tolist()) * 1000:.3f} ms)")
+    for query in result.failures[:10]:
+        start, goal = tuple(scenario.starts[query].tolist()), tuple(scenario.goals[query].tolist())
+        print(f"  FAILED query {query}: {start} -> {goal}, length {result.lengths[query]:.4f}, "
+              f"optimal {scenario.optimal[query]:.4f}")
+    if len(result.failures) > 10:
+        print(f"  ... and {len(result.failures) - 10} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a MovingAI .scen file and check path lengths against the optimum.")
+    parser.add_argument("scenario", help=".scen file")
+    parser.add_argument("--map", help="the .map file (default: the map the scenario names, next to it)")
+    parser.add_argument("--algorithm", default="astar", choices=sorted(SEARCHES))
+    parser.add_argument("--limit", type=int, help="only run the first LIMIT queries")
+    args = parser.parse_args(argv)
+
+    scenario = read_movingai_scenario(args.scenario)
+    map_path = args.map or find_map(args.scenario, scenario.map_name)
+    start_time = time.perf_counter()
+    grid = read_movingai_map(map_path)
+    print(f"Loaded {map_path} ({grid.rows}x{grid.columns}) in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    result = run_scenario(grid, scenario, args.algorithm, args.limit)
+    print_result(result, map_path)
+    # Like the benchmark, exit with status 1 so scripts notice a failed check
+    sys.exit(1 if result.failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from common.grid import read_grid
+from common.performance import measure_performance
+from algorithms.batch import ALGORITHMS, random_queries
+
+GRID_DIRECTORY = "common/grids"
+COST_FILE_PATH = "common/grids/node_costs_50x50.xlsx"
+METRICS = ["execution_time", "peak_memory", "current_memory", "temporary_memory"]
+
+
+class SimulationJob:
+    """
+    One search run: an algorithm ("astar", "ucs", "bfs", "dfs") and variant
+    ("graph" or "tree") on the grid read from maze_file_path/cost_file_path.
+    Without a seed the grid's own start and goal are used; with one, a seeded
+    random pair of walkable cells.
+    """
+    def __init__(self, maze_file_path, cost_file_path, algorithm, variant="graph", seed=None):
+        if algorithm_name(algorithm, variant) not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm!r} with variant {variant!r}")
+        self.maze_file_path = maze_file_path
+        self.cost_file_path = cost_file_path
+        self.algorithm = algorithm
+        self.variant = variant
+        self.seed = seed
+
+    @property
+    def grid_name(self):
+        return os.path.splitext(os.path.basename(self.maze_file_path))[0]
+
+    def __repr__(self):
+        return f"SimulationJob({self.grid_name}, {self.algorithm}, {self.variant}, seed={self.seed})"
+
+
+def algorithm_name(algorithm, variant):
+    return algorithm if variant == "graph" else f"{algorithm}_{variant}"
+
+
+def available_cpus():
+    """
+    CPUs this process may run on, in a stable order.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+_worker_grids = {}
+
+def _init_worker(cpus, counter):
+    # Give every worker its own CPU so timings do not depend on the scheduler
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpus[slot % len(cpus)]})
+
+def run_job(job):
+    """
+    Runs one job in the current process and returns its result row.
+    Grids are loaded once per process and reused by later jobs.
+    """
+    key = (job.maze_file_path, job.cost_file_path)
+    grid = _worker_grids.get(key)
+    if grid is None:
+        _, _, grid, _ = read_grid(job.maze_file_path, job.cost_file_path)
+        _worker_grids[key] = grid
+
+    if job.seed is None:
+        start, goal = grid.start, grid.goal
+    else:
+        starts, goals = random_queries(grid, 1, seed=job.seed)
+        start, goal = tuple(starts[0].tolist()), tuple(goals[0].tolist())
+
+    result, metrics = measure_performance(ALGORITHMS[algorithm_name(job.algorithm, job.variant)], start, goal, grid)
+    return {
+        "grid": job.grid_name,
+        "algorithm": job.algorithm,
+        "variant": job.variant,
+        "seed": job.seed,
+        "start": start,
+        "goal": goal,
+        "path_length": len(result[0]),
+        "nodes_expanded": result[1],
+        "path_cost": result[-1] if result[0] else None,
+        "worker": os.getpid(),
+        **metrics,
+    }
+
+
+def run_simulation(jobs, workers=None, cpus=None):
+    """
+    Spreads jobs over a process pool and yields each result row as soon as it
+    finishes (not in job order). workers defaults to one per available CPU and
+    every worker is pinned to its own CPU from cpus where the OS allows it.
+    """
+    cpus = list(cpus or available_cpus())
+    workers = workers or len(cpus)
+    context = multiprocessing.get_context()
+    counter = context.Value("i", 0)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(cpus, counter)) as pool:
+        futures = [pool.submit(run_job, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def averages_of(results):
+    return {metric: statistics.mean(r[metric] for r in results) for metric in METRICS}
+
+
+def simulate(jobs, workers=None, cpus=None, on_result=None):
+    """
+    Runs every job and returns (averages, DataFrame) like simulate_astar.
+    averages maps (grid, algorithm, variant) to the mean of each metric.
+    on_result is called with every row as it arrives.
+    """
+    results = []
+    for result in run_simulation(jobs, workers, cpus):
+        if on_result is not None:
+            on_result(result)
+        results.append(result)
+
+    groups = {}
+    for result in results:
+        groups.setdefault((result["grid"], result["algorithm"], result["variant"]), []).append(result)
+    averages = {group: averages_of(rows) for group, rows in groups.items()}
+    import pandas as pd
+    return averages, pd.DataFrame(results)
+
+
+def simulate_parallel(name, maze_file_path, cost_file_path, algorithm="astar", variant="graph",
+                      n_sim_iterations=100, workers=None):
+    """
+    Parallel counterpart of simulate_astar: n_sim_iterations runs of one search
+    on the grid's start and goal, printed and returned the same way.
+    """
+    jobs = [SimulationJob(maze_file_path, cost_file_path, algorithm, variant) for _ in range(n_sim_iterations)]
+    _, df = simulate(jobs, workers)
+    averages = averages_of(df.to_dict("records"))
+
+    print(f"######### {name.upper()} AVERAGES AFTER {n_sim_iterations} ITERATIONS #########")
+    print(f"Average Execution Time: {averages['execution_time']:.4f} seconds")
+    print(f"Average Peak Memory: {averages['peak_memory']:.2f} KB")
+    print(f"Average Current Memory: {averages['current_memory']:.2f} KB")
+    print(f"Average Temporary Memory: {averages['temporary_memory']:.2f} KB")
+
+    return averages, df
+
+
+def sweep_jobs(algorithms=("astar", "ucs", "bfs", "dfs"), variants=("graph", "tree"), seeds=(None,), repeats=1):
+    """
+    Jobs for every maze in common/grids, algorithm, variant and seed.
+    """
+    maze_files = sorted(f for f in os.listdir(GRID_DIRECTORY) if f.endswith(".xlsx") and not f.startswith("node_costs"))
+    return [
+        SimulationJob(os.path.join(GRID_DIRECTORY, maze_file), COST_FILE_PATH, algorithm, variant, seed)
+        for maze_file in maze_files
+        for algorithm in algorithms
+        for variant in variants
+        for seed in seeds
+        for _ in range(repeats)
+    ]
+
+
+def main():
+    jobs = sweep_jobs(seeds=(None, 0, 1, 2), repeats=5)
+    print(f"Running {len(jobs)} jobs on {len(available_cpus())} CPUs")
+
+    finished = 0
+    def progress(result):
+        nonlocal finished
+        finished += 1
+        if finished % 100 == 0 or finished == len(jobs):
+            print(f"{finished}/{len(jobs)} done")
+
+    _, df = simulate(jobs, on_result=progress)
+    summary = df.groupby(["algorithm", "variant"])[METRICS + ["nodes_expanded"]].mean()
+    print(summary.to_string())
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,143 @@
 import heapq
 from common.grid import read_grid
 from common.visualization import visualize_grid
-from common.get_neighbors import get_neighbors
-import time
-import tracemalloc
-
-def reconstruct_path(node):
-    path = []
-    current_node = node
-    while current_node is not None:
-        path.append(current_node)
-        current_node = current_node.parent
-    path.reverse()
-    return path
-
-def ucs_graph_pathfind(start_node, goal_node, grid):
-    tracemalloc.start()
-    start_time = time.perf_counter()
+from common.adjacency import get_adjacency
+from common.search_context import prepare_context
+from common.open_list import make_open_list
+from common.performance import start_measurement, stop_measurement
+import numpy as np
+
+def reconstruct_path(grid, context, index):
+    return [grid.coords(i) for i in context.path_to(index)]
+
+def ucs_graph_pathfind(start, goal, grid, context=None, open_list="binary", moves=4, observer=None):
+    start_time = start_measurement()
     nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
     
-    open_set = []
-    closed_set = {}
-    best_cost = {}
+    open_set = make_open_list(open_list, observer)
     
-    start_node.cost = 0 
-    heapq.heappush(open_set, (0, start_node))
-    best_cost[start_node.state] = 0
+    context.set(start, 0, -1)
+    open_set.push(start, 0)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
     
     while open_set:
         nodes_expanded += 1
-        current_cost, parent_node = heapq.heappop(open_set)
+        current_cost, parent_node = open_set.pop()
+        if observer is not None:
+            observer.on_pop(parent_node, current_cost)
+            observer.on_expand(parent_node, current_cost)
         
-        if parent_node.state == goal_node.state:
-            execution_time = time.perf_counter() - start_time
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            return reconstruct_path(parent_node), nodes_expanded, execution_time, peak - current
+        if parent_node == goal:
+            if observer is not None:
+                observer.on_goal(parent_node, current_cost)
+            execution_time, memory = stop_measurement(start_time)
+            path = reconstruct_path(grid, context, parent_node)
+            return path, nodes_expanded, execution_time, memory, current_cost
         
-        closed_set[parent_node.state] = parent_node
+        context.close(parent_node)
         
-        for neighbor, move_cost in get_neighbors(grid, parent_node):
-            new_cost = parent_node.cost + neighbor.cost + move_cost
-            if neighbor.state not in closed_set and (neighbor.state not in best_cost or new_cost < best_cost[neighbor.state]):
-                neighbor.cost = new_cost
-                neighbor.parent = parent_node
-                best_cost[neighbor.state] = new_cost
-                heapq.heappush(open_set, (neighbor.cost, neighbor))
+        for edge in range(indptr[parent_node], indptr[parent_node + 1]):
+            neighbor = indices[edge]
+            new_cost = current_cost + weights[edge]
+            if not context.is_closed(neighbor) and new_cost < context.cost(neighbor):
+                context.set(neighbor, new_cost, parent_node)
+                open_set.push(neighbor, new_cost)
+                if observer is not None:
+                    observer.on_relax(neighbor, parent_node, new_cost)
+                    observer.on_push(neighbor, new_cost, len(open_set))
     
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    return [], nodes_expanded, time.perf_counter() - start_time, peak - current
+    execution_time, memory = stop_measurement(start_time)
+    return [], nodes_expanded, execution_time, memory, 0
 
-def ucs_tree_pathfind(start_node, goal_node, grid):
-    tracemalloc.start()
-    start_time = time.perf_counter()
+def ucs_tree_pathfind(start, goal, grid, context=None, open_list="binary", moves=4, observer=None):
+    start_time = start_measurement()
     nodes_expanded = 0
+    context = prepare_context(grid, context)
+    indptr, indices, weights = get_adjacency(grid, moves).views
+    start, goal = grid.index(*start), grid.index(*goal)
     
-    open_set = []
-    best_cost = {}
+    open_set = make_open_list(open_list, observer)
     
-    start_node.cost = 0
-    heapq.heappush(open_set, (0, start_node))
-    best_cost[start_node.state] = 0
+    context.set(start, 0, -1)
+    open_set.push(start, 0)
+    if observer is not None:
+        observer.on_push(start, 0, 1)
     
     while open_set:
         nodes_expanded += 1
-        _, parent_node = heapq.heappop(open_set)
+        current_cost, parent_node = open_set.pop()
+        if observer is not None:
+            observer.on_pop(parent_node, current_cost)
+            observer.on_expand(parent_node, current_cost)
         
-        if parent_node.state == goal_node.state:
-            execution_time = time.perf_counter() - start_time
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            return reconstruct_path(parent_node), nodes_expanded, execution_time, peak - current
+        if parent_node == goal:
+            if observer is not None:
+                observer.on_goal(parent_node, current_cost)
+            execution_time, memory = stop_measurement(start_time)
+            path = reconstruct_path(grid, context, parent_node)
+            return path, nodes_expanded, execution_time, memory, current_cost
         
-        for neighbor, move_cost in get_neighbors(grid, parent_node):
-            new_cost = parent_node.cost + neighbor.cost + move_cost
-            if neighbor.state not in best_cost or new_cost < best_cost[neighbor.state]:
-                neighbor.cost = new_cost
-                neighbor.parent = parent_node
-                best_cost[neighbor.state] = new_cost
-                heapq.heappush(open_set, (neighbor.cost, neighbor))
+        for edge in range(indptr[parent_node], indptr[parent_node + 1]):
+            neighbor = indices[edge]
+            new_cost = current_cost + weights[edge]
+            if new_cost < context.cost(neighbor):
+                context.set(neighbor, new_cost, parent_node)
+                open_set.push(neighbor, new_cost)
+                if observer is not None:
+                    observer.on_relax(neighbor, parent_node, new_cost)
+                    observer.on_push(neighbor, new_cost, len(open_set))
     
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    return [], nodes_expanded, time.perf_counter() - start_time, peak - current
+    execution_time, memory = stop_measurement(start_time)
+    return [], nodes_expanded, execution_time, memory, 0
+
+def ucs_cost_map(source, grid, backward=False, context=None, moves=4, observer=None):
+    """
+    Uniform cost search from source over the whole grid, without a goal.
+    Returns (costs, parents) arrays indexed by flat cell index: the cheapest cost
+    from source to every cell, or from every cell to source when backward is
+    True (parents then point one step toward source). Unreachable cells have
+    cost inf and parent -1.
+    """
+    context = prepare_context(grid, context)
+    # The reversed adjacency lists the moves into each cell with their costs
+    indptr, indices, weights = get_adjacency(grid, moves, reverse=backward).views
+    source = grid.index(*source)
+
+    open_set = []
+    context.set(source, 0, -1)
+    heapq.heappush(open_set, (0, source))
+    if observer is not None:
+        observer.on_push(source, 0, 1)
+
+    while open_set:
+        current_cost, parent_node = heapq.heappop(open_set)
+        if context.is_closed(parent_node):
+            if observer is not None:
+                observer.on_stale_pop(parent_node)
+            continue
+        context.close(parent_node)
+        if observer is not None:
+            observer.on_pop(parent_node, current_cost)
+            observer.on_expand(parent_node, current_cost)
+
+        for edge in range(indptr[parent_node], indptr[parent_node + 1]):
+            neighbor = indices[edge]
+            new_cost = current_cost + weights[edge]
+            if not context.is_closed(neighbor) and new_cost < context.cost(neighbor):
+                context.set(neighbor, new_cost, parent_node)
+                heapq.heappush(open_set, (new_cost, neighbor))
+                if observer is not None:
+                    observer.on_relax(neighbor, parent_node, new_cost)
+                    observer.on_push(neighbor, new_cost, len(open_set))
+
+    reached = np.frombuffer(context.seen, dtype=np.uint32) == context.generation
+    costs = np.where(reached, np.frombuffer(context.g, dtype=np.int64), np.inf)
+    parents = np.where(reached, np.frombuffer(context.parent, dtype=np.int64), -1)
+    return costs, parents
 
 def main():    
     maze_file_path = "common/grids/mirror_maze_50x50.xlsx"
@@ -103,18 +157,20 @@ def main():
     total_path_cost = 0
     total_memory_usage = 0
 
+    # The grid is read-only, so one load serves every run
+    start, goal, grid, _ = read_grid(maze_file_path, cost_file_path)
+
     for _ in range(runs):
-        start_node, goal_node, grid, _ = read_grid(maze_file_path, cost_file_path)
         if algorithm == "tree":
-            path, nodes_expanded, execution_time, memory_usage = ucs_tree_pathfind(start_node, goal_node, grid)
+            path, nodes_expanded, execution_time, memory_usage, path_cost = ucs_tree_pathfind(start, goal, grid)
         elif algorithm == "graph":
-            path, nodes_expanded, execution_time, memory_usage = ucs_graph_pathfind(start_node, goal_node, grid)
+            path, nodes_expanded, execution_time, memory_usage, path_cost = ucs_graph_pathfind(start, goal, grid)
 
         total_path_length += len(path)
         total_nodes_expanded += nodes_expanded
         total_execution_time += execution_time
         total_memory_usage += memory_usage
-        total_path_cost += path[-1].cost if path else None
+        total_path_cost += path_cost
 
     avg_path_length = total_path_length / runs
     avg_nodes_expanded = total_nodes_expanded / runs
@@ -128,7 +184,7 @@ def main():
     print(f"Average Execution Time: {avg_execution_time * 1000:.3f} milliseconds")
     print(f"Average Memory Usage: {avg_memory_usage / 1024:.2f} KB")
     
-    visualize_grid(start_node, goal_node, grid, path, algorithm)
+    visualize_grid(start, goal, grid, path, algorithm)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
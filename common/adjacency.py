@@ -0,0 +1,115 @@
+import weakref
+import numpy as np
+from common.get_neighbors import MOVEMENT_COSTS, DIRECTIONS
+
+# Move models map a step (dx, dy) to its direction cost. The order of a table is
+# the order neighbors are visited in, which decides ties in BFS and DFS.
+FOUR_CONNECTED = {step: MOVEMENT_COSTS[step] for step in DIRECTIONS}
+EIGHT_CONNECTED = {
+    **FOUR_CONNECTED,
+    (-1, -1): 6,  # Up-left
+    (-1, 1): 5,   # Up-right
+    (1, -1): 5,   # Down-left
+    (1, 1): 4,    # Down-right
+}
+MOVE_MODELS = {4: FOUR_CONNECTED, 8: EIGHT_CONNECTED}
+
+_adjacency = weakref.WeakKeyDictionary()
+
+
+def move_table(moves=4):
+    """
+    Returns the direction-cost dict for a move model: 4, 8 or a custom
+    {(dx, dy): cost} table. Manhattan distance stays an admissible A* heuristic
+    as long as no move costs less than the number of axes it changes.
+    """
+    if isinstance(moves, dict):
+        return moves
+    if moves not in MOVE_MODELS:
+        raise ValueError(f"Unknown move model {moves!r}, expected 4, 8 or a {{(dx, dy): cost}} dict")
+    return MOVE_MODELS[moves]
+
+
+class Adjacency:
+    """
+    Compressed sparse row edge list of a grid. The edges leaving cell i are
+    indices[indptr[i]:indptr[i + 1]], each costing the matching weights entry
+    (cost of the entered cell plus the direction cost). Edges into or out of
+    walls are left out. A reversed adjacency lists the edges entering each cell
+    instead, with the same weights, for backward searches.
+    """
+    def __init__(self, indptr, indices, weights, moves, reverse, version):
+        self.indptr = indptr    # int64, size + 1
+        self.indices = indices  # int32 neighbor cells
+        self.weights = weights  # int32 edge costs
+        self.moves = moves
+        self.reverse = reverse
+        self.version = version
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    @property
+    def views(self):
+        # memoryviews give plain Python ints inside the search loops
+        return memoryview(self.indptr), memoryview(self.indices), memoryview(self.weights)
+
+    def neighbors(self, index):
+        """
+        Returns (neighbor_index, edge_cost) pairs, like get_neighbors but with walls removed.
+        """
+        start, end = self.indptr[index], self.indptr[index + 1]
+        return list(zip(self.indices[start:end].tolist(), self.weights[start:end].tolist()))
+
+
+def build_adjacency(grid, moves=4, reverse=False):
+    """
+    Builds the Adjacency of grid for a move model. Only moves between
+    walkable cells become edges, and diagonal moves are only allowed when both
+    cells they cut past are walkable.
+    """
+    table = move_table(moves)
+    rows, columns = grid.shape
+    walkable = grid.walkable.reshape(-1)
+    cost = grid.cost.reshape(-1)
+    cells = np.arange(grid.size, dtype=np.int64)
+    x, y = np.divmod(cells, columns)
+
+    sources, targets, weights = [], [], []
+    for (dx, dy), move_cost in table.items():
+        new_x, new_y = x + dx, y + dy
+        # Walls have no edges in or out, so a reversed adjacency never makes one a predecessor
+        allowed = walkable & (0 <= new_x) & (new_x < rows) & (0 <= new_y) & (new_y < columns)
+        target = np.where(allowed, new_x * columns + new_y, 0)
+        allowed &= walkable[target]
+        if dx and dy:
+            allowed &= walkable[np.where(allowed, new_x * columns + y, 0)]
+            allowed &= walkable[np.where(allowed, x * columns + new_y, 0)]
+        source, target = cells[allowed], target[allowed]
+        sources.append(target if reverse else source)
+        targets.append(source if reverse else target)
+        weights.append(cost[target] + move_cost)
+
+    sources = np.concatenate(sources)
+    # A stable sort keeps each cell's edges in move table order
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(grid.size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=grid.size), out=indptr[1:])
+    indices = np.concatenate(targets)[order].astype(np.int32)
+    weights = np.concatenate(weights)[order].astype(np.int32)
+    return Adjacency(indptr, indices, weights, table, reverse, grid.version)
+
+
+def get_adjacency(grid, moves=4, reverse=False):
+    """
+    Returns the Adjacency of grid for a move model, built once and reused until
+    the grid's version changes.
+    """
+    table = move_table(moves)
+    key = (tuple(table.items()), reverse)
+    built = _adjacency.setdefault(grid, {})
+    adjacency = built.get(key)
+    if adjacency is None or adjacency.version != grid.version:
+        adjacency = built[key] = build_adjacency(grid, table, reverse)
+    return adjacency
@@ -0,0 +1,93 @@
+import hashlib
+import numpy as np
+
+
+class CompactGrid:
+    """
+    Grid stored as NumPy arrays instead of one Node object per cell.
+    Cells are addressed by (x, y) or by flat index x * columns + y.
+
+    The arrays are read-only so one grid can be shared by many searches; search
+    state lives in a SearchContext. Use set_walkable to change the map, which
+    bumps version.
+    """
+    def __init__(self, walkable, cost, start=None, goal=None):
+        self.walkable = np.ascontiguousarray(walkable, dtype=np.bool_)
+        self.cost = np.ascontiguousarray(cost, dtype=np.int32)
+        if self.walkable.shape != self.cost.shape:
+            raise ValueError("walkable and cost arrays must have the same shape")
+        self.walkable.flags.writeable = False
+        self.cost.flags.writeable = False
+        self.rows, self.columns = self.walkable.shape
+        self.start = start  # (x, y) or None
+        self.goal = goal    # (x, y) or None
+        self.version = 0
+
+    @property
+    def shape(self):
+        return self.rows, self.columns
+
+    @property
+    def size(self):
+        return self.rows * self.columns
+
+    @property
+    def nbytes(self):
+        return self.walkable.nbytes + self.cost.nbytes
+
+    @property
+    def flat_walkable(self):
+        # memoryview indexing returns plain Python values, which is much faster
+        # than indexing the NumPy array inside the search loops
+        return memoryview(self.walkable.reshape(-1))
+
+    @property
+    def flat_cost(self):
+        return memoryview(self.cost.reshape(-1))
+
+    def fingerprint(self):
+        """
+        Hash of the shape, walkability and costs. Used to reject precomputed
+        data (abstractions, landmark tables) built for a different map.
+        """
+        digest = hashlib.sha1()
+        digest.update(np.asarray(self.shape, dtype=np.int64).tobytes())
+        digest.update(self.walkable.tobytes())
+        digest.update(self.cost.tobytes())
+        return digest.hexdigest()
+
+    def index(self, x, y):
+        return x * self.columns + y
+
+    def coords(self, index):
+        return divmod(index, self.columns)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.rows and 0 <= y < self.columns
+
+    def is_walkable(self, x, y):
+        return bool(self.walkable[x, y])
+
+    def set_walkable(self, cells, is_walkable):
+        """
+        Sets walkability for a sequence of (x, y) cells.
+        """
+        cells = np.asarray(cells, dtype=np.intp).reshape(-1, 2)
+        self.walkable.flags.writeable = True
+        try:
+            self.walkable[cells[:, 0], cells[:, 1]] = is_walkable
+        finally:
+            self.walkable.flags.writeable = False
+        self.version += 1
+
+    def set_cost(self, cells, cost):
+        """
+        Sets the cell cost for a sequence of (x, y) cells.
+        """
+        cells = np.asarray(cells, dtype=np.intp).reshape(-1, 2)
+        self.cost.flags.writeable = True
+        try:
+            self.cost[cells[:, 0], cells[:, 1]] = cost
+        finally:
+            self.cost.flags.writeable = False
+        self.version += 1
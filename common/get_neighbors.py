@@ -1,17 +1,49 @@
-def get_neighbors(grid, node):
-    movement_costs = {
-        (0, 1): 1,  # Right
-        (0, -1): 2, # Left
-        (1, 0): 3,  # Down
-        (-1, 0): 4  # Up
-    }
-    rows, cols = len(grid), len(grid[0])
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+MOVEMENT_COSTS = {
+    (0, 1): 1,  # Right
+    (0, -1): 2, # Left
+    (1, 0): 3,  # Down
+    (-1, 0): 4  # Up
+}
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+def get_neighbors(grid, index):
+    """
+    Returns (neighbor_index, move_cost) for every in-bounds neighbor of a flat cell index.
+    """
+    rows, cols = grid.rows, grid.columns
+    x, y = divmod(index, cols)
     neighbors = []
 
-    for dx, dy in directions:
-        new_x, new_y = node.x + dx, node.y + dy
+    for dx, dy in DIRECTIONS:
+        new_x, new_y = x + dx, y + dy
         if 0 <= new_x < rows and 0 <= new_y < cols:
-            move_cost = movement_costs[(dx, dy)]
-            neighbors.append((grid[new_x][new_y], move_cost))
-    return neighbors
\ No newline at end of file
+            move_cost = MOVEMENT_COSTS[(dx, dy)]
+            neighbors.append((new_x * cols + new_y, move_cost))
+    return neighbors
+
+def get_predecessors(grid, index):
+    """
+    Returns (neighbor_index, move_cost) for every in-bounds cell that can move
+    into index, with the cost of the move from that cell. Used by backward searches,
+    since moving left and moving right do not cost the same.
+    """
+    rows, cols = grid.rows, grid.columns
+    x, y = divmod(index, cols)
+    predecessors = []
+
+    for dx, dy in DIRECTIONS:
+        new_x, new_y = x - dx, y - dy
+        if 0 <= new_x < rows and 0 <= new_y < cols:
+            move_cost = MOVEMENT_COSTS[(dx, dy)]
+            predecessors.append((new_x * cols + new_y, move_cost))
+    return predecessors
+
+def calculate_path_cost(grid, path, moves=MOVEMENT_COSTS):
+    """
+    Cost of a path of (x, y) cells: each entered cell's cost plus the move cost
+    from the moves table.
+    """
+    total_cost = 0
+    for (px, py), (x, y) in zip(path, path[1:]):
+        total_cost += int(grid.cost[x, y]) + moves[(x - px, y - py)]
+    return total_cost
@@ -1,58 +1,58 @@
 import random
-import pandas as pd
-from common.node import Node
+import numpy as np
+from common.compact_grid import CompactGrid
+from common.grid_cache import load_or_build, load_compact_grid
+from common.map_formats import grid_from_values, read_map_file
 
-def read_grid(file_path, cost_file_path):
-    df = pd.read_excel(file_path, header = None)
-    df_cost = pd.read_excel(cost_file_path, header = None)
-    
-    grid = []
-    rows, columns = df.shape
-    start_node = 0
-    goal_node = 0
-    
-    for x in range(rows):
-        row = []
-        for y in range(columns):
-            node_value = df.iloc[x, y]
-            node_cost = df_cost.iloc[x, y]
-            
-            # Node is walkable if excel node value is 0, 2, or 3.
-            is_walkable = node_value == 0 or node_value == 2 or node_value == 3
-            node = Node(x, y, is_walkable, cost = node_cost if is_walkable else float('inf'))
-            
-            # Start Node
-            if node_value == 2:
-                node.cost = 0
-                start_node = node
-            # Goal Node
-            elif node_value == 3:
-                node.cost = node_cost
-                goal_node = node
-                
-            row.append(node)
-        grid.append(row)
-    
-    return start_node, goal_node, grid, df.shape
+def read_compact_grid(file_path, cost_file_path):
+    """
+    Reads the maze and cost sheets into a CompactGrid.
+    Maze values: 0 free, 1 obstacle, 2 start, 3 goal.
+    """
+    # pandas takes a few hundred ms to import and is only needed to parse Excel
+    import pandas as pd
+    values = pd.read_excel(file_path, header = None).to_numpy()
+    costs = pd.read_excel(cost_file_path, header = None).to_numpy()
+    # The cost sheet may be larger than the maze; only the overlapping cells are used
+    costs = costs[:values.shape[0], :values.shape[1]]
+
+    return grid_from_values(values, costs)
+
+def read_grid(file_path, cost_file_path=None, use_cache=True):
+    """
+    Returns the start cell, goal cell, grid and grid shape.
+    Start and goal are (x, y) tuples (None if the map has none); the grid is a
+    read-only CompactGrid. An Excel maze needs its cost sheet and is compiled
+    to a memory-mapped binary cache on first use. Other formats (.grid, and
+    the .map/.csv/.txt/.pgm/.png files of common.map_formats) are read directly.
+    """
+    if file_path.endswith(".grid"):
+        grid = load_compact_grid(file_path)
+    elif not file_path.endswith(".xlsx"):
+        grid = read_map_file(file_path, cost_file_path)
+    elif cost_file_path is None:
+        raise ValueError(f"{file_path} needs a cost file")
+    elif use_cache:
+        grid = load_or_build(file_path, cost_file_path, read_compact_grid)
+    else:
+        grid = read_compact_grid(file_path, cost_file_path)
+    return grid.start, grid.goal, grid, grid.shape
 
 def create_grid(rows, columns, default_cost=1):
     """
     Creates a grid of nodes with specified dimensions and default cost.
     """
-    return [[Node(x, y, True, default_cost) for y in range(columns)] for x in range(rows)]
+    walkable = np.ones((rows, columns), dtype=np.bool_)
+    cost = np.full((rows, columns), default_cost, dtype=np.int32)
+    return CompactGrid(walkable, cost)
 
 def generate_obstacles(grid, obstacle_count):
     """
-    Places obstacles randomly in the grid.
+    Places obstacles randomly in the grid and returns the chosen (x, y) cells.
     """
-    rows = len(grid)
-    cols = len(grid[0])
-    all_positions = [(x, y) for x in range(rows) for y in range(cols)]
-    obstacles = random.sample(all_positions, obstacle_count)
+    obstacles = [grid.coords(index) for index in random.sample(range(grid.size), obstacle_count)]
+    grid.set_walkable(obstacles, False)
+    return obstacles
 
-    for x, y in obstacles:
-        grid[x][y].is_walkable = False
-    
 def generate_fixed_obstacles(grid, obstacles):
-    for x, y in obstacles:
-        grid[x][y].is_walkable = False
\ No newline at end of file
+    grid.set_walkable(list(obstacles), False)
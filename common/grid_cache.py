@@ -0,0 +1,109 @@
+import hashlib
+import os
+import struct
+import numpy as np
+from common.compact_grid import CompactGrid
+
+# File layout: fixed header, walkable bytes (rows * columns, padded to 8 bytes),
+# then int32 costs. Both layers are memory-mapped on load, so nothing is copied.
+MAGIC = b"AGRD"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIiiiiQQ")
+CACHE_DIR = ".cache"
+CACHE_SUFFIX = ".grid"
+
+
+def save_compact_grid(grid, path):
+    """
+    Writes a CompactGrid to the binary grid format.
+    """
+    start = grid.start if grid.start is not None else (-1, -1)
+    goal = grid.goal if grid.goal is not None else (-1, -1)
+    walkable_offset = HEADER.size
+    cost_offset = _align(walkable_offset + grid.size)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, grid.rows, grid.columns,
+                         start[0], start[1], goal[0], goal[1], walkable_offset, cost_offset)
+
+    # Write to a temporary file first so readers never see a partial grid
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(grid.walkable.astype(np.uint8).tobytes())
+        f.write(b"\0" * (cost_offset - walkable_offset - grid.size))
+        f.write(grid.cost.astype("<i4").tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_compact_grid(path):
+    """
+    Memory-maps a grid written by save_compact_grid.
+    The mapping is copy-on-write, so set_walkable/set_cost never touch the file.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ValueError(f"{path} is not a grid file")
+    magic, version, _, rows, columns, sx, sy, gx, gy, walkable_offset, cost_offset = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} grid file")
+
+    walkable = np.memmap(path, dtype=np.bool_, mode="c", offset=walkable_offset, shape=(rows, columns))
+    cost = np.memmap(path, dtype="<i4", mode="c", offset=cost_offset, shape=(rows, columns))
+    start = (sx, sy) if sx >= 0 else None
+    goal = (gx, gy) if gx >= 0 else None
+    return CompactGrid(walkable, cost, start, goal)
+
+
+def cache_path(file_path, cost_file_path):
+    """
+    Cache file for a maze/cost pair. The name holds both stems, a key of the
+    two files' paths and a key of their sizes and modification times, so
+    editing either file produces a new cache entry for the same pair while
+    other cost files for the same maze keep entries of their own.
+    """
+    pair, version = hashlib.sha1(), hashlib.sha1()
+    for path in (file_path, cost_file_path):
+        stat = os.stat(path)
+        pair.update(f"{os.path.abspath(path)};".encode())
+        version.update(f"{stat.st_size}:{stat.st_mtime_ns};".encode())
+    stems = "-".join(os.path.splitext(os.path.basename(path))[0] for path in (file_path, cost_file_path))
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    return os.path.join(cache_dir, f"{stems}-{pair.hexdigest()[:8]}-{version.hexdigest()[:16]}{CACHE_SUFFIX}")
+
+
+def load_or_build(file_path, cost_file_path, build):
+    """
+    Loads the cached binary grid for a maze/cost pair, calling
+    build(file_path, cost_file_path) and caching its result on a miss.
+    """
+    path = cache_path(file_path, cost_file_path)
+    if os.path.exists(path):
+        try:
+            return load_compact_grid(path)
+        except ValueError:
+            pass  # Stale format, rebuild below
+
+    grid = build(file_path, cost_file_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _remove_stale(path)
+        save_compact_grid(grid, path)
+    except OSError:
+        return grid  # Read-only location: work without a cache
+    return load_compact_grid(path)
+
+
+def _remove_stale(path):
+    # Drop older cache entries for the same maze/cost pair so the cache does not
+    # grow forever. The prefix ends with the pair key, so entries for the same
+    # maze with another cost file are kept.
+    cache_dir = os.path.dirname(path)
+    current = os.path.basename(path)
+    prefix = current.rsplit("-", 1)[0] + "-"
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and len(name) == len(current) and name.endswith(CACHE_SUFFIX) and name != current:
+            os.remove(os.path.join(cache_dir, name))
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
@@ -0,0 +1,211 @@
+import os
+import numpy as np
+from common.compact_grid import CompactGrid
+
+# Readers for map files other than the Excel pair: MovingAI benchmark .map and
+# .scen files, CSV/whitespace-separated matrices and PGM/PNG occupancy images.
+# Each one parses the whole file into NumPy arrays at once and builds the
+# CompactGrid from them, without touching cells one at a time in Python.
+
+# MovingAI terrain: '.' and 'G' are ground, 'S' is swamp (passable from ground).
+# '@', 'O' and 'T' are out of bounds or trees and 'W' is water, which can not be
+# entered from ground, so all of them are walls here.
+MOVINGAI_PASSABLE = np.zeros(256, dtype=np.bool_)  # lookup table by character code
+MOVINGAI_PASSABLE[np.frombuffer(b".GS", dtype=np.uint8)] = True
+MAP_EXTENSIONS = (".map", ".csv", ".txt", ".pgm", ".png")
+
+
+def grid_from_values(values, costs):
+    """
+    Builds a CompactGrid from a matrix of maze codes and a cost matrix.
+    Maze values: 0 free, 1 obstacle, 2 start, 3 goal.
+    """
+    walkable = np.isin(values, (0, 2, 3))
+    return CompactGrid(walkable, costs, _find_cell(values, 2), _find_cell(values, 3))
+
+
+def _find_cell(values, marker):
+    cells = np.argwhere(values == marker)
+    if len(cells) == 0:
+        return None
+    x, y = cells[0]
+    return int(x), int(y)
+
+
+def read_movingai_map(file_path):
+    """
+    Reads a MovingAI benchmark .map file. Row x of the map is grid row x, so
+    the file's (x, y) = (column, row) cell is grid cell (y, x). The maps have
+    no terrain costs, so every cell costs 0 and the move model carries the
+    whole cost of a step (see OCTILE_MOVES in algorithms/scenarios.py).
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    header, position = {}, 0
+    while True:
+        end = data.find(b"\n", position)
+        if end == -1:
+            raise ValueError(f"{file_path} is not a MovingAI map: no 'map' line")
+        line = data[position:end].strip()
+        position = end + 1
+        if line == b"map":
+            break
+        key, _, value = line.partition(b" ")
+        header[key.decode()] = value.strip().decode()
+    try:
+        rows, columns = int(header["height"]), int(header["width"])
+    except (KeyError, ValueError):
+        raise ValueError(f"{file_path} is not a MovingAI map: bad height/width header")
+
+    # Drop line breaks and any other whitespace, leaving one byte per cell
+    cells = np.frombuffer(data, dtype=np.uint8, offset=position)
+    cells = cells[cells > ord(" ")]
+    if len(cells) < rows * columns:
+        raise ValueError(f"{file_path} has {len(cells)} cells, expected {rows}x{columns}")
+    walkable = MOVINGAI_PASSABLE[cells[:rows * columns]].reshape(rows, columns)
+    return CompactGrid(walkable, np.zeros((rows, columns), dtype=np.int32))
+
+
+class Scenario:
+    """
+    Queries of a MovingAI .scen file, converted to grid (row, column) cells.
+    starts and goals are (n, 2) int arrays, optimal the listed octile path
+    lengths and buckets the file's difficulty buckets.
+    """
+    def __init__(self, map_name, rows, columns, buckets, starts, goals, optimal):
+        self.map_name = map_name
+        self.rows, self.columns = rows, columns
+        self.buckets = buckets
+        self.starts = starts
+        self.goals = goals
+        self.optimal = optimal
+
+    def __len__(self):
+        return len(self.optimal)
+
+    def __repr__(self):
+        return f"Scenario({self.map_name!r}, {self.rows}x{self.columns}, {len(self)} queries)"
+
+
+def read_movingai_scenario(file_path):
+    """
+    Reads a MovingAI .scen file. Each line is bucket, map, width, height,
+    start x, start y, goal x, goal y and optimal length, separated by tabs.
+    """
+    with open(file_path) as f:
+        lines = f.read().splitlines()
+    if lines and lines[0].startswith("version"):
+        lines = lines[1:]
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        empty = np.zeros((0, 2), dtype=np.int64)
+        return Scenario(None, 0, 0, np.zeros(0, dtype=np.int64), empty, empty, np.zeros(0))
+
+    table = np.loadtxt(lines, dtype=str, delimiter="\t", ndmin=2)
+    if table.shape[1] != 9:
+        raise ValueError(f"{file_path} is not a MovingAI scenario: expected 9 columns, got {table.shape[1]}")
+
+    maps = np.unique(table[:, 1])
+    if len(maps) > 1:
+        raise ValueError(f"{file_path} mixes maps {list(maps)}; split it into one file per map")
+    numbers = table[:, [0, 2, 3, 4, 5, 6, 7]].astype(np.int64)
+    # Swap the file's (x, y) = (column, row) into grid (row, column)
+    starts = numbers[:, [4, 3]]
+    goals = numbers[:, [6, 5]]
+    columns, rows = (int(value) for value in numbers[0, 1:3])
+    return Scenario(str(maps[0]), rows, columns, numbers[:, 0], starts, goals, table[:, 8].astype(np.float64))
+
+
+def read_text_grid(file_path, cost_file_path=None, delimiter=None):
+    """
+    Reads a maze matrix from a CSV (comma-separated) or text (whitespace-separated)
+    file, with the same codes as the Excel mazes: 0 free, 1 obstacle, 2 start,
+    3 goal. Costs come from a matrix file in the same format, or are all 1.
+    """
+    if delimiter is None and file_path.lower().endswith(".csv"):
+        delimiter = ","
+    values = np.loadtxt(file_path, dtype=np.int64, delimiter=delimiter, ndmin=2)
+    if cost_file_path is None:
+        costs = np.ones(values.shape, dtype=np.int32)
+    else:
+        costs = np.loadtxt(cost_file_path, dtype=np.int64, delimiter=delimiter, ndmin=2)
+        # As with the Excel pair, only the overlapping cells of a larger cost matrix are used
+        costs = costs[:values.shape[0], :values.shape[1]]
+    return grid_from_values(values, costs)
+
+
+def read_image_grid(file_path, threshold=0.5, cost_file_path=None):
+    """
+    Reads an occupancy image (PGM or PNG): pixels at least threshold bright
+    (0 black, 1 white) are free and darker ones are walls. Image row x is grid
+    row x. Costs come from a text/CSV matrix file, or are all 1.
+    """
+    if file_path.lower().endswith(".pgm"):
+        brightness = _read_pgm(file_path)
+    else:
+        # matplotlib reads PNG itself and is already a dependency
+        from matplotlib.image import imread
+        pixels = imread(file_path)
+        if pixels.dtype.kind in "ui":
+            pixels = pixels / np.iinfo(pixels.dtype).max
+        # Grayscale is the mean of the color channels; alpha is ignored
+        brightness = pixels[..., :3].mean(axis=-1) if pixels.ndim == 3 else pixels
+
+    walkable = brightness >= threshold
+    if cost_file_path is None:
+        costs = np.ones(walkable.shape, dtype=np.int32)
+    else:
+        delimiter = "," if cost_file_path.lower().endswith(".csv") else None
+        costs = np.loadtxt(cost_file_path, dtype=np.int64, delimiter=delimiter, ndmin=2)
+        costs = costs[:walkable.shape[0], :walkable.shape[1]]
+    return CompactGrid(walkable, costs)
+
+
+def _read_pgm(file_path):
+    # Returns brightness in [0, 1] of a binary (P5) or plain (P2) PGM image
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    tokens, position = [], 0
+    while len(tokens) < 4:
+        while position < len(data) and data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b"#":
+            position = data.find(b"\n", position) + 1 or len(data)
+            continue
+        end = position
+        while end < len(data) and not data[end:end + 1].isspace() and data[end:end + 1] != b"#":
+            end += 1
+        if end == position:
+            raise ValueError(f"{file_path} is not a PGM image: truncated header")
+        tokens.append(data[position:end])
+        position = end
+
+    magic, width, height, maximum = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+    if magic == b"P5":
+        # Exactly one whitespace byte separates the header from the pixels
+        dtype = np.uint8 if maximum < 256 else ">u2"
+        pixels = np.frombuffer(data, dtype=dtype, count=width * height, offset=position + 1)
+    elif magic == b"P2":
+        pixels = np.fromstring(data[position:].decode("ascii"), dtype=np.int64, sep=" ")[:width * height]
+        if len(pixels) < width * height:
+            raise ValueError(f"{file_path} has {len(pixels)} pixels, expected {width}x{height}")
+    else:
+        raise ValueError(f"{file_path} is not a P2 or P5 PGM image")
+    return pixels.reshape(height, width) / maximum
+
+
+def read_map_file(file_path, cost_file_path=None):
+    """
+    Reads any supported non-Excel map file into a CompactGrid, by extension:
+    .map (MovingAI), .csv/.txt (matrix) or .pgm/.png (occupancy image).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".map":
+        return read_movingai_map(file_path)
+    if extension in (".csv", ".txt"):
+        return read_text_grid(file_path, cost_file_path)
+    if extension in (".pgm", ".png"):
+        return read_image_grid(file_path, cost_file_path=cost_file_path)
+    raise ValueError(f"Unknown map format {extension!r}, expected one of {MAP_EXTENSIONS}")
@@ -0,0 +1,153 @@
+from array import array
+import numpy as np
+
+
+class SearchObserver:
+    """
+    Receives events from the search loops. Searches take observer=None and
+    only call it after an `is not None` check, so an unobserved search pays
+    for one comparison per event and nothing else. Subclasses override the
+    events they need:
+
+      on_push(index, priority, open_size)  index entered the open list (open_size after the push)
+      on_pop(index, priority)              index left the open list
+      on_stale_pop(index)                  a popped entry was outdated or already expanded
+      on_expand(index, cost)               index is expanded with cost g
+      on_relax(index, parent, cost)        index got a cheaper cost through parent
+      on_goal(index, cost)                 the goal was reached
+
+    Breadth- and depth-first searches report priority and cost 0 on every
+    event except on_goal, which gets the path cost.
+    """
+    def on_push(self, index, priority, open_size):
+        pass
+
+    def on_pop(self, index, priority):
+        pass
+
+    def on_stale_pop(self, index):
+        pass
+
+    def on_expand(self, index, cost):
+        pass
+
+    def on_relax(self, index, parent, cost):
+        pass
+
+    def on_goal(self, index, cost):
+        pass
+
+
+class SearchCounters(SearchObserver):
+    """
+    Per-query event counts and the peak open list size. Call reset() between queries.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.expansions = 0
+        self.relaxations = 0
+        self.peak_open_size = 0
+        self.goal_cost = None
+
+    @property
+    def counters(self):
+        return {
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "expansions": self.expansions,
+            "relaxations": self.relaxations,
+            "peak_open_size": self.peak_open_size,
+            "goal_cost": self.goal_cost,
+        }
+
+    def on_push(self, index, priority, open_size):
+        self.pushes += 1
+        if open_size > self.peak_open_size:
+            self.peak_open_size = open_size
+
+    def on_pop(self, index, priority):
+        self.pops += 1
+
+    def on_stale_pop(self, index):
+        self.stale_pops += 1
+
+    def on_expand(self, index, cost):
+        self.expansions += 1
+
+    def on_relax(self, index, parent, cost):
+        self.relaxations += 1
+
+    def on_goal(self, index, cost):
+        self.goal_cost = cost
+
+
+class ExpansionTrace(SearchObserver):
+    """
+    Flat indices of expanded cells in expansion order, stored in an int64
+    array (8 bytes per expansion). Recording stops after limit expansions.
+    """
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.reset()
+
+    def reset(self):
+        self.order = array('q')
+
+    def on_expand(self, index, cost):
+        if self.limit is None or len(self.order) < self.limit:
+            self.order.append(index)
+
+    def as_array(self):
+        return np.frombuffer(self.order, dtype=np.int64) if self.order else np.empty(0, dtype=np.int64)
+
+    def heatmap(self, grid):
+        """
+        Expansion step of every cell as a grid shaped int64 array, -1 where never expanded.
+        """
+        steps = np.full(grid.size, -1, dtype=np.int64)
+        order = self.as_array()
+        steps[order[::-1]] = np.arange(len(order))[::-1]  # First expansion wins for re-expanded cells
+        return steps.reshape(grid.shape)
+
+
+class ObserverGroup(SearchObserver):
+    """
+    Forwards every event to several observers.
+    """
+    def __init__(self, *observers):
+        self.observers = observers
+
+    def reset(self):
+        for observer in self.observers:
+            if hasattr(observer, "reset"):
+                observer.reset()
+
+    def on_push(self, index, priority, open_size):
+        for observer in self.observers:
+            observer.on_push(index, priority, open_size)
+
+    def on_pop(self, index, priority):
+        for observer in self.observers:
+            observer.on_pop(index, priority)
+
+    def on_stale_pop(self, index):
+        for observer in self.observers:
+            observer.on_stale_pop(index)
+
+    def on_expand(self, index, cost):
+        for observer in self.observers:
+            observer.on_expand(index, cost)
+
+    def on_relax(self, index, parent, cost):
+        for observer in self.observers:
+            observer.on_relax(index, parent, cost)
+
+    def on_goal(self, index, cost):
+        for observer in self.observers:
+            observer.on_goal(index, cost)
@@ -0,0 +1,258 @@
+import heapq
+
+
+class OpenList:
+    """
+    Priority queue of cell indices for UCS and A*. push(item, priority) inserts
+    an item or lowers its priority (decrease-key); pop() returns the live
+    (priority, item) with the smallest priority. Priorities are integers.
+
+    Counters: pushes, pops, stale_pops (outdated entries skipped by lazy
+    queues), decrease_keys and peak_size (most entries held at once,
+    including stale ones).
+
+    An attached SearchObserver (the observer attribute) is told about every
+    stale entry a lazy queue skips.
+    """
+    def __init__(self):
+        self.observer = None
+        self.clear()
+
+    def clear(self):
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.decrease_keys = 0
+        self.peak_size = 0
+        self._priority = {}  # item -> current priority, only for live items
+        self._entries = 0    # entries physically stored
+
+    def __len__(self):
+        return len(self._priority)
+
+    def _stored(self, count=1):
+        self._entries += count
+        if self._entries > self.peak_size:
+            self.peak_size = self._entries
+
+    @property
+    def counters(self):
+        return {
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "decrease_keys": self.decrease_keys,
+            "peak_size": self.peak_size,
+        }
+
+
+class BinaryHeapOpenList(OpenList):
+    """
+    heapq with lazy deletion: an improved item is pushed again and the old
+    entry is skipped when it reaches the top.
+    """
+    def clear(self):
+        super().clear()
+        self._heap = []
+
+    def push(self, item, priority):
+        self.pushes += 1
+        if item in self._priority:
+            self.decrease_keys += 1
+        self._priority[item] = priority
+        heapq.heappush(self._heap, (priority, item))
+        self._stored()
+
+    def pop(self):
+        while True:
+            priority, item = heapq.heappop(self._heap)
+            self._entries -= 1
+            if self._priority.get(item) == priority:
+                del self._priority[item]
+                self.pops += 1
+                return priority, item
+            self.stale_pops += 1
+            if self.observer is not None:
+                self.observer.on_stale_pop(item)
+
+
+class IndexedHeapOpenList(OpenList):
+    """
+    Binary heap that tracks every item's position, so decrease-key moves the
+    item in place and no stale entries are ever stored.
+    """
+    def clear(self):
+        super().clear()
+        self._heap = []      # items
+        self._position = {}  # item -> index in _heap
+
+    def push(self, item, priority):
+        self.pushes += 1
+        position = self._position.get(item)
+        if position is None:
+            self._heap.append(item)
+            position = self._position[item] = len(self._heap) - 1
+            self._priority[item] = priority
+            self._stored()
+        else:
+            self.decrease_keys += 1
+            self._priority[item] = priority
+            self._sift_down(position)
+        self._sift_up(position)
+
+    def pop(self):
+        heap = self._heap
+        item = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._position[last] = 0
+            self._sift_down(0)
+        del self._position[item]
+        priority = self._priority.pop(item)
+        self._entries -= 1
+        self.pops += 1
+        return priority, item
+
+    def _sift_up(self, position):
+        heap, priorities, positions = self._heap, self._priority, self._position
+        item = heap[position]
+        priority = priorities[item]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if priorities[heap[parent]] <= priority:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position]] = position
+            position = parent
+        heap[position] = item
+        positions[item] = position
+
+    def _sift_down(self, position):
+        heap, priorities, positions = self._heap, self._priority, self._position
+        size = len(heap)
+        item = heap[position]
+        priority = priorities[item]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and priorities[heap[child + 1]] < priorities[heap[child]]:
+                child += 1
+            if priorities[heap[child]] >= priority:
+                break
+            heap[position] = heap[child]
+            positions[heap[position]] = position
+            position = child
+        heap[position] = item
+        positions[item] = position
+
+
+class BucketOpenList(OpenList):
+    """
+    Dial's bucket queue: one bucket per integer priority and a pointer to the
+    lowest non-empty bucket. Push, pop and decrease-key are O(1) apart from
+    skipping empty buckets. Items in a bucket come out first-in first-out.
+    """
+    def clear(self):
+        super().clear()
+        self._buckets = {}  # priority -> dict used as an ordered set of items
+        self._current = 0
+
+    def push(self, item, priority):
+        self.pushes += 1
+        old = self._priority.get(item)
+        if old is not None:
+            if old == priority:
+                return
+            self.decrease_keys += 1
+            del self._buckets[old][item]
+        else:
+            self._stored()
+        self._priority[item] = priority
+        self._buckets.setdefault(priority, {})[item] = None
+        if priority < self._current or len(self._priority) == 1:
+            self._current = priority
+
+    def pop(self):
+        buckets = self._buckets
+        while not buckets.get(self._current):
+            buckets.pop(self._current, None)
+            self._current += 1
+        bucket = buckets[self._current]
+        item = next(iter(bucket))
+        del bucket[item]
+        del self._priority[item]
+        self._entries -= 1
+        self.pops += 1
+        return self._current, item
+
+
+class RadixHeapOpenList(OpenList):
+    """
+    Radix heap for monotone priorities (every push is at least the last popped
+    priority, as in UCS and A* with a consistent heuristic). Entries live in
+    buckets by the highest bit that differs from the last popped priority.
+    Decrease-key is lazy, so stale entries are skipped on pop.
+    """
+    def clear(self):
+        super().clear()
+        self._buckets = [[] for _ in range(65)]
+        self._last = 0
+
+    def push(self, item, priority):
+        if priority < self._last:
+            raise ValueError(f"radix heap needs monotone priorities: {priority} < {self._last}")
+        self.pushes += 1
+        if item in self._priority:
+            self.decrease_keys += 1
+        self._priority[item] = priority
+        self._buckets[(priority ^ self._last).bit_length()].append((priority, item))
+        self._stored()
+
+    def pop(self):
+        buckets = self._buckets
+        while True:
+            if not buckets[0]:
+                # Refill bucket 0 from the first non-empty bucket around its minimum
+                index = 1
+                while not buckets[index]:
+                    index += 1
+                entries = buckets[index]
+                buckets[index] = []
+                self._last = min(priority for priority, _ in entries)
+                for priority, item in entries:
+                    buckets[(priority ^ self._last).bit_length()].append((priority, item))
+            priority, item = buckets[0].pop()
+            self._entries -= 1
+            if self._priority.get(item) == priority:
+                del self._priority[item]
+                self.pops += 1
+                return priority, item
+            self.stale_pops += 1
+            if self.observer is not None:
+                self.observer.on_stale_pop(item)
+
+
+OPEN_LISTS = {
+    "binary": BinaryHeapOpenList,
+    "indexed": IndexedHeapOpenList,
+    "bucket": BucketOpenList,
+    "radix": RadixHeapOpenList,
+}
+
+
+def make_open_list(open_list="binary", observer=None):
+    """
+    Returns an empty open list reporting stale pops to observer. Accepts a name
+    from OPEN_LISTS or an OpenList instance, which is cleared and reused so its
+    counters can be read afterwards.
+    """
+    if isinstance(open_list, OpenList):
+        open_list.clear()
+    elif open_list not in OPEN_LISTS:
+        raise ValueError(f"Unknown open list {open_list!r}, expected one of {sorted(OPEN_LISTS)}")
+    else:
+        open_list = OPEN_LISTS[open_list]()
+    open_list.observer = observer
+    return open_list
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+import numpy as np
+from common.get_neighbors import MOVEMENT_COSTS
+
+# Searches whose paths are optimal. Every suffix of an optimal path is itself an
+# optimal path to the same goal, so their cached paths also answer queries that
+# start anywhere along them.
+OPTIMAL_ALGORITHMS = {
+    "astar_graph_pathfind",
+    "astar_tree_pathfind",
+    "ucs_graph_pathfind",
+    "ucs_tree_pathfind",
+    "bidirectional_astar",
+    "bidirectional_ucs",
+}
+
+ENTRY_OVERHEAD = 200   # Rough bytes per cached path besides its arrays
+SUFFIX_OVERHEAD = 100  # Rough bytes per suffix index entry
+
+
+class _Entry:
+    def __init__(self, cells, cumulative, reuse_subpaths):
+        self.cells = cells            # int32 flat cell indices
+        self.cumulative = cumulative  # int64 cost from the first cell up to each cell
+        self.reuse_subpaths = reuse_subpaths
+
+    @property
+    def nbytes(self):
+        suffixes = len(self.cells) * SUFFIX_OVERHEAD if self.reuse_subpaths else 0
+        return self.cells.nbytes + self.cumulative.nbytes + ENTRY_OVERHEAD + suffixes
+
+
+class PathCache:
+    """
+    LRU cache of search results for one grid, keyed on (grid version, start,
+    goal, algorithm) and limited to max_bytes. Changing the grid (set_walkable,
+    set_cost, generate_obstacles, ...) bumps its version, which empties the cache.
+    """
+    def __init__(self, grid, max_bytes=16 * 1024 * 1024):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.version = grid.version
+        self.entries = OrderedDict()  # (version, start, goal, algorithm) -> _Entry
+        self.suffixes = {}            # (algorithm, goal, cell) -> key of a path through cell
+        self.nbytes = 0
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def counters(self):
+        return {
+            "hits": self.hits,
+            "subpath_hits": self.subpath_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+        }
+
+    def _check_version(self):
+        if self.grid.version != self.version:
+            self.clear()
+            self.version = self.grid.version
+
+    def clear(self):
+        self.entries.clear()
+        self.suffixes.clear()
+        self.nbytes = 0
+
+    def get(self, start, goal, algorithm):
+        """
+        Returns (path, cost) for a cached query, or None on a miss.
+        """
+        self._check_version()
+        start, goal = self.grid.index(*start), self.grid.index(*goal)
+        key = (self.version, start, goal, algorithm)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self._path(entry, 0)
+
+        key = self.suffixes.get((algorithm, goal, start))
+        if key is not None:
+            entry = self.entries[key]
+            self.entries.move_to_end(key)
+            self.subpath_hits += 1
+            offset = int(np.flatnonzero(entry.cells == start)[0])
+            return self._path(entry, offset)
+
+        self.misses += 1
+        return None
+
+    def _path(self, entry, offset):
+        path = [self.grid.coords(int(cell)) for cell in entry.cells[offset:]]
+        cost = int(entry.cumulative[-1] - entry.cumulative[offset]) if path else 0
+        return path, cost
+
+    def put(self, start, goal, algorithm, path, reuse_subpaths=None):
+        """
+        Stores a path of (x, y) cells. Suffixes are indexed for reuse when the
+        algorithm is optimal (or reuse_subpaths is True).
+        """
+        self._check_version()
+        if reuse_subpaths is None:
+            reuse_subpaths = algorithm in OPTIMAL_ALGORITHMS
+        start, goal = self.grid.index(*start), self.grid.index(*goal)
+        key = (self.version, start, goal, algorithm)
+        if key in self.entries:
+            self._remove(key)
+
+        cells = np.array([self.grid.index(x, y) for x, y in path], dtype=np.int32)
+        steps = [0] + [int(self.grid.cost[x, y]) + MOVEMENT_COSTS[(x - px, y - py)]
+                       for (px, py), (x, y) in zip(path, path[1:])]
+        entry = _Entry(cells, np.cumsum(steps, dtype=np.int64), reuse_subpaths and len(path) > 0)
+        if entry.nbytes > self.max_bytes:
+            return
+
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        if entry.reuse_subpaths:
+            for cell in cells.tolist():
+                self.suffixes[(algorithm, goal, cell)] = key
+
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.nbytes -= entry.nbytes
+        if entry.reuse_subpaths:
+            _, _, goal, algorithm = key
+            for cell in entry.cells.tolist():
+                suffix = (algorithm, goal, cell)
+                if self.suffixes.get(suffix) == key:
+                    del self.suffixes[suffix]
+
+    def pathfind(self, search, start, goal, algorithm=None):
+        """
+        Returns (path, cost), running search(start, goal, grid) only on a miss.
+        search is any of the search functions; track_performance wrappers are skipped.
+        """
+        search = getattr(search, "__wrapped__", search)
+        algorithm = algorithm or search.__name__
+        cached = self.get(start, goal, algorithm)
+        if cached is not None:
+            return cached
+
+        result = search(start, goal, self.grid)
+        path, cost = result[0], result[-1]
+        self.put(start, goal, algorithm, path)
+        return path, cost
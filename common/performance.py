@@ -1,37 +1,78 @@
 import tracemalloc
 import time
+from contextlib import contextmanager
 from functools import wraps
 
-def track_performance(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        # Start memory tracking
+# Searches that time themselves (ucs, dfs) only trace memory while this is on.
+# Tracing slows every allocation, so benchmarks turn it off for timing runs.
+_memory_tracking = True
+
+@contextmanager
+def memory_tracking(enabled):
+    """
+    Turns the memory tracing of start_measurement/stop_measurement on or off for a block.
+    """
+    global _memory_tracking
+    previous, _memory_tracking = _memory_tracking, enabled
+    try:
+        yield
+    finally:
+        _memory_tracking = previous
+
+def start_measurement():
+    """
+    Starts memory tracing (if enabled) and returns the start time for stop_measurement.
+    """
+    if _memory_tracking:
         tracemalloc.start()
-        start_time = time.time()
+    return time.perf_counter()
+
+def stop_measurement(start_time):
+    """
+    Returns (execution_time, temporary_memory) since start_measurement.
+    Memory is 0 when tracing is disabled.
+    """
+    execution_time = time.perf_counter() - start_time
+    if not _memory_tracking:
+        return execution_time, 0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return execution_time, peak - current
 
+def measure_performance(func, *args, **kwargs):
+    """
+    Calls func once and returns (result, performance_metrics) without printing.
+    Searches that time themselves have their own tracing turned off, so it
+    does not stop the trace taken here.
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    with memory_tracking(False):
         result = func(*args, **kwargs)
+    execution_time = time.perf_counter() - start_time
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    performance_metrics = {
+        "execution_time": execution_time,
+        "peak_memory": peak / 1024,  # Convert to KB
+        "current_memory": current / 1024,  # Convert to KB
+        "temporary_memory": (peak - current) / 1024  # Convert to KB
+    }
+    return result, performance_metrics
+
+def track_performance(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result, performance_metrics = measure_performance(func, *args, **kwargs)
 
-        # Stop memory tracking and execution time
-        current, peak = tracemalloc.get_traced_memory()
-        execution_time = time.time() - start_time
-        tracemalloc.stop()
-        
-        performance_metrics = {
-            "execution_time": execution_time,
-            "peak_memory": peak / 1024,  # Convert to KB
-            "current_memory": current / 1024,  # Convert to KB
-            "temporary_memory": (peak - current) / 1024  # Convert to KB
-        }
         title = func.__name__.replace('_', ' ').title().split()[:2]
         print(f"{' '.join(title)} Path Length: {len(result[0])}")
         print(f"Nodes Expanded: {result[1]}")
-        print(f"Execution Time: {execution_time:.4f} seconds")
-        print(f"Peak Memory Usage: {peak / 1024:.2f} KB")
-        print(f"Current Memory Usage: {current / 1024:.2f} KB")
-        if(title[0].lower() == 'bfs'):
-            print(f"Total Path Cost: {result[2]}")
-        else:
-            print(f"Total Path Cost: {result[0][-1].cost if result[0] else None}")
+        print(f"Execution Time: {performance_metrics['execution_time']:.4f} seconds")
+        print(f"Peak Memory Usage: {performance_metrics['peak_memory']:.2f} KB")
+        print(f"Current Memory Usage: {performance_metrics['current_memory']:.2f} KB")
+        print(f"Total Path Cost: {result[2] if result[0] else None}")
 
         return result, performance_metrics
 
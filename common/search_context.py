@@ -0,0 +1,91 @@
+import threading
+import weakref
+from array import array
+
+
+class SearchContext:
+    """
+    Per-query search state kept outside the grid: g-costs, parents and closed flags.
+    Entries are only valid when their stamp equals the current generation, so
+    reset() is O(1) and one context can be reused for any number of queries.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.g = array('q', bytes(8 * size))      # costs are integers
+        self.parent = array('q', bytes(8 * size))
+        self.seen = array('I', bytes(4 * size))    # generation in which g/parent were set
+        self.closed = array('I', bytes(4 * size))  # generation in which the cell was expanded
+        self.generation = 0
+
+    def reset(self):
+        self.generation += 1
+        if self.generation == 2 ** 32:
+            # Stamp overflow: clear once so old stamps can not match a new generation
+            self.seen = array('I', bytes(4 * self.size))
+            self.closed = array('I', bytes(4 * self.size))
+            self.generation = 1
+
+    def is_seen(self, index):
+        return self.seen[index] == self.generation
+
+    def is_closed(self, index):
+        return self.closed[index] == self.generation
+
+    def cost(self, index):
+        return self.g[index] if self.seen[index] == self.generation else float('inf')
+
+    def set(self, index, cost, parent):
+        self.g[index] = cost
+        self.parent[index] = parent
+        self.seen[index] = self.generation
+
+    def close(self, index):
+        self.closed[index] = self.generation
+
+    def reopen(self, index):
+        # Generations start at 1, so stamp 0 never matches
+        self.closed[index] = 0
+
+    def path_to(self, index):
+        """
+        Returns the flat cell indices from the search root to index.
+        """
+        path = []
+        while index != -1:
+            path.append(index)
+            index = self.parent[index]
+        path.reverse()
+        return path
+
+
+_local = threading.local()
+
+
+def get_context(grid, slot=0):
+    """
+    Returns this thread's SearchContext for grid, reset for a new query.
+    Each thread gets its own context, so threads can search one grid concurrently.
+    Searches that need several independent contexts (e.g. one per direction)
+    use different slots.
+    """
+    contexts = getattr(_local, "contexts", None)
+    if contexts is None:
+        contexts = _local.contexts = weakref.WeakKeyDictionary()
+    slots = contexts.setdefault(grid, {})
+    context = slots.get(slot)
+    if context is None or context.size != grid.size:
+        context = slots[slot] = SearchContext(grid.size)
+    context.reset()
+    return context
+
+
+def prepare_context(grid, context=None, slot=0):
+    """
+    Resets a caller supplied context, or falls back to the thread's own one.
+    """
+    if context is None:
+        return get_context(grid, slot)
+    if context.size != grid.size:
+        raise ValueError("search context does not match the grid size")
+    context.reset()
+    return context
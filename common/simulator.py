@@ -0,0 +1,412 @@
+import itertools
+import os
+import numpy as np
+from common.compact_grid import CompactGrid
+from common.grid_cache import save_compact_grid, load_compact_grid
+from common.tiled_grid import DEFAULT_TILE_SIZE, COST_BITS, write_tiled_grid
+
+# Seeded map generators for load testing. The generators work on whole NumPy
+# arrays (in blocks of rows where temporaries would be large), so 10000 x 10000
+# maps are practical; such a grid takes about 0.5 GB (bool walkable plus int32
+# costs). The same seed and arguments always give the same map.
+
+BLOCK_ROWS = 1024  # Rows generated per step, bounds temporary memory on huge maps
+MAP_KINDS = ["random", "backtracker", "prim", "rooms", "mirror"]
+
+
+def _blocks(rows):
+    for x0 in range(0, rows, BLOCK_ROWS):
+        yield x0, min(x0 + BLOCK_ROWS, rows)
+
+
+def random_obstacles(rows, columns, density=0.3, seed=None):
+    """
+    Walkable mask where each cell is an obstacle with probability density.
+    """
+    rng = np.random.default_rng(seed)
+    walkable = np.empty((rows, columns), dtype=np.bool_)
+    for x0, x1 in _blocks(rows):
+        walkable[x0:x1] = rng.random((x1 - x0, columns), dtype=np.float32) >= density
+    return walkable
+
+
+def _connected_labels(count, u, v):
+    """
+    Component label (smallest member) of each of count nodes joined by edges
+    u[i] - v[i]. Roots hook onto a smaller neighboring root and paths are
+    shortened by pointer jumping, so it runs in a few vectorized rounds.
+    """
+    parent = np.arange(count, dtype=u.dtype)
+    while len(u):
+        pu, pv = parent[u], parent[v]
+        active = pu != pv
+        if not active.any():
+            break
+        u, v, pu, pv = u[active], v[active], pu[active], pv[active]
+        # Any smaller root will do when several edges hook the same root
+        parent[np.maximum(pu, pv)] = np.minimum(pu, pv)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def _lattice_edges(rows, columns):
+    """
+    Right and down edges between the cells of a rows x columns lattice, as flat index pairs.
+    """
+    cells = np.arange(rows * columns).reshape(rows, columns)
+    u = np.concatenate([cells[:, :-1].ravel(), cells[:-1, :].ravel()])
+    v = np.concatenate([cells[:, 1:].ravel(), cells[1:, :].ravel()])
+    return u, v
+
+
+def _carve(rows, columns, u, v):
+    """
+    Walkable mask of a maze whose lattice cells sit at odd (x, y) and whose
+    open passages are the lattice edges u[i] - v[i].
+    """
+    cell_rows, cell_columns = (rows - 1) // 2, (columns - 1) // 2
+    walkable = np.zeros((rows, columns), dtype=np.bool_)
+    walkable[1:2 * cell_rows:2, 1:2 * cell_columns:2] = True
+    ux, uy = np.divmod(u, cell_columns)
+    vx, vy = np.divmod(v, cell_columns)
+    walkable[ux + vx + 1, uy + vy + 1] = True  # The wall cell between two lattice cells
+    return walkable
+
+
+def prim_maze(rows, columns, seed=None):
+    """
+    Perfect maze from the minimum spanning tree of the cell lattice under
+    random edge weights, which is the maze randomized Prim's algorithm builds.
+    The tree is found with Boruvka's algorithm: every round each component
+    takes its cheapest outgoing edge, all at once with array operations.
+    """
+    cell_rows, cell_columns = (rows - 1) // 2, (columns - 1) // 2
+    if cell_rows < 1 or cell_columns < 1:
+        raise ValueError("a maze needs at least 3 rows and 3 columns")
+    rng = np.random.default_rng(seed)
+    count = cell_rows * cell_columns
+    u, v = _lattice_edges(cell_rows, cell_columns)
+
+    # Distinct keys: random high bits, edge number in the low bits to break ties
+    edges = np.arange(len(u))
+    shift = max(len(u).bit_length(), 1)
+    keys = (rng.integers(0, 1 << (62 - shift), len(u), dtype=np.int64) << shift) | edges
+    mask = (1 << shift) - 1
+
+    labels = np.arange(count)
+    in_tree = np.zeros(len(u), dtype=np.bool_)
+    # Edges still crossing between components; edges inside one never cross again
+    crossing = edges
+    while True:
+        lu, lv = labels[u[crossing]], labels[v[crossing]]
+        still = lu != lv
+        crossing, lu, lv = crossing[still], lu[still], lv[still]
+        if len(crossing) == 0:
+            break
+        cheapest = np.full(count, np.iinfo(np.int64).max)
+        np.minimum.at(cheapest, lu, keys[crossing])
+        np.minimum.at(cheapest, lv, keys[crossing])
+        chosen = cheapest[cheapest != np.iinfo(np.int64).max] & mask
+        in_tree[chosen] = True
+        roots = _connected_labels(count, labels[u[chosen]], labels[v[chosen]])
+        labels = roots[labels]
+
+    return _carve(rows, columns, u[in_tree], v[in_tree])
+
+
+def backtracker_maze(rows, columns, seed=None):
+    """
+    Perfect maze from a randomized depth-first search (recursive backtracker),
+    which gives long winding corridors. The walk itself is sequential, so this
+    is slower than prim_maze on very large maps.
+    """
+    cell_rows, cell_columns = (rows - 1) // 2, (columns - 1) // 2
+    if cell_rows < 1 or cell_columns < 1:
+        raise ValueError("a maze needs at least 3 rows and 3 columns")
+    rng = np.random.default_rng(seed)
+    count = cell_rows * cell_columns
+    visited = bytearray(count)
+    # One of the 24 visiting orders of the four directions per cell, drawn up front
+    steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    step_orders = [[steps[i] for i in order] for order in itertools.permutations(range(4))]
+    orders = memoryview(rng.integers(len(step_orders), size=count, dtype=np.uint8))
+
+    u, v = [], []
+    start = int(rng.integers(count))
+    visited[start] = 1
+    stack = [(start, 0)]
+    while stack:
+        cell, tried = stack[-1]
+        if tried == 4:
+            stack.pop()
+            continue
+        stack[-1] = (cell, tried + 1)
+        dx, dy = step_orders[orders[cell]][tried]
+        x, y = divmod(cell, cell_columns)
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < cell_rows and 0 <= ny < cell_columns:
+            neighbor = nx * cell_columns + ny
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                u.append(cell)
+                v.append(neighbor)
+                stack.append((neighbor, 0))
+
+    return _carve(rows, columns, np.array(u, dtype=np.int64), np.array(v, dtype=np.int64))
+
+
+def rooms_and_corridors(rows, columns, rooms=None, min_size=4, max_size=12, seed=None):
+    """
+    Rectangular rooms joined by L-shaped corridors, each room to the next one
+    in order of position, so every room is reachable.
+    """
+    rng = np.random.default_rng(seed)
+    rooms = rooms or max(2, rows * columns // (max_size * max_size * 4))
+    max_size = max(1, min(max_size, rows - 2, columns - 2))
+    min_size = max(1, min(min_size, max_size))
+    walkable = np.zeros((rows, columns), dtype=np.bool_)
+
+    heights = rng.integers(min_size, max_size + 1, rooms)
+    widths = rng.integers(min_size, max_size + 1, rooms)
+    xs = (rng.random(rooms) * (rows - 1 - heights)).astype(np.int64) + 1
+    ys = (rng.random(rooms) * (columns - 1 - widths)).astype(np.int64) + 1
+    for x, y, h, w in zip(xs.tolist(), ys.tolist(), heights.tolist(), widths.tolist()):
+        walkable[x:x + h, y:y + w] = True
+
+    centers_x, centers_y = xs + heights // 2, ys + widths // 2
+    order = np.lexsort((centers_y, centers_x))
+    bends = rng.random(rooms) < 0.5
+    for a, b, bend in zip(order[:-1].tolist(), order[1:].tolist(), bends.tolist()):
+        (ax, ay), (bx, by) = (centers_x[a], centers_y[a]), (centers_x[b], centers_y[b])
+        corner_x, corner_y = (ax, by) if bend else (bx, ay)
+        walkable[min(ax, corner_x):max(ax, corner_x) + 1, min(ay, corner_y):max(ay, corner_y) + 1] = True
+        walkable[min(bx, corner_x):max(bx, corner_x) + 1, min(by, corner_y):max(by, corner_y) + 1] = True
+    return walkable
+
+
+def mirror_maze(size, density=0.3, seed=None, swap=False):
+    """
+    Map like mirror_maze_50x50.xlsx: a square of random obstacles with start
+    and goal mirrored through the center (12, 12) and (37, 37) at size 50.
+    swap exchanges start and goal, as in mirror_maze_50x50_2.xlsx. Obstacles
+    are redrawn until the goal is reachable from the start.
+    """
+    rng = np.random.default_rng(seed)
+    offset = size * 12 // 50
+    start, goal = (offset, offset), (size - 1 - offset, size - 1 - offset)
+    if swap:
+        start, goal = goal, start
+    while True:
+        walkable = random_obstacles(size, size, density, rng)
+        walkable[start] = walkable[goal] = True
+        labels = component_labels(walkable)
+        if labels[start] == labels[goal]:
+            return walkable, start, goal
+
+
+def random_costs(rows, columns, low=1, high=5, seed=None):
+    """
+    Independent uniform integer costs in [low, high], like node_costs_50x50.xlsx.
+    """
+    rng = np.random.default_rng(seed)
+    costs = np.empty((rows, columns), dtype=np.int32)
+    for x0, x1 in _blocks(rows):
+        costs[x0:x1] = rng.integers(low, high + 1, (x1 - x0, columns), dtype=np.int32)
+    return costs
+
+
+def noise_costs(rows, columns, low=1, high=5, scale=32, octaves=3, seed=None):
+    """
+    Smoothly varying integer costs in [low, high] from value noise: random
+    values on a coarse lattice every scale cells, bilinearly interpolated,
+    summed over octaves that each halve the lattice spacing and the amplitude,
+    then stretched so the lowest value maps to low and the highest to high.
+    """
+    rng = np.random.default_rng(seed)
+    layers = []
+    for octave in range(octaves):
+        spacing = max(1, scale >> octave)
+        lattice = rng.random((rows // spacing + 2, columns // spacing + 2), dtype=np.float32)
+        layers.append((spacing, lattice, 0.5 ** octave))
+
+    y = np.arange(columns)
+    noise = np.empty((rows, columns), dtype=np.float32)
+    for x0, x1 in _blocks(rows):
+        x = np.arange(x0, x1)
+        block = noise[x0:x1]
+        block[:] = 0
+        for spacing, lattice, amplitude in layers:
+            gx, fx = np.divmod(x, spacing)
+            gy, fy = np.divmod(y, spacing)
+            fx = (fx / spacing).astype(np.float32)[:, None]
+            fy = (fy / spacing).astype(np.float32)[None, :]
+            top, bottom = lattice[gx], lattice[gx + 1]
+            top = top[:, gy] * (1 - fy) + top[:, gy + 1] * fy
+            bottom = bottom[:, gy] * (1 - fy) + bottom[:, gy + 1] * fy
+            block += amplitude * (top * (1 - fx) + bottom * fx)
+
+    lowest, highest = float(noise.min()), float(noise.max())
+    stretch = (high - low) / (highest - lowest) if highest > lowest else 0.0
+    # float32 and int32 have the same size, so the costs reuse the noise buffer block by block
+    costs = noise.view(np.int32)
+    for x0, x1 in _blocks(rows):
+        costs[x0:x1] = np.rint(low + (noise[x0:x1] - lowest) * stretch)
+    return costs
+
+
+def component_labels(walkable):
+    """
+    Label of the 4-connected walkable component of every cell (-1 for walls).
+    """
+    rows, columns = walkable.shape
+    # Each horizontal run of walkable cells is one node; vertical edges join runs
+    run_start = walkable.copy()
+    run_start[:, 1:] &= ~walkable[:, :-1]
+    run_of = np.cumsum(run_start.reshape(-1), dtype=np.int64) - 1
+    runs = int(run_of[-1]) + 1 if len(run_of) else 0
+    if runs < 2 ** 31:
+        run_of = run_of.astype(np.int32)
+    flat = walkable.reshape(-1)
+    vertical = np.flatnonzero(flat[:-columns] & flat[columns:])
+    labels = _connected_labels(runs, run_of[vertical], run_of[vertical + columns])
+    return np.where(walkable, labels[run_of].reshape(rows, columns), -1)
+
+
+def _sample_cells(rng, labels, wanted, tries=64):
+    """
+    One random cell per entry of wanted: any walkable cell where wanted is -1,
+    else a cell with that component label. Uses rejection sampling, so nothing
+    is sorted or listed; the rare entries still missing after tries rounds (tiny
+    components) are drawn from an explicit list of their component's cells.
+    """
+    cells = np.full(len(wanted), -1, dtype=np.int64)
+    pending = np.arange(len(wanted))
+    for _ in range(tries):
+        if not len(pending):
+            break
+        candidates = rng.integers(len(labels), size=len(pending))
+        found_labels = labels[candidates]
+        found = np.where(wanted[pending] < 0, found_labels >= 0, found_labels == wanted[pending])
+        cells[pending[found]] = candidates[found]
+        pending = pending[~found]
+    for query in pending.tolist():
+        options = np.flatnonzero(labels >= 0 if wanted[query] < 0 else labels == wanted[query])
+        cells[query] = options[rng.integers(len(options))]
+    return cells
+
+
+def generate_queries(grid, count, seed=None, labels=None):
+    """
+    count reproducible (start, goal) pairs of walkable cells, each pair in the
+    same connected component so a path always exists (4-connected moves).
+    labels can pass in component_labels(grid.walkable) when already computed.
+    Returns (starts, goals) as (count, 2) arrays of (x, y).
+    """
+    if not grid.walkable.any():
+        raise ValueError("grid has no walkable cells")
+    rng = np.random.default_rng(seed)
+    labels = (component_labels(grid.walkable) if labels is None else labels).reshape(-1)
+    starts = _sample_cells(rng, labels, np.full(count, -1))
+    goals = _sample_cells(rng, labels, labels[starts])
+    return np.column_stack(np.divmod(starts, grid.columns)), np.column_stack(np.divmod(goals, grid.columns))
+
+
+def generate_map(kind, rows, columns=None, seed=None, costs="random", **options):
+    """
+    Builds a CompactGrid of a MAP_KINDS kind. costs is "random", "noise" or a
+    constant. Start and goal are a reachable pair (the mirrored pair for "mirror").
+    """
+    columns = columns or rows
+    rng = np.random.default_rng(seed)
+    map_seed, cost_seed, query_seed = rng.integers(2 ** 32, size=3).tolist()
+
+    start = goal = None
+    if kind == "random":
+        walkable = random_obstacles(rows, columns, seed=map_seed, **options)
+    elif kind == "backtracker":
+        walkable = backtracker_maze(rows, columns, seed=map_seed)
+    elif kind == "prim":
+        walkable = prim_maze(rows, columns, seed=map_seed)
+    elif kind == "rooms":
+        walkable = rooms_and_corridors(rows, columns, seed=map_seed, **options)
+    elif kind == "mirror":
+        if rows != columns:
+            raise ValueError("mirror mazes are square")
+        walkable, start, goal = mirror_maze(rows, seed=map_seed, **options)
+    else:
+        raise ValueError(f"Unknown map kind {kind!r}, expected one of {MAP_KINDS}")
+
+    if costs == "random":
+        cost = random_costs(rows, columns, seed=cost_seed)
+    elif costs == "noise":
+        cost = noise_costs(rows, columns, seed=cost_seed)
+    else:
+        cost = np.full((rows, columns), costs, dtype=np.int32)
+
+    grid = CompactGrid(walkable, cost, start, goal)
+    if start is None:
+        starts, goals = generate_queries(grid, 1, seed=query_seed)
+        grid.start, grid.goal = tuple(starts[0].tolist()), tuple(goals[0].tolist())
+    return grid
+
+
+def save_map(grid, path, queries=None):
+    """
+    Writes grid in the memory-mapped binary grid format, plus its query set
+    (starts, goals) to <path>.queries.npz when given.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    save_compact_grid(grid, path)
+    if queries is not None:
+        starts, goals = queries
+        with open(f"{path}.queries.npz", "wb") as f:
+            np.savez(f, starts=np.asarray(starts, dtype=np.int64), goals=np.asarray(goals, dtype=np.int64))
+
+
+def load_map(path):
+    """
+    Returns (grid, queries) for a map written by save_map; queries is None if none were saved.
+    """
+    grid = load_compact_grid(path)
+    queries = None
+    if os.path.exists(f"{path}.queries.npz"):
+        with np.load(f"{path}.queries.npz") as data:
+            queries = data["starts"], data["goals"]
+    return grid, queries
+
+
+def generate_tiled_map(path, rows, columns=None, density=0.3, low=1, high=5, seed=None, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Writes a random-obstacle map with uniform random costs in [low, high]
+    straight to a tiled grid file, one tile at a time, so maps far larger than
+    memory (100000 x 100000) can be generated. Each tile has its own seed from
+    (seed, tile position), so the same arguments always give the same map.
+    """
+    columns = columns or rows
+    seed = int(np.random.SeedSequence(seed).entropy % 2 ** 63) if seed is None else seed
+    cost_bits = next(bits for bits in COST_BITS if high < 1 << bits)
+
+    def tile_source(x0, y0, x1, y1):
+        rng = np.random.default_rng([seed, x0, y0])
+        walkable = rng.random((x1 - x0, y1 - y0), dtype=np.float32) >= density
+        return walkable, rng.integers(low, high + 1, (x1 - x0, y1 - y0), dtype=np.int32)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_tiled_grid(path, rows, columns, tile_source, tile_size, cost_bits)
+
+
+def main():
+    output_directory = "common/grids/.cache/generated"
+    for kind in MAP_KINDS:
+        grid = generate_map(kind, 1001, seed=0, costs="noise")
+        queries = generate_queries(grid, 1000, seed=0)
+        path = os.path.join(output_directory, f"{kind}_1001x1001.grid")
+        save_map(grid, path, queries)
+        print(f"{kind}: {path} ({grid.walkable.mean():.1%} walkable, start {grid.start}, goal {grid.goal})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+import struct
+from collections import OrderedDict
+import numpy as np
+from common.adjacency import move_table
+from common.compact_grid import CompactGrid
+
+# Out-of-core grid format for maps too large for memory. The map is cut into
+# tile_size x tile_size tiles stored one after another (row-major). A tile is
+# its walkability bit-packed (1 bit per cell) followed by its costs packed to
+# cost_bits (4, 8 or 16) per cell; edge tiles are padded with walls. The file
+# is memory-mapped and tiles are unpacked only when a search reaches them.
+MAGIC = b"ATGR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQQIIqqqqQ")
+DEFAULT_TILE_SIZE = 256
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+COST_BITS = (4, 8, 16)
+
+
+def _tile_bytes(tile_size, cost_bits):
+    cells = tile_size * tile_size
+    return cells // 8, cells * cost_bits // 8
+
+
+def write_tiled_grid(path, rows, columns, tile_source, tile_size=DEFAULT_TILE_SIZE, cost_bits=8, start=None, goal=None):
+    """
+    Writes a tiled grid one tile at a time, so the map never has to fit in
+    memory. tile_source(x0, y0, x1, y1) returns the (walkable, cost) arrays of
+    the cells x0 <= x < x1, y0 <= y < y1. Costs must fit in cost_bits.
+    """
+    if tile_size <= 0 or tile_size % 8:
+        raise ValueError("tile_size must be a positive multiple of 8")
+    if cost_bits not in COST_BITS:
+        raise ValueError(f"cost_bits must be one of {COST_BITS}")
+    start = start if start is not None else (-1, -1)
+    goal = goal if goal is not None else (-1, -1)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, cost_bits, rows, columns, tile_size, 0,
+                         start[0], start[1], goal[0], goal[1], HEADER.size)
+    max_cost = (1 << cost_bits) - 1
+
+    # Write to a temporary file first so readers never see a partial grid
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for x0 in range(0, rows, tile_size):
+            for y0 in range(0, columns, tile_size):
+                x1, y1 = min(x0 + tile_size, rows), min(y0 + tile_size, columns)
+                walkable, cost = tile_source(x0, y0, x1, y1)
+                tile_walkable = np.zeros((tile_size, tile_size), dtype=np.bool_)
+                tile_cost = np.zeros((tile_size, tile_size), dtype=np.int64)
+                tile_walkable[:x1 - x0, :y1 - y0] = walkable
+                tile_cost[:x1 - x0, :y1 - y0] = cost
+                if tile_cost.min() < 0 or tile_cost.max() > max_cost:
+                    raise ValueError(f"costs of tile ({x0}, {y0}) do not fit in {cost_bits} bits")
+                f.write(np.packbits(tile_walkable).tobytes())
+                f.write(_pack_costs(tile_cost.reshape(-1), cost_bits))
+    os.replace(tmp_path, path)
+
+
+def _pack_costs(cost, cost_bits):
+    if cost_bits == 4:
+        return ((cost[0::2] << 4) | cost[1::2]).astype(np.uint8).tobytes()
+    return cost.astype(np.uint8 if cost_bits == 8 else "<u2").tobytes()
+
+
+def save_tiled_grid(grid, path, tile_size=DEFAULT_TILE_SIZE, cost_bits=None):
+    """
+    Writes a CompactGrid in the tiled format. cost_bits defaults to the
+    smallest width that holds every cost.
+    """
+    if cost_bits is None:
+        max_cost = int(grid.cost.max()) if grid.size else 0
+        cost_bits = next((bits for bits in COST_BITS if max_cost < 1 << bits), None)
+        if cost_bits is None:
+            raise ValueError(f"cost {max_cost} does not fit in {COST_BITS[-1]} bits")
+    source = lambda x0, y0, x1, y1: (grid.walkable[x0:x1, y0:y1], grid.cost[x0:x1, y0:y1])
+    write_tiled_grid(path, grid.rows, grid.columns, source, tile_size, cost_bits, grid.start, grid.goal)
+
+
+def load_tiled_grid(path, max_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Opens a tiled grid file. At most max_bytes of unpacked tiles are kept in memory.
+    """
+    return TiledGrid(path, max_bytes)
+
+
+class _Layer:
+    # grid.walkable[x, y] / grid.cost[x, y] for code written against CompactGrid
+    def __init__(self, grid, layer):
+        self.grid = grid
+        self.layer = layer
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    def __getitem__(self, cell):
+        x, y = cell
+        if not self.grid.in_bounds(x, y):
+            raise IndexError(f"{cell} is outside the grid")
+        return self.grid._cell(x, y)[self.layer]
+
+
+class TiledGrid:
+    """
+    Read-only grid backed by a tiled grid file. Cells are addressed like a
+    CompactGrid, by (x, y) or by flat index x * columns + y, and
+    neighbors(index) gives the same (neighbor_index, edge_cost) pairs as
+    Adjacency.neighbors, so a search loads only the tiles its frontier
+    reaches. Unpacked tiles are kept in an LRU cache of at most max_bytes;
+    hits, misses, evictions and tiles_loaded (distinct tiles read) count
+    its use.
+
+    There is no full-grid adjacency or SearchContext for a map this size;
+    use the searches in algorithms/tiled.py, or region() to copy part of the
+    map into a CompactGrid for the other algorithms.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_CACHE_BYTES):
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{path} is not a tiled grid file")
+        magic, version, cost_bits, rows, columns, tile_size, _, sx, sy, gx, gy, data_offset = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} tiled grid file")
+
+        self.path = path
+        self.rows, self.columns = rows, columns
+        self.tile_size = tile_size
+        self.cost_bits = cost_bits
+        self.tile_rows = -(-rows // tile_size)
+        self.tile_columns = -(-columns // tile_size)
+        self.start = (sx, sy) if sx >= 0 else None
+        self.goal = (gx, gy) if gx >= 0 else None
+        self.version = 0
+        self.walkable = _Layer(self, 0)
+        self.cost = _Layer(self, 1)
+
+        self._walkable_bytes, self._cost_bytes = _tile_bytes(tile_size, cost_bits)
+        self._data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset,
+                               shape=(self.tile_rows * self.tile_columns, self._walkable_bytes + self._cost_bytes))
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()  # tile number -> (walkable, cost) memoryviews
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tiles_loaded = 0
+        self._read = set()
+        self._last = (-1, None)
+
+    @property
+    def shape(self):
+        return self.rows, self.columns
+
+    @property
+    def size(self):
+        return self.rows * self.columns
+
+    @property
+    def tile_count(self):
+        return self.tile_rows * self.tile_columns
+
+    @property
+    def file_bytes(self):
+        return self._data.nbytes
+
+    def index(self, x, y):
+        return x * self.columns + y
+
+    def coords(self, index):
+        return divmod(index, self.columns)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.rows and 0 <= y < self.columns
+
+    def is_walkable(self, x, y):
+        return bool(self._cell(x, y)[0])
+
+    def tile(self, number):
+        """
+        Unpacked (walkable, cost) of a tile as flat memoryviews of
+        tile_size * tile_size cells, loading it on a miss.
+        """
+        last_number, last_tile = self._last
+        if number == last_number:
+            return last_tile
+        tile = self.tiles.get(number)
+        if tile is not None:
+            self.tiles.move_to_end(number)
+            self.hits += 1
+        else:
+            tile = self._load(number)
+        self._last = (number, tile)
+        return tile
+
+    def _load(self, number):
+        self.misses += 1
+        if number not in self._read:
+            self._read.add(number)
+            self.tiles_loaded += 1
+        raw = self._data[number]
+        walkable = np.unpackbits(raw[:self._walkable_bytes])
+        packed = raw[self._walkable_bytes:]
+        if self.cost_bits == 4:
+            cost = np.empty(2 * len(packed), dtype=np.uint8)
+            cost[0::2] = packed >> 4
+            cost[1::2] = packed & 0x0F
+        elif self.cost_bits == 8:
+            cost = np.array(packed)
+        else:
+            cost = packed.view("<u2").copy()
+
+        # memoryviews give plain Python ints inside the search loops
+        tile = (memoryview(walkable), memoryview(cost))
+        self.tiles[number] = tile
+        self.nbytes += walkable.nbytes + cost.nbytes
+        # Always keep the newest tile, even if it alone exceeds the budget
+        while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+            _, (old_walkable, old_cost) = self.tiles.popitem(last=False)
+            self.nbytes -= old_walkable.nbytes + old_cost.nbytes
+            self.evictions += 1
+        return tile
+
+    def _cell(self, x, y):
+        tile_x, offset_x = divmod(x, self.tile_size)
+        tile_y, offset_y = divmod(y, self.tile_size)
+        walkable, cost = self.tile(tile_x * self.tile_columns + tile_y)
+        offset = offset_x * self.tile_size + offset_y
+        return walkable[offset], cost[offset]
+
+    def neighbors(self, index, moves=4):
+        """
+        Returns (neighbor_index, edge_cost) pairs like Adjacency.neighbors: walls
+        have no edges in or out, and an edge costs the entered cell's cost plus the move
+        cost. Diagonal moves need both cells they cut past to be walkable.
+        """
+        x, y = divmod(index, self.columns)
+        result = []
+        if not self._cell(x, y)[0]:
+            return result  # Walls have no edges, as in the CSR adjacency
+        for (dx, dy), move_cost in move_table(moves).items():
+            new_x, new_y = x + dx, y + dy
+            if not (0 <= new_x < self.rows and 0 <= new_y < self.columns):
+                continue
+            walkable, cost = self._cell(new_x, new_y)
+            if not walkable:
+                continue
+            if dx and dy and not (self._cell(x + dx, y)[0] and self._cell(x, y + dy)[0]):
+                continue
+            result.append((new_x * self.columns + new_y, cost + move_cost))
+        return result
+
+    def region(self, x0, y0, x1, y1):
+        """
+        Copies the cells x0 <= x < x1, y0 <= y < y1 into a CompactGrid, for
+        running the in-memory algorithms on part of the map. Cells keep their
+        coordinates relative to (x0, y0).
+        """
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.rows), min(y1, self.columns)
+        size = self.tile_size
+        walkable = np.zeros((x1 - x0, y1 - y0), dtype=np.bool_)
+        cost = np.zeros((x1 - x0, y1 - y0), dtype=np.int32)
+        for tile_x in range(x0 // size, -(-x1 // size)):
+            for tile_y in range(y0 // size, -(-y1 // size)):
+                tile_walkable, tile_cost = self.tile(tile_x * self.tile_columns + tile_y)
+                # Overlap of this tile with the region, in grid coordinates
+                ax, bx = max(x0, tile_x * size), min(x1, (tile_x + 1) * size)
+                ay, by = max(y0, tile_y * size), min(y1, (tile_y + 1) * size)
+                tile_area = (slice(ax - tile_x * size, bx - tile_x * size), slice(ay - tile_y * size, by - tile_y * size))
+                walkable[ax - x0:bx - x0, ay - y0:by - y0] = np.asarray(tile_walkable).reshape(size, size)[tile_area]
+                cost[ax - x0:bx - x0, ay - y0:by - y0] = np.asarray(tile_cost).reshape(size, size)[tile_area]
+        return CompactGrid(walkable, cost)
+
+    def clear_cache(self):
+        """
+        Drops every cached tile and resets the hit, miss, eviction and
+        tiles_loaded counters, so they describe only what comes after.
+        """
+        self.tiles.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tiles_loaded = 0
+        self._read.clear()
+        self._last = (-1, None)
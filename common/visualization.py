@@ -1,61 +1,144 @@
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap
 import numpy as np
 
-def visualize_grid(start_node, goal_node, grid, path, algorithm):
+# Images are built as RGB arrays. Maps larger than MAX_IMAGE_SIZE cells per
+# side are shrunk by block pooling, and gridlines are only drawn up to
+# GRIDLINE_LIMIT cells per side, where they stay readable.
+MAX_IMAGE_SIZE = 1024
+GRIDLINE_LIMIT = 100
+
+OBSTACLE = (0, 0, 0)
+FREE = (255, 255, 255)
+START = (0, 128, 0)
+GOAL = (255, 0, 0)
+PATH_COLORS = [(0, 0, 255), (255, 140, 0), (148, 0, 211), (0, 170, 170), (220, 20, 140), (128, 128, 0)]
+# Heatmap colors from low to high values
+HEAT_COLORS = np.array([(255, 255, 178), (254, 204, 92), (253, 141, 60), (240, 59, 32), (189, 0, 38)], dtype=np.float64)
+
+
+def _pool_factor(shape, max_size):
+    return max(1, -(-max(shape) // max_size))
+
+
+def _pool(values, factor, reduce, fill):
     """
-    Visualizes the grid with obstacles, path, and start/goal nodes.
-    Dynamically adjusts the legend based on the algorithm name.
+    Reduces each factor x factor block of a 2D array with reduce (np.mean, np.max, ...).
+    """
+    if factor == 1:
+        return values
+    rows, columns = values.shape
+    padded = np.full((-(-rows // factor) * factor, -(-columns // factor) * factor), fill, dtype=values.dtype)
+    padded[:rows, :columns] = values
+    blocks = padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor)
+    return reduce(blocks, axis=(1, 3))
+
+
+def _heat_colors(values):
+    # Piecewise linear colormap over HEAT_COLORS for values in [0, 1]
+    anchors = np.linspace(0, 1, len(HEAT_COLORS))
+    return np.stack([np.interp(values, anchors, HEAT_COLORS[:, c]) for c in range(3)], axis=-1).astype(np.uint8)
+
+
+def render_grid(grid, paths=(), start=None, goal=None, heatmap=None, max_size=MAX_IMAGE_SIZE):
+    """
+    Renders grid to an RGB uint8 array of at most max_size pixels per side.
+    paths is a sequence of paths of (x, y) cells, each drawn in its own color.
+    heatmap is an array of the grid's shape (e.g. ExpansionTrace.heatmap);
+    negative or NaN cells are left out and the rest are colored low to high.
+
+    Large maps are shrunk by pooling factor x factor blocks: free space is
+    averaged (gray where blocks mix walls and free cells), heat is max-pooled,
+    and paths, start and goal mark every block they touch, so thin features survive.
     """
-    rows = len(grid)
-    columns = len(grid[0])
+    factor = _pool_factor(grid.shape, max_size)
 
-    # Colors:              obstacles, free,    path,   start, goal
-    cmap = ListedColormap(["black", "white", "green", "blue", "red"])  
-    visual_grid = [[0 for _ in range(columns)] for _ in range(rows)]
+    # Free share of each block: 1 is white, 0 is black
+    free = _pool(grid.walkable, factor, lambda b, axis: b.mean(axis=axis), False)
+    shade = (np.asarray(free, dtype=np.float64) * 255).astype(np.uint8)
+    image = np.repeat(shade[:, :, None], 3, axis=2)
 
-    # Fill the visual grid
-    for x in range(rows):
-        for y in range(columns):
-            if not grid[x][y].is_walkable:
-                visual_grid[x][y] = 0  # Obstacles
-            else:
-                visual_grid[x][y] = 1  # Free space
+    if heatmap is not None:
+        # Pool first and scale the (much smaller) pooled values to the visible range
+        heat = np.asarray(heatmap)
+        if heat.dtype.kind == 'f':
+            heat = np.where(np.isnan(heat), -1, heat)
+        pooled = _pool(heat, factor, np.max, -1)
+        marked = pooled >= 0
+        if marked.any():
+            values = pooled[marked].astype(np.float64)
+            low, high = values.min(), values.max()
+            image[marked] = _heat_colors((values - low) / (high - low) if high > low else np.zeros_like(values))
 
-    for node in path:
-        visual_grid[node.x][node.y] = 3  # Path
+    for number, path in enumerate(paths):
+        if len(path):
+            cells = np.asarray(path, dtype=np.int64).reshape(-1, 2) // factor
+            image[cells[:, 0], cells[:, 1]] = PATH_COLORS[number % len(PATH_COLORS)]
 
-    visual_grid[start_node.x][start_node.y] = 2  # Start
-    visual_grid[goal_node.x][goal_node.y] = 4  # Goal
+    # Start and goal get a small outlined square so they stay visible on big images
+    radius = max(image.shape[:2]) // 256
+    for cell, color in ((start, START), (goal, GOAL)):
+        if cell is not None:
+            x, y = cell[0] // factor, cell[1] // factor
+            if radius:
+                image[max(0, x - radius - 1):x + radius + 2, max(0, y - radius - 1):y + radius + 2] = OBSTACLE
+            image[max(0, x - radius):x + radius + 1, max(0, y - radius):y + radius + 1] = color
+    return image
+
+
+def save_grid_image(file_path, grid, paths=(), start=None, goal=None, heatmap=None, max_size=MAX_IMAGE_SIZE):
+    """
+    Writes render_grid's image straight to a PNG file. It needs no display and
+    creates no figure, so it works on headless servers.
+    """
+    from matplotlib.image import imsave
+    image = render_grid(grid, paths, start, goal, heatmap, max_size)
+    imsave(file_path, image, origin='lower')
+    return image
+
+
+def visualize_grid(start, goal, grid, path, algorithm, output_path=None, paths=None, heatmap=None):
+    """
+    Visualizes the grid with obstacles, path, and start/goal nodes.
+    Dynamically adjusts the legend based on the algorithm name.
+    Start, goal and path cells are (x, y) tuples.
+
+    paths optionally maps more labels to paths drawn on top, and heatmap
+    overlays per-cell values. With output_path the figure is saved there
+    instead of shown, so it never blocks.
+    """
+    import matplotlib
+    if output_path is not None:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    rows, columns = grid.shape
+    labeled_paths = {f'{algorithm} Path': path, **(paths or {})}
+    image = render_grid(grid, list(labeled_paths.values()), start, goal, heatmap)
 
     # Create the plot
     plt.figure(figsize=(10, 10))
-    plt.imshow(visual_grid, cmap=cmap, origin='lower')
-
-    # Move the grid lines by 0.5 to align exactly with pathing
-    plt.xlim(-0.5, columns - 0.5)
-    plt.ylim(-0.5, rows - 0.5)
-    
-    # Set up grid lines at each integer boundary
-    plt.gca().set_xticks(np.arange(-0.5, columns, 1))
-    plt.gca().set_yticks(np.arange(-0.5, rows, 1))
-    
-    # Turn on the grid, and remove axis labels
+    plt.imshow(image, origin='lower', interpolation='nearest')
+
+    if max(rows, columns) <= GRIDLINE_LIMIT:
+        # Set up grid lines at each integer boundary
+        plt.gca().set_xticks(np.arange(-0.5, columns, 1))
+        plt.gca().set_yticks(np.arange(-0.5, rows, 1))
+        plt.grid(which="both", color="black", linestyle="-", linewidth=0.5)
+    else:
+        plt.gca().set_xticks([])
+        plt.gca().set_yticks([])
     plt.gca().set_xticklabels([])
     plt.gca().set_yticklabels([])
-    plt.grid(which="both", color="black", linestyle="-", linewidth=0.5)
 
     # Add legend
-    colors = ['black', 'white', 'blue', 'green', 'red']
-    labels = [
-        'Obstacle',
-        'Free Space',
-        f'{algorithm} Path',
-        'Start',
-        'Goal'
-    ]
-    handles = [plt.Line2D([0], [0], color=color, marker='o', linestyle='', markersize=10) for color in colors]
+    colors = [OBSTACLE, FREE] + [PATH_COLORS[i % len(PATH_COLORS)] for i in range(len(labeled_paths))] + [START, GOAL]
+    labels = ['Obstacle', 'Free Space'] + list(labeled_paths) + ['Start', 'Goal']
+    handles = [plt.Line2D([0], [0], color=np.array(color) / 255, marker='o', linestyle='', markersize=10,
+                          markeredgecolor='gray') for color in colors]
     plt.legend(handles, labels, loc='upper left', bbox_to_anchor=(1, 1))
 
     plt.title(f"Grid Visualization with {algorithm}")
-    plt.show()
+    if output_path is None:
+        plt.show()
+    else:
+        plt.savefig(output_path, bbox_inches="tight")
+        plt.close()
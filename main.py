@@ -1,17 +1,141 @@
-from algorithms import bfs, dfs, ucs, astar
-
-def main():
-    choice = input("Choose algorithm (bfs/dfs/ucs/astar): ").strip().lower()
-    if choice == "bfs":
-        bfs.main()
-    elif choice == "dfs":
-        dfs.main()   
-    elif choice == "ucs":
-        ucs.main()
-    elif choice == "astar":
-        astar.main()
+import argparse
+import csv
+import importlib
+import json
+import statistics
+import sys
+import time
+
+MAZE_FILE_PATH = "common/grids/mirror_maze_50x50.xlsx"
+COST_FILE_PATH = "common/grids/node_costs_50x50.xlsx"
+
+# (algorithm, variant) -> (module, function). Modules are imported only when
+# their search is chosen, and plotting/Excel libraries only when needed, so a
+# headless query does not pay for matplotlib or pandas.
+SEARCHES = {
+    ("bfs", "graph"): ("algorithms.bfs", "bfs_graph"),
+    ("bfs", "tree"): ("algorithms.bfs", "bfs_tree"),
+    ("dfs", "graph"): ("algorithms.dfs", "dfs_graph"),
+    ("dfs", "tree"): ("algorithms.dfs", "dfs_tree"),
+    ("ucs", "graph"): ("algorithms.ucs", "ucs_graph_pathfind"),
+    ("ucs", "tree"): ("algorithms.ucs", "ucs_tree_pathfind"),
+    ("astar", "graph"): ("algorithms.astar", "astar_graph_pathfind"),
+    ("astar", "tree"): ("algorithms.astar", "astar_tree_pathfind"),
+}
+ALGORITHM_NAMES = {"bfs": "BFS", "dfs": "DFS", "ucs": "UCS", "astar": "A*"}
+FIELDS = ["algorithm", "variant", "maze", "start", "goal", "cost", "path_length", "nodes_expanded",
+          "repeat", "min_ms", "median_ms", "mean_ms", "max_ms"]
+
+
+def load_search(algorithm, variant):
+    """
+    Returns the raw search function: (start, goal, grid) -> (path, nodes_expanded, ..., total_cost).
+    """
+    module_name, function_name = SEARCHES[(algorithm, variant)]
+    search = getattr(importlib.import_module(module_name), function_name)
+    # Skip the printing track_performance wrapper; the CLI does its own timing
+    return getattr(search, "__wrapped__", search)
+
+
+def parse_cell(text):
+    try:
+        x, y = (int(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected X,Y, got {text!r}")
+    return x, y
+
+
+def run(args):
+    from common.grid import read_grid
+    from common.performance import memory_tracking
+
+    # The shared cost sheet only applies to Excel mazes; other formats carry or default their costs
+    costs = args.costs or (COST_FILE_PATH if args.maze.endswith(".xlsx") else None)
+    start, goal, grid, _ = read_grid(args.maze, costs)
+    start = args.start or start
+    goal = args.goal or goal
+    for name, cell in (("start", start), ("goal", goal)):
+        if cell is None or not grid.in_bounds(*cell) or not grid.is_walkable(*cell):
+            raise SystemExit(f"error: {name} {cell} is not a walkable cell of {args.maze}")
+
+    search = load_search(args.algorithm, args.variant)
+    times = []
+    # ucs and dfs trace their own memory unless told not to, which would skew the timings
+    with memory_tracking(False):
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            result = search(start, goal, grid)
+            times.append(time.perf_counter() - start_time)
+    path, nodes_expanded, total_cost = result[0], result[1], result[-1]
+
+    row = {
+        "algorithm": args.algorithm,
+        "variant": args.variant,
+        "maze": args.maze,
+        "start": list(start),
+        "goal": list(goal),
+        "cost": int(total_cost) if path else None,
+        "path_length": len(path),
+        "nodes_expanded": int(nodes_expanded),
+        "repeat": args.repeat,
+        "min_ms": min(times) * 1000,
+        "median_ms": statistics.median(times) * 1000,
+        "mean_ms": statistics.mean(times) * 1000,
+        "max_ms": max(times) * 1000,
+    }
+    return row, path, grid
+
+
+def print_row(row, path, output_format, show_path):
+    if output_format == "json":
+        if show_path:
+            row = {**row, "path": [[int(x), int(y)] for x, y in path]}
+        json.dump(row, sys.stdout)
+        print()
+    elif output_format == "csv":
+        writer = csv.DictWriter(sys.stdout, FIELDS)
+        writer.writeheader()
+        writer.writerow({**row, "start": "%d,%d" % tuple(row["start"]), "goal": "%d,%d" % tuple(row["goal"])})
     else:
-        print("Invalid choice.")
+        name = f"{ALGORITHM_NAMES[row['algorithm']]} {row['variant'].capitalize()} Search"
+        print(f"######### {name.upper()} ON {row['maze']} #########")
+        if not path:
+            print(f"No path from {tuple(row['start'])} to {tuple(row['goal'])}")
+        else:
+            print(f"Path Cost: {row['cost']}")
+            print(f"Path Length: {row['path_length']}")
+        print(f"Nodes Expanded: {row['nodes_expanded']}")
+        print(f"Execution Time: {row['median_ms']:.3f} ms (median of {row['repeat']}, "
+              f"min {row['min_ms']:.3f}, max {row['max_ms']:.3f})")
+        if show_path:
+            print(f"Path: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one pathfinding search on a maze.")
+    parser.add_argument("algorithm", nargs="?", default="astar", choices=sorted(ALGORITHM_NAMES))
+    parser.add_argument("--variant", default="graph", choices=["graph", "tree"])
+    parser.add_argument("--maze", default=MAZE_FILE_PATH,
+                        help="maze .xlsx, .grid, MovingAI .map, .csv/.txt matrix or .pgm/.png image (default: %(default)s)")
+    parser.add_argument("--costs", help=f"cost file (default for .xlsx mazes: {COST_FILE_PATH})")
+    parser.add_argument("--start", type=parse_cell, metavar="X,Y", help="override the maze's start cell")
+    parser.add_argument("--goal", type=parse_cell, metavar="X,Y", help="override the maze's goal cell")
+    parser.add_argument("--repeat", type=int, default=1, help="run the search this many times and report timings")
+    parser.add_argument("--format", default="text", choices=["text", "json", "csv"])
+    parser.add_argument("--path", action="store_true", help="include the path in the output")
+    parser.add_argument("--plot", action="store_true", help="show the path in a matplotlib window")
+    parser.add_argument("--output", metavar="PNG", help="save the plot to a PNG file instead of showing it")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    row, path, grid = run(args)
+    print_row(row, path, args.format, args.path)
+
+    if args.plot or args.output:
+        from common.visualization import visualize_grid
+        name = f"{ALGORITHM_NAMES[args.algorithm]} {args.variant.capitalize()} Search"
+        visualize_grid(tuple(row["start"]), tuple(row["goal"]), grid, path, algorithm=name, output_path=args.output)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,167 @@
+import asyncio
+import http.client
+import json
+import socket
+from service.server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class ServiceError(Exception):
+    """
+    Error response from the path service, with its HTTP status.
+    """
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def _query(grid, start, goal, algorithm, options):
+    query = {"grid": grid, "algorithm": algorithm, "start": list(start), "goal": list(goal)}
+    if options:
+        query["options"] = options
+    return query
+
+
+def _decode(status, data):
+    payload = json.loads(data) if data else {}
+    if status != 200:
+        raise ServiceError(status, payload.get("error", "unknown error"))
+    return payload
+
+
+class PathClient:
+    """
+    Blocking client for the path service over localhost TCP or a Unix socket.
+    Keeps one connection open between requests.
+
+        with PathClient() as client:
+            result = client.path("mirror_maze_50x50", (0, 0), (49, 49))
+            result["path"], result["cost"]
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None, timeout=60):
+        if unix_socket:
+            self.connection = _UnixHTTPConnection(unix_socket, timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        self.connection.request(method, path, body, headers)
+        response = self.connection.getresponse()
+        return _decode(response.status, response.read())
+
+    def path(self, grid, start, goal, algorithm="astar", **options):
+        """
+        One query; returns {"path", "cost", "nodes_expanded", "search_ms", ...}.
+        options are passed to the search (e.g. weight=2 for weighted_astar).
+        """
+        return self.request("POST", "/path", _query(grid, start, goal, algorithm, options))
+
+    def paths(self, queries):
+        """
+        Several (grid, start, goal, algorithm) queries in one request; results in the same order.
+        """
+        payload = {"queries": [_query(*query, None) if len(query) == 4 else _query(*query) for query in queries]}
+        return self.request("POST", "/paths", payload)["results"]
+
+    def grids(self):
+        return self.request("GET", "/grids")["grids"]
+
+    def algorithms(self):
+        return self.request("GET", "/algorithms")["algorithms"]
+
+    def random_queries(self, grid, count, seed=None):
+        """
+        (starts, goals) lists of count reachable pairs on grid, picked by the server.
+        """
+        target = f"/grids/{grid}/queries?count={count}" + (f"&seed={seed}" if seed is not None else "")
+        result = self.request("GET", target)
+        return result["starts"], result["goals"]
+
+    def stats(self):
+        return self.request("GET", "/stats")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncPathClient:
+    """
+    asyncio client over one keep-alive connection. Requests on one client run
+    one after another; open several clients for concurrent requests.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        if self.unix_socket:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.unix_socket)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+            self._writer.write(
+                f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await self._writer.drain()
+
+            status = int((await self._reader.readline()).split()[1])
+            headers = {}
+            while True:
+                line = await self._reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+            if headers.get("connection", "").lower() == "close":
+                await self.close()
+        return _decode(status, data)
+
+    async def path(self, grid, start, goal, algorithm="astar", **options):
+        return await self.request("POST", "/path", _query(grid, start, goal, algorithm, options))
+
+    async def stats(self):
+        return await self.request("GET", "/stats")
+
+    async def random_queries(self, grid, count, seed=None):
+        target = f"/grids/{grid}/queries?count={count}" + (f"&seed={seed}" if seed is not None else "")
+        result = await self.request("GET", target)
+        return result["starts"], result["goals"]
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = self._reader = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
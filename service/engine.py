@@ -0,0 +1,205 @@
+import os
+import time
+from common.grid import read_grid
+from common.simulator import load_map
+from common.performance import memory_tracking
+from algorithms.astar import astar_graph_pathfind, astar_tree_pathfind
+from algorithms.ucs import ucs_graph_pathfind, ucs_tree_pathfind
+from algorithms.bfs import bfs_graph, bfs_tree, bfs_vectorized
+from algorithms.dfs import dfs_graph, dfs_tree
+from algorithms.bidirectional import bidirectional_astar, bidirectional_ucs, bidirectional_bfs
+from algorithms.hpa import build_abstraction, hpa_pathfind
+from algorithms.flow_field import FlowFieldCache, flow_field_pathfind
+from algorithms.landmarks import build_landmarks
+from algorithms.anytime import weighted_astar, focal_search, ara_star
+from algorithms.memory_bounded import ida_star, iddfs, sma_star
+
+# Search side of the path service. It runs inside the worker processes: each
+# worker loads every grid once and builds the per-grid indexes (HPA*
+# abstraction, flow fields, landmark tables) the first time a query needs
+# them, so later queries find everything warm.
+
+GRID_DIRECTORY = "common/grids"
+COST_FILE_PATH = "common/grids/node_costs_50x50.xlsx"
+
+
+class GridSpec:
+    """
+    Where to load a named grid from: a maze .xlsx with its cost .xlsx, a
+    binary .grid file written by common.simulator.save_map, or any map file
+    read_grid accepts (.map, .csv/.txt, .pgm/.png, costs optional).
+    """
+    def __init__(self, name, maze_file_path, cost_file_path=None):
+        if cost_file_path is None and maze_file_path.endswith(".xlsx"):
+            raise ValueError(f"{maze_file_path} needs a cost file")
+        self.name = name
+        self.maze_file_path = maze_file_path
+        self.cost_file_path = cost_file_path
+
+    def load(self):
+        if self.maze_file_path.endswith(".grid"):
+            grid, _ = load_map(self.maze_file_path)
+            return grid
+        _, _, grid, _ = read_grid(self.maze_file_path, self.cost_file_path)
+        return grid
+
+    def __repr__(self):
+        return f"GridSpec({self.name!r}, {self.maze_file_path!r}, {self.cost_file_path!r})"
+
+
+def default_grid_specs():
+    """
+    Every maze in common/grids, named after its file, with the shared cost file.
+    """
+    maze_files = sorted(f for f in os.listdir(GRID_DIRECTORY) if f.endswith(".xlsx") and not f.startswith("node_costs"))
+    return [GridSpec(os.path.splitext(f)[0], os.path.join(GRID_DIRECTORY, f), COST_FILE_PATH) for f in maze_files]
+
+
+def parse_grid_spec(text):
+    """
+    Parses "name=maze.xlsx,costs.xlsx", "name=map.grid" or "name=arena.map" from the command line.
+    """
+    name, sep, files = text.partition("=")
+    if not sep or not name or not files:
+        raise ValueError(f"Expected NAME=MAZE[,COSTS], got {text!r}")
+    return GridSpec(name, *files.split(",", 1))
+
+
+class GridIndexes:
+    """
+    Per-grid search indexes, each built on first use.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self._abstraction = None
+        self._flow_fields = None
+        self._landmarks = None
+
+    @property
+    def abstraction(self):
+        if self._abstraction is None:
+            self._abstraction = build_abstraction(self.grid)
+        return self._abstraction
+
+    @property
+    def flow_fields(self):
+        if self._flow_fields is None:
+            self._flow_fields = FlowFieldCache(self.grid)
+        return self._flow_fields
+
+    @property
+    def landmarks(self):
+        if self._landmarks is None:
+            self._landmarks = build_landmarks(self.grid, seed=0)
+        return self._landmarks
+
+
+def _plain(search):
+    # Searches returning (path, nodes_expanded, ..., total_cost)
+    def run(start, goal, grid, indexes, **options):
+        result = search(start, goal, grid, **options)
+        return result[0], result[1], result[-1], {}
+    return run
+
+
+def _hpa(start, goal, grid, indexes, **options):
+    path, nodes_expanded, total_cost = hpa_pathfind.__wrapped__(start, goal, grid, indexes.abstraction, **options)
+    return path, nodes_expanded, total_cost, {}
+
+
+def _flow_field(start, goal, grid, indexes):
+    path, nodes_expanded, total_cost = flow_field_pathfind.__wrapped__(start, goal, grid, indexes.flow_fields)
+    return path, nodes_expanded, total_cost, {}
+
+
+def _astar_landmarks(start, goal, grid, indexes, **options):
+    path, nodes_expanded, total_cost = astar_graph_pathfind.__wrapped__(start, goal, grid, heuristic=indexes.landmarks, **options)
+    return path, nodes_expanded, total_cost, {}
+
+
+def _ara(start, goal, grid, indexes, **options):
+    path, nodes_expanded, total_cost, bound = ara_star.__wrapped__(start, goal, grid, **options)
+    return path, nodes_expanded, total_cost, {"bound": bound}
+
+
+# name -> run(start, goal, grid, indexes, **options) -> (path, nodes_expanded, total_cost, extra)
+SEARCHES = {
+    "astar": _plain(astar_graph_pathfind.__wrapped__),
+    "astar_tree": _plain(astar_tree_pathfind.__wrapped__),
+    "astar_landmarks": _astar_landmarks,
+    "ucs": _plain(ucs_graph_pathfind),
+    "ucs_tree": _plain(ucs_tree_pathfind),
+    "bfs": _plain(bfs_graph.__wrapped__),
+    "bfs_tree": _plain(bfs_tree.__wrapped__),
+    "bfs_vectorized": _plain(bfs_vectorized.__wrapped__),
+    "dfs": _plain(dfs_graph),
+    "dfs_tree": _plain(dfs_tree),
+    "bidirectional_astar": _plain(bidirectional_astar.__wrapped__),
+    "bidirectional_ucs": _plain(bidirectional_ucs.__wrapped__),
+    "bidirectional_bfs": _plain(bidirectional_bfs.__wrapped__),
+    "hpa": _hpa,
+    "flow_field": _flow_field,
+    "weighted_astar": _plain(weighted_astar.__wrapped__),
+    "focal": _plain(focal_search.__wrapped__),
+    "ara": _ara,
+    "ida_star": _plain(ida_star.__wrapped__),
+    "iddfs": _plain(iddfs.__wrapped__),
+    "sma_star": _plain(sma_star.__wrapped__),
+}
+
+
+_worker_specs = {}
+_worker_grids = {}
+
+def init_worker(specs, preload=True):
+    """
+    Pool initializer: remembers the grid specs and, with preload, loads every
+    grid right away so the first queries do not pay for it.
+    """
+    _worker_specs.update((spec.name, spec) for spec in specs)
+    if preload:
+        for name in _worker_specs:
+            worker_grid(name)
+
+def worker_grid(name):
+    """
+    (grid, indexes) of a named grid, loaded once per process.
+    """
+    entry = _worker_grids.get(name)
+    if entry is None:
+        grid = _worker_specs[name].load()
+        entry = _worker_grids[name] = (grid, GridIndexes(grid))
+    return entry
+
+
+def run_query(grid_name, algorithm, start, goal, options=None):
+    """
+    Runs one search in this process and returns its JSON-ready result.
+    """
+    grid, indexes = worker_grid(grid_name)
+    # ucs and dfs trace their own memory unless told not to, which would dominate search_ms
+    with memory_tracking(False):
+        start_time = time.perf_counter()
+        path, nodes_expanded, total_cost, extra = SEARCHES[algorithm](tuple(start), tuple(goal), grid, indexes, **(options or {}))
+        search_time = time.perf_counter() - start_time
+    return {
+        "path": [[int(x), int(y)] for x, y in path],
+        "cost": int(total_cost) if path else None,
+        "nodes_expanded": int(nodes_expanded),
+        "search_ms": search_time * 1000,
+        **extra,
+    }
+
+
+def run_batch(queries):
+    """
+    Runs a batch of (grid_name, algorithm, start, goal, options) queries.
+    A failing query gets {"error": message} and does not affect the others.
+    """
+    results = []
+    for grid_name, algorithm, start, goal, options in queries:
+        try:
+            results.append(run_query(grid_name, algorithm, start, goal, options))
+        except Exception as error:
+            results.append({"error": f"{type(error).__name__}: {error}"})
+    return results
@@ -0,0 +1,74 @@
+import math
+
+# Buckets per doubling of latency: bucket edges are 2 ** (i / SUBBUCKETS)
+# microseconds, so a reported percentile is at most ~19% above the true value.
+SUBBUCKETS = 4
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram. Memory depends on the range of latencies
+    seen (a few dozen buckets), not on how many are recorded, so a server can
+    keep one per algorithm for its whole lifetime.
+    """
+    def __init__(self):
+        self.counts = {}  # bucket -> count
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log2(micros) * SUBBUCKETS)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @staticmethod
+    def upper_bound(bucket):
+        return 2 ** ((bucket + 1) / SUBBUCKETS) / 1e6
+
+    def percentile(self, percent):
+        """
+        Upper edge (seconds) of the bucket holding the given percentile, capped at the maximum seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.upper_bound(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        """
+        Summary in milliseconds plus the non-empty buckets as [upper_ms, count] pairs.
+        """
+        summary = {
+            "count": self.count,
+            "mean_ms": self.mean * 1000,
+            "min_ms": self.min * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}_ms"] = self.percentile(percent) * 1000
+        summary["buckets"] = [[self.upper_bound(b) * 1000, self.counts[b]] for b in sorted(self.counts)]
+        return summary
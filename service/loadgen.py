@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import itertools
+import time
+from service.client import AsyncPathClient, ServiceError
+from service.histogram import LatencyHistogram
+from service.server import DEFAULT_HOST, DEFAULT_PORT
+
+
+async def generate_load(grid, algorithm="astar", requests=1000, connections=8, seed=0,
+                        host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None, options=None):
+    """
+    Sends requests random reachable queries on grid over connections parallel
+    connections and returns (LatencyHistogram of client-side latencies,
+    elapsed seconds, error count).
+    """
+    async with AsyncPathClient(host, port, unix_socket) as client:
+        starts, goals = await client.random_queries(grid, requests, seed)
+    queries = iter(zip(starts, goals))
+    histogram = LatencyHistogram()
+    errors = 0
+
+    async def connection():
+        nonlocal errors
+        async with AsyncPathClient(host, port, unix_socket) as client:
+            # The shared iterator hands out each query once across all connections
+            for start, goal in queries:
+                sent = time.perf_counter()
+                try:
+                    await client.path(grid, start, goal, algorithm, **(options or {}))
+                    histogram.record(time.perf_counter() - sent)
+                except ServiceError:
+                    errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(connections)))
+    return histogram, time.perf_counter() - started, errors
+
+
+def print_histogram(title, summary):
+    print(title)
+    print(f"  Requests: {summary['count']}")
+    print(f"  Mean: {summary['mean_ms']:.2f} ms")
+    for key in ("p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms"):
+        print(f"  {key[:-3]}: {summary[key]:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the local path service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--grid", default="mirror_maze_50x50")
+    parser.add_argument("--algorithm", default="astar")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--connections", type=int, nargs="+", default=[8],
+                        help="one run per value, e.g. --connections 1 4 16")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for connections, seed in zip(args.connections, itertools.count(args.seed)):
+        histogram, elapsed, errors = asyncio.run(generate_load(
+            args.grid, args.algorithm, args.requests, connections, seed, args.host, args.port, args.unix))
+        print(f"######### {args.algorithm.upper()} ON {args.grid} WITH {connections} CONNECTIONS #########")
+        print(f"Throughput: {histogram.count / elapsed:.1f} requests/second")
+        print(f"Errors: {errors}")
+        print_histogram("Client latency:", histogram.as_dict())
+
+    async def server_stats():
+        async with AsyncPathClient(args.host, args.port, args.unix) as client:
+            return await client.stats()
+    stats = asyncio.run(server_stats())
+    print_histogram("Server latency (all runs):", stats["latency"].get(args.algorithm, stats["latency"]["all"]))
+    print(f"Batch sizes: {stats['batch_sizes']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from common.simulator import generate_queries
+from service.engine import SEARCHES, default_grid_specs, parse_grid_spec, init_worker, run_batch
+from service.histogram import LatencyHistogram
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """
+    A request the service rejects; becomes an HTTP error response with its status.
+    """
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class PathService:
+    """
+    Answers path queries on named grids that stay loaded for the service's
+    lifetime. Queries arriving within batch_window seconds of each other are
+    grouped (up to batch_size) and each group runs as one task on a worker
+    pool, so the event loop never runs a search itself. At most two batches
+    per worker are in flight; later queries wait in the queue.
+
+    workers=0 runs batches on a single thread in this process instead of a
+    process pool (useful for debugging; searches then share the GIL).
+    """
+    def __init__(self, specs, workers=None, batch_size=32, batch_window=0.002):
+        self.specs = {spec.name: spec for spec in specs}
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.grids = {}
+        self.latency = {}      # algorithm -> end-to-end LatencyHistogram
+        self.search_time = {}  # algorithm -> LatencyHistogram of the search alone
+        self.batch_sizes = {}  # batch size -> count
+        self.errors = 0
+        self.started = None
+        self._queue = None
+        self._executor = None
+        self._dispatcher = None
+        self._in_flight = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        specs = list(self.specs.values())
+        # The service also keeps every grid to validate queries and pick random ones
+        for spec in specs:
+            self.grids[spec.name] = await loop.run_in_executor(None, spec.load)
+        if self.workers:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(specs,))
+            # Start every worker now so they load their grids before the first query
+            await asyncio.gather(*(loop.run_in_executor(self._executor, run_batch, []) for _ in range(self.workers)))
+        else:
+            self._executor = ThreadPoolExecutor(1, initializer=init_worker, initargs=(specs,))
+        self._queue = asyncio.Queue()
+        self._in_flight = asyncio.Semaphore(2 * max(1, self.workers))
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self.started = time.time()
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def validate(self, query):
+        """
+        Checks a query dict and returns (grid, algorithm, start, goal, options).
+        """
+        if not isinstance(query, dict):
+            raise RequestError("query must be a JSON object")
+        grid_name = query.get("grid")
+        grid = self.grids.get(grid_name)
+        if grid is None:
+            raise RequestError(f"Unknown grid {grid_name!r}, expected one of {sorted(self.grids)}")
+        algorithm = query.get("algorithm", "astar")
+        if algorithm not in SEARCHES:
+            raise RequestError(f"Unknown algorithm {algorithm!r}, expected one of {sorted(SEARCHES)}")
+        cells = []
+        for key in ("start", "goal"):
+            cell = query.get(key)
+            if (not isinstance(cell, list) or len(cell) != 2 or not all(isinstance(v, int) for v in cell)
+                    or not grid.in_bounds(*cell) or not grid.is_walkable(*cell)):
+                raise RequestError(f"{key} must be a walkable [x, y] cell of {grid_name!r}")
+            cells.append(cell)
+        options = query.get("options") or {}
+        if not isinstance(options, dict):
+            raise RequestError("options must be a JSON object")
+        return grid_name, algorithm, cells[0], cells[1], options
+
+    async def query(self, query):
+        """
+        Validates and answers one query dict; returns the result dict.
+        """
+        arrived = time.perf_counter()
+        item = self.validate(query)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        result = await future
+        algorithm = item[1]
+        if "error" in result:
+            self.errors += 1
+        else:
+            self.latency.setdefault(algorithm, LatencyHistogram()).record(time.perf_counter() - arrived)
+            self.search_time.setdefault(algorithm, LatencyHistogram()).record(result["search_ms"] / 1000)
+        return result
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Give concurrent queries a short window to join this batch
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._in_flight.acquire()
+            asyncio.create_task(self._run(batch))
+
+    async def _run(self, batch):
+        self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, run_batch, [item for item, _ in batch])
+        except Exception as error:
+            results = [{"error": f"{type(error).__name__}: {error}"}] * len(batch)
+        finally:
+            self._in_flight.release()
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        total = LatencyHistogram()
+        for histogram in self.latency.values():
+            total.merge(histogram)
+        return {
+            "uptime_s": time.time() - self.started,
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "errors": self.errors,
+            "latency": {"all": total.as_dict(), **{name: h.as_dict() for name, h in sorted(self.latency.items())}},
+            "search_time": {name: h.as_dict() for name, h in sorted(self.search_time.items())},
+            "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+        }
+
+    def grid_info(self):
+        return {
+            name: {"shape": list(grid.shape),
+                   "start": list(grid.start) if grid.start is not None else None,
+                   "goal": list(grid.goal) if grid.goal is not None else None}
+            for name, grid in self.grids.items()
+        }
+
+    def random_queries(self, grid_name, count, seed):
+        grid = self.grids.get(grid_name)
+        if grid is None:
+            raise RequestError(f"Unknown grid {grid_name!r}", 404)
+        starts, goals = generate_queries(grid, count, seed=seed)
+        return {"starts": starts.tolist(), "goals": goals.tolist()}
+
+    # HTTP
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        params = parse_qs(url.query)
+
+        if parts == ["health"]:
+            return {"status": "ok"}
+        if parts == ["algorithms"]:
+            return {"algorithms": sorted(SEARCHES)}
+        if parts == ["grids"]:
+            return {"grids": self.grid_info()}
+        if len(parts) == 3 and parts[0] == "grids" and parts[2] == "queries":
+            count = int(params.get("count", ["100"])[0])
+            seed = int(params["seed"][0]) if "seed" in params else None
+            return await asyncio.get_running_loop().run_in_executor(None, self.random_queries, parts[1], count, seed)
+        if parts == ["stats"]:
+            return self.stats()
+        if parts in (["path"], ["paths"]):
+            if method != "POST":
+                raise RequestError(f"{url.path} needs POST", 405)
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError as error:
+                raise RequestError(f"Invalid JSON: {error}")
+            if parts == ["path"]:
+                result = await self.query(payload)
+                if "error" in result:
+                    raise RequestError(result["error"])
+                return result
+            queries = payload.get("queries") if isinstance(payload, dict) else None
+            if not isinstance(queries, list):
+                raise RequestError('/paths needs {"queries": [...]}')
+            # Validate everything first so one bad query rejects the request before any search runs
+            for query in queries:
+                self.validate(query)
+            return {"results": await asyncio.gather(*(self.query(query) for query in queries))}
+        raise RequestError(f"No route for {url.path}", 404)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves HTTP/1.1 requests on one connection, keeping it open between
+        requests unless the client asks to close it.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+                if length > MAX_BODY:
+                    status, payload, keep_alive = 413, {"error": "request body too large"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = 200, await self.route(method, target, body)
+                    except RequestError as error:
+                        status, payload = error.status, {"error": str(error)}
+                    except Exception as error:
+                        status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+    """
+    Starts service and serves it on host:port, or on the Unix socket path if given, until cancelled.
+    """
+    await service.start()
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = await asyncio.start_unix_server(service.handle_connection, unix_socket)
+        where = unix_socket
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        where = f"http://{host}:{port}"
+    print(f"Serving {len(service.grids)} grids with {service.workers} workers on {where}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local pathfinding service that keeps grids loaded.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="serve on a Unix socket instead of TCP")
+    parser.add_argument("--grid", action="append", metavar="NAME=MAZE[,COSTS]",
+                        help="grid to serve (repeatable); defaults to every maze in common/grids")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 0 for in-process)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    specs = [parse_grid_spec(text) for text in args.grid] if args.grid else default_grid_specs()
+    service = PathService(specs, args.workers, args.batch_size, args.batch_window_ms / 1000)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()